@@ -0,0 +1,63 @@
+"""
+Times computing the nullable nonterminals and the FIRST and FOLLOW sets of the HULK and regex grammars as bitsets, and
+converting them to the sets of symbols `compute_firsts` and `compute_follows` return.
+
+Usage: python -m benchmarks.grammar_sets [output.json]
+"""
+import json
+import sys
+import time
+
+import src.hulk_grammar.hulk_grammar as hulk_grammar
+from src.parsing import SymbolBitsets, compute_firsts, compute_follows
+from src.regex.regex_grammar import get_regex_grammar
+
+GRAMMARS = {
+    'hulk': lambda: hulk_grammar.G,
+    'regex': lambda: get_regex_grammar()[0],
+}
+
+
+def best_time(function, runs=50):
+    best = float('inf')
+    for _ in range(runs):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def grammar_sets_report(grammars=tuple(GRAMMARS)):
+    report = {'results': []}
+    for name in grammars:
+        G = GRAMMARS[name]().AugmentedGrammar(True)
+        bitsets = SymbolBitsets(G)
+        report['results'].append({
+            'grammar': name,
+            'terminals': len(G.terminals),
+            'nonterminals': len(G.nonTerminals),
+            'productions': len(G.Productions),
+            'nullable': len(bitsets.nullable),
+            'first_seconds': best_time(lambda: SymbolBitsets(G)),
+            'first_and_follow_seconds': best_time(lambda: SymbolBitsets(G).follow),
+            'as_sets_seconds': best_time(lambda: compute_follows(G, compute_firsts(G))),
+        })
+    return report
+
+
+def print_report(report):
+    print(f"{'grammar':<9}{'terms':>7}{'nonterms':>10}{'prods':>7}{'nullable':>10}"
+          f"{'first ms':>10}{'+follow ms':>12}{'as sets ms':>12}")
+    for row in report['results']:
+        print(f"{row['grammar']:<9}{row['terminals']:>7}{row['nonterminals']:>10}{row['productions']:>7}"
+              f"{row['nullable']:>10}{row['first_seconds'] * 1e3:>10.3f}{row['first_and_follow_seconds'] * 1e3:>12.3f}"
+              f"{row['as_sets_seconds'] * 1e3:>12.3f}")
+
+
+if __name__ == '__main__':
+    report = grammar_sets_report()
+    print_report(report)
+
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], 'w') as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,86 @@
+"""
+Measures the latency of compiling a program of increasing number of declarations up to its syntax tree after editing
+the body of one function: re-lexing the edit with `Lexer.relex` and `HulkLexer.refilter`, and parsing the tokens with
+`HulkParser.parse_incremental` given the range they changed in, against lexing and parsing the whole program again.
+
+Usage: python -m benchmarks.incremental_parsing [output.json]
+"""
+import json
+import sys
+import time
+
+from src.lexer.hulk_lexer import HulkLexer
+from src.parser.hulk_parser import HulkParser, DeclarationCache
+
+DECLARATIONS = [100, 1_000, 4_000]
+EDITS = 20
+
+DECLARATION = ('function f{0}(x: Number) => x ^ 2 + [i || i in range(0, x)][0];\n'
+               'type A{0}(x) inherits B(x) {{ y = let z = x * 2 in z @ "!"; m() => if (self.y is String) 1 else 2; }}\n')
+
+
+def program(declarations):
+    return ''.join(DECLARATION.format(i) for i in range(declarations // 2)) + 'print(f0(3));'
+
+
+def measure(lexer, parser, text):
+    raw = lexer.token_stream(text)
+    tokens, errors = lexer.filter_tokens(raw)
+    cache = DeclarationCache()
+    parser.parse_incremental(tokens, cache)
+
+    # Each edit changes the exponent of a function in the middle of the program back and forth
+    offset = text.index('x ^ 2', len(text) // 2) + len('x ^ ')
+    lex_seconds = parse_seconds = 0
+    for i in range(EDITS):
+        start = time.perf_counter()
+        relexed = lexer.relex(raw, offset, 1, '3' if i % 2 == 0 else '2')
+        edit = lexer.refilter(raw, tokens, errors, *relexed)
+        lex_seconds += time.perf_counter() - start
+
+        start = time.perf_counter()
+        parser.parse_incremental(tokens, cache, edit)
+        parse_seconds += time.perf_counter() - start
+
+    start = time.perf_counter()
+    tokens, _ = lexer(raw.source)
+    full_lex_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    parser.parse(tokens)
+    full_parse_seconds = time.perf_counter() - start
+
+    return {
+        'declarations': len(cache.nodes),
+        'tokens': len(tokens),
+        'reused': cache.reused,
+        'parsed': cache.parsed,
+        'edit_lex_seconds': lex_seconds / EDITS,
+        'edit_parse_seconds': parse_seconds / EDITS,
+        'full_lex_seconds': full_lex_seconds,
+        'full_parse_seconds': full_parse_seconds,
+    }
+
+
+def incremental_parsing_report(declarations=DECLARATIONS):
+    lexer = HulkLexer()
+    parser = HulkParser()
+    return {'results': [measure(lexer, parser, program(count)) for count in declarations]}
+
+
+def print_report(report):
+    print(f"{'decls':>7}{'tokens':>9}{'reused':>8}{'parsed':>8}{'relex ms':>10}{'reparse ms':>12}{'lex ms':>9}"
+          f"{'parse ms':>10}")
+    for row in report['results']:
+        print(f"{row['declarations']:>7}{row['tokens']:>9}{row['reused']:>8}{row['parsed']:>8}"
+              f"{row['edit_lex_seconds'] * 1e3:>10.1f}{row['edit_parse_seconds'] * 1e3:>12.1f}"
+              f"{row['full_lex_seconds'] * 1e3:>9.1f}{row['full_parse_seconds'] * 1e3:>10.1f}")
+
+
+if __name__ == '__main__':
+    sys.setrecursionlimit(10000)
+    report = incremental_parsing_report()
+    print_report(report)
+
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], 'w') as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,82 @@
+"""
+Times the HULK lexer on adversarial inputs full of unknown characters, at doubling sizes, to check that lexing stays
+linear in the size of the input regardless of the density of errors. Unknown tokens are matched by the error state of
+the lexer table, and also by looking for the next synchronizing token after each of them, as the lexer does when its
+table has no error state.
+
+Usage: python -m benchmarks.lexer_error_recovery [output.json]
+"""
+import json
+import random
+import sys
+import time
+
+from src.lexer.hulk_lexer import HulkLexer
+from src.lexer.lexer_table import LexerTable
+
+SIZES = [25_000, 50_000, 100_000, 200_000]
+
+
+def adversarial_inputs(size, seed=0):
+    rnd = random.Random(seed)
+    clean = 'let x = 42 in print(x @ "forty two");\n'
+    return {
+        'clean': (clean * (size // len(clean) + 1))[:size],
+        'binary': ''.join(chr(rnd.randrange(256)) for _ in range(size)),
+        'non_ascii': ''.join(rnd.choice('漢字かなカナ😀ñ€ ') for _ in range(size)),
+        'alternating': ('a=$' * size)[:size],
+        'long_unknown': '$' * size,
+        'unterminated_strings': ('"x\n' * size)[:size],
+    }
+
+
+def time_lexer(lexer, text, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in lexer._tokenize(text):
+            pass
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def error_recovery_report(sizes=SIZES):
+    lexer = HulkLexer()
+
+    # Same lexer, but its table has no error state, so it looks for the next synchronizing token after each error
+    fallback = HulkLexer(rebuild=True)
+    fallback.lexer_table = LexerTable.from_automaton(fallback.automaton).minimize()
+
+    report = {}
+    for size in sizes:
+        for name, text in adversarial_inputs(size).items():
+            unknown = sum(1 for _, token_type, _, _ in lexer._tokenize(text) if token_type is None)
+            seconds = time_lexer(lexer, text)
+            fallback_seconds = time_lexer(fallback, text)
+            report.setdefault(name, []).append({
+                'chars': size,
+                'unknown_tokens': unknown,
+                'seconds': seconds,
+                'ns_per_char': seconds / size * 1e9,
+                'fallback_seconds': fallback_seconds,
+            })
+    return report
+
+
+def print_report(report):
+    print(f"{'input':<22}{'chars':>9}{'unknown':>9}{'seconds':>10}{'ns/char':>9}{'fallback':>10}")
+    for name, rows in report.items():
+        for row in rows:
+            print(f"{name:<22}{row['chars']:>9}{row['unknown_tokens']:>9}{row['seconds']:>10.4f}"
+                  f"{row['ns_per_char']:>9.0f}{row['fallback_seconds']:>10.4f}")
+        growth = rows[-1]['ns_per_char'] / rows[0]['ns_per_char']
+        print(f"{'':<22}time per char grows x{growth:.2f} from {rows[0]['chars']} to {rows[-1]['chars']} chars")
+
+
+if __name__ == '__main__':
+    report = error_recovery_report()
+    print_report(report)
+
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], 'w') as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,64 @@
+"""
+Measures the latency of `Lexer.relex` when typing in the middle of files of increasing size built from `test.hulk`,
+against lexing the whole file again after each keystroke.
+
+Usage: python -m benchmarks.lexer_incremental [output.json]
+"""
+import json
+import sys
+import time
+from pathlib import Path
+
+from src.lexer.hulk_lexer import HulkLexer
+
+LINES = [1_000, 10_000, 40_000]
+TYPED = 'let y = [x ^ 2 || x in range(0, 10)] in print(y);\n'
+
+SAMPLE_PATH = Path(__file__).parent.parent / 'test.hulk'
+
+
+def file_of(lines):
+    sample = SAMPLE_PATH.read_text()
+    return sample * (lines // sample.count('\n') + 1)
+
+
+def measure(lexer, text):
+    tokens = lexer.token_stream(text)
+    offset = text.index('\n', len(text) // 2) + 1
+
+    start = time.perf_counter()
+    for i, char in enumerate(TYPED):
+        lexer.relex(tokens, offset + i, 0, char)
+    keystroke_seconds = (time.perf_counter() - start) / len(TYPED)
+
+    start = time.perf_counter()
+    lexer.token_stream(tokens.source)
+    full_seconds = time.perf_counter() - start
+
+    return {
+        'lines': text.count('\n'),
+        'tokens': len(tokens),
+        'keystroke_seconds': keystroke_seconds,
+        'full_relex_seconds': full_seconds,
+    }
+
+
+def incremental_report(lines=LINES):
+    lexer = HulkLexer()
+    return {'results': [measure(lexer, file_of(count)) for count in lines]}
+
+
+def print_report(report):
+    print(f"{'lines':>8}{'tokens':>9}{'keystroke µs':>14}{'full relex ms':>15}")
+    for row in report['results']:
+        print(f"{row['lines']:>8}{row['tokens']:>9}{row['keystroke_seconds'] * 1e6:>14.0f}"
+              f"{row['full_relex_seconds'] * 1e3:>15.1f}")
+
+
+if __name__ == '__main__':
+    report = incremental_report()
+    print_report(report)
+
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], 'w') as f:
+            json.dump(report, f, indent=2)
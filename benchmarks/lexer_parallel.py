@@ -0,0 +1,80 @@
+"""
+Compares the throughput of `HulkLexer.lex_files` with 2, 4 and 8 worker processes against lexing the same files one
+after the other, which is what it does with a single worker, on a batch of programs built from `test.hulk`.
+
+Usage: python -m benchmarks.lexer_parallel [output.json]
+"""
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src.lexer.hulk_lexer import HulkLexer
+
+WORKERS = [1, 2, 4, 8]
+FILES = 100
+
+SAMPLE_PATH = Path(__file__).parent.parent / 'test.hulk'
+
+
+def write_batch(directory, files=FILES):
+    sample = SAMPLE_PATH.read_text()
+    paths = []
+    for i in range(files):
+        path = Path(directory) / f'program_{i}.hulk'
+        # Programs of different sizes, so some workers get more work than others
+        path.write_text(sample * (1 + i % 10))
+        paths.append(path)
+    return paths
+
+
+def time_batch(lexer, paths, workers):
+    gc.collect()
+    start = time.perf_counter()
+    results = lexer.lex_files(paths, workers)
+    return time.perf_counter() - start, sum(len(tokens) for tokens, _ in results)
+
+
+def parallel_report(workers=WORKERS, files=FILES):
+    lexer = HulkLexer()
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_batch(directory, files)
+
+        # A single worker lexes the files one after the other in this process
+        serial_seconds, tokens = time_batch(lexer, paths, 1)
+
+        report = {
+            'cpus': os.cpu_count(),
+            'files': files,
+            'chars': sum(path.stat().st_size for path in paths),
+            'tokens': tokens,
+            'workers': {},
+        }
+        for count in workers:
+            seconds = serial_seconds if count == 1 else time_batch(lexer, paths, count)[0]
+            report['workers'][count] = {
+                'seconds': seconds,
+                'tokens_per_second': tokens / seconds,
+                'speedup': serial_seconds / seconds,
+            }
+    return report
+
+
+def print_report(report):
+    print(f"{report['files']} files, {report['chars']} chars, {report['tokens']} tokens, {report['cpus']} CPUs")
+    print(f"{'workers':<10}{'seconds':>10}{'tokens/s':>12}{'speedup':>9}")
+    for count, row in report['workers'].items():
+        print(f"{count:<10}{row['seconds']:>10.3f}{row['tokens_per_second']:>12.0f}{row['speedup']:>9.2f}")
+
+
+if __name__ == '__main__':
+    report = parallel_report()
+    print_report(report)
+
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], 'w') as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,45 @@
+"""
+Reports the size of the HULK lexer tables, with and without compressing the characters into equivalence classes, and
+the number of states they had before being minimized.
+
+Usage: python -m benchmarks.lexer_tables_report [output.json]
+"""
+import json
+import sys
+import time
+
+from src.lexer.hulk_lexer import HulkLexer
+
+
+def lexer_tables_report():
+    start = time.perf_counter()
+    lexer = HulkLexer(rebuild=True)
+    build_time = time.perf_counter() - start
+
+    unminimized = HulkLexer(rebuild=True, minimize=False)
+
+    report = {'build_seconds': build_time}
+    for name in ['lexer_table', 'synchronizing_lexer_table']:
+        report[name] = getattr(lexer, name).statistics()
+        report[name]['states_before_minimization'] = getattr(unminimized, name).states_count
+    return report
+
+
+def print_report(report):
+    print(f"Tables built in {report['build_seconds']:.3f}s")
+    print(f"{'table':<28}{'states':>8}{'minimized':>11}{'ranges':>8}{'classes':>9}{'bytes before':>14}"
+          f"{'bytes after':>13}")
+    for name in ['lexer_table', 'synchronizing_lexer_table']:
+        statistics = report[name]
+        print(f"{name:<28}{statistics['states_before_minimization']:>8}{statistics['states']:>11}"
+              f"{statistics['ranges']:>8}{statistics['classes']:>9}{statistics['uncompressed_table_bytes']:>14}"
+              f"{statistics['table_bytes']:>13}")
+
+
+if __name__ == '__main__':
+    report = lexer_tables_report()
+    print_report(report)
+
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], 'w') as f:
+            json.dump(report, f, indent=2)
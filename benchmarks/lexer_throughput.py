@@ -0,0 +1,176 @@
+"""
+Measures the throughput of the HULK lexer on synthetic corpora of increasing size, simulating the NFA, simulating the
+DFA obtained from it and running the compiled tables. For each corpus, size and mode it reports the tokens per second,
+the peak memory and the time until the first token is produced. Saving the report of two commits as JSON and comparing
+them shows regressions.
+
+Usage: python -m benchmarks.lexer_throughput [output.json] [--compare baseline.json]
+"""
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from src.lexer.hulk_lexer import HulkLexer
+
+SIZES = [4_000, 16_000, 64_000]
+
+SAMPLE_PATH = Path(__file__).parent.parent / 'test.hulk'
+
+MODES = {
+    'nfa': lambda: HulkLexer(use_tables=False),
+    'dfa': lambda: HulkLexer(use_tables=False, convert_to_dfa=True, minimize=True),
+    'tables': lambda: HulkLexer(),
+}
+
+
+def _repeat_until(size, unit):
+    parts = []
+    length = 0
+    while length < size:
+        part = unit(len(parts))
+        parts.append(part)
+        length += len(part)
+    return ''.join(parts)
+
+
+def identifier_heavy(size, rnd):
+    def name():
+        return rnd.choice('_abcdefghijklmnopqrstuvwxyzABCXYZ') + ''.join(
+            rnd.choice('_abcxyz0123456789') for _ in range(rnd.randrange(3, 16)))
+
+    return _repeat_until(size, lambda i: f'let {name()} = {name()}.{name()}({name()}, {name()}) in {name()};\n')
+
+
+def string_heavy(size, rnd):
+    def literal():
+        words = ' '.join(rnd.choice(['hello', 'world', '\\"quoted\\"', 'ñandú', 'a+b=c', '{x}']) for _ in range(20))
+        return f'"{words}"'
+
+    return _repeat_until(size, lambda i: f'print({literal()} @@ {literal()});\n')
+
+
+def deeply_nested(size, rnd):
+    def expression(depth):
+        if depth == 0:
+            return str(rnd.randrange(100))
+        return f'({expression(depth - 1)} {rnd.choice("+-*/")} {{ {expression(depth - 1) if depth < 3 else 1}; }})'
+
+    return _repeat_until(size, lambda i: f'let x{i} = {expression(6)} in x{i};\n')
+
+
+def error_dense(size, rnd):
+    garbage = '#$?¿~`€π😀\\'
+    return _repeat_until(size, lambda i: f'let a{i} = {rnd.choice(garbage)}{i} {rnd.choice(garbage) * 3} in "open\n')
+
+
+def realistic(size, rnd):
+    sample = SAMPLE_PATH.read_text()
+    return _repeat_until(size, lambda i: sample)
+
+
+CORPORA = {
+    'identifiers': identifier_heavy,
+    'strings': string_heavy,
+    'nested': deeply_nested,
+    'errors': error_dense,
+    'realistic': realistic,
+}
+
+
+def corpus(name, size, seed=0):
+    return CORPORA[name](size, random.Random(seed))
+
+
+def best_time(function, budget=0.5, max_runs=20):
+    """Least time `function` takes, running it until the runs take `budget` seconds in total."""
+    best = float('inf')
+    total = 0
+    for _ in range(max_runs):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+        total += elapsed
+        if total >= budget:
+            break
+    return best
+
+
+def measure(lexer, text):
+    time_to_first_token = best_time(lambda: next(iter(lexer._tokenize(text))), budget=0.05)
+    tokens, _ = lexer(text)
+    seconds = best_time(lambda: lexer(text))
+
+    # Tracing allocations slows lexing down, so memory is measured apart
+    tracemalloc.start()
+    lexer(text)
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'chars': len(text),
+        'tokens': len(tokens),
+        'seconds': seconds,
+        'tokens_per_second': len(tokens) / seconds,
+        'peak_memory_bytes': peak_memory,
+        'time_to_first_token_seconds': time_to_first_token,
+    }
+
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              cwd=Path(__file__).parent).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def throughput_report(sizes=SIZES, modes=tuple(MODES), corpora=tuple(CORPORA)):
+    report = {'commit': _commit(), 'python': platform.python_version(), 'results': []}
+    for mode in modes:
+        lexer = MODES[mode]()
+        for name in corpora:
+            for size in sizes:
+                result = measure(lexer, corpus(name, size))
+                report['results'].append({'mode': mode, 'corpus': name, **result})
+    return report
+
+
+def print_report(report, baseline=None):
+    previous = {}
+    if baseline is not None:
+        previous = {(row['mode'], row['corpus'], row['chars']): row for row in baseline['results']}
+
+    print(f"commit {report['commit']}, python {report['python']}")
+    print(f"{'mode':<8}{'corpus':<13}{'chars':>8}{'tokens':>8}{'tokens/s':>11}{'peak KiB':>10}{'first µs':>10}"
+          + (f"{'vs base':>9}" if baseline is not None else ''))
+    for row in report['results']:
+        line = (f"{row['mode']:<8}{row['corpus']:<13}{row['chars']:>8}{row['tokens']:>8}"
+                f"{row['tokens_per_second']:>11.0f}{row['peak_memory_bytes'] / 1024:>10.0f}"
+                f"{row['time_to_first_token_seconds'] * 1e6:>10.0f}")
+        old = previous.get((row['mode'], row['corpus'], row['chars']))
+        if old is not None:
+            line += f"{row['tokens_per_second'] / old['tokens_per_second']:>8.2f}x"
+        print(line)
+
+
+if __name__ == '__main__':
+    arguments = sys.argv[1:]
+    baseline = None
+    if '--compare' in arguments:
+        i = arguments.index('--compare')
+        with open(arguments[i + 1]) as f:
+            baseline = json.load(f)
+        del arguments[i: i + 2]
+
+    report = throughput_report()
+    print_report(report, baseline)
+
+    if arguments:
+        with open(arguments[0], 'w') as f:
+            json.dump(report, f, indent=2)
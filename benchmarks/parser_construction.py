@@ -0,0 +1,74 @@
+"""
+Times building the LR(1) and LALR(1) parsing tables of the HULK and regex grammars, and reports the number of states
+and of entries of each table. The canonical LR(1) table of the HULK grammar is also built by pools of processes of
+increasing size.
+
+Usage: python -m benchmarks.parser_construction [output.json]
+"""
+import gc
+import json
+import sys
+import time
+
+import src.hulk_grammar.hulk_grammar as hulk_grammar
+from src.parsing import LR1Parser, LALR1Parser
+from src.regex.regex_grammar import get_regex_grammar
+
+GRAMMARS = {
+    'hulk': lambda: hulk_grammar.G,
+    'regex': lambda: get_regex_grammar()[0],
+}
+
+PARSERS = {
+    'lr1': LR1Parser,
+    'lalr1': LALR1Parser,
+}
+
+WORKERS = [1, 2, 4]
+
+
+def measure(parser_class, G, runs=3, **options):
+    seconds = float('inf')
+    for _ in range(runs):
+        gc.collect()
+        start = time.perf_counter()
+        parser = parser_class(G, **options)
+        seconds = min(seconds, time.perf_counter() - start)
+
+    return {
+        'seconds': seconds,
+        'states': len({state for state, _ in parser.table}),
+        'entries': len(parser.table),
+    }
+
+
+def construction_report(grammars=tuple(GRAMMARS), parsers=tuple(PARSERS), workers=WORKERS):
+    report = {'results': [], 'parallel': []}
+    for grammar in grammars:
+        G = GRAMMARS[grammar]()
+        for name in parsers:
+            report['results'].append({'grammar': grammar, 'parser': name, **measure(PARSERS[name], G)})
+
+    for count in workers:
+        report['parallel'].append({'workers': count, **measure(LR1Parser, hulk_grammar.G, workers=count)})
+    return report
+
+
+def print_report(report):
+    print(f"{'grammar':<9}{'parser':<8}{'seconds':>9}{'states':>8}{'entries':>9}")
+    for row in report['results']:
+        print(f"{row['grammar']:<9}{row['parser']:<8}{row['seconds']:>9.3f}{row['states']:>8}{row['entries']:>9}")
+    print()
+    print(f"{'workers':>7}{'seconds':>9}{'speedup':>9}")
+    for row in report['parallel']:
+        print(f"{row['workers']:>7}{row['seconds']:>9.3f}{report['parallel'][0]['seconds'] / row['seconds']:>9.2f}")
+
+
+if __name__ == '__main__':
+    sys.setrecursionlimit(10000)
+    report = construction_report()
+    print_report(report)
+
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], 'w') as f:
+            json.dump(report, f, indent=2)
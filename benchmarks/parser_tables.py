@@ -0,0 +1,161 @@
+"""
+Reports the cost of the parsing tables of the HULK grammar for each kind of parser, to see what a change of the grammar
+costs: the number of states and of ACTION and GOTO entries, the bytes of the table as a dict, as the compact table the
+parser runs on and in its cache file, the construction time and its peak memory. The time of each phase of the
+construction (FIRST and FOLLOW sets, closures, gotos, building the item sets, filling the table and compiling it) is
+measured under the profiler, so the phases add up to more than the construction time. A parser the grammar has
+conflicts for reports them instead.
+
+Usage: python -m benchmarks.parser_tables [output.json]
+"""
+import cProfile
+import gc
+import json
+import pstats
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import src.hulk_grammar.hulk_grammar as hulk_grammar
+from src.automaton import State
+from src.parsing import LR1Parser, LALR1Parser, SLR1Parser, GrammarConflictError, InternedItems, SymbolBitsets, \
+    CompactTable, build_LR1_automaton, build_LALR1_automaton, build_LR0_automaton, grammar_fingerprint, \
+    save_parse_table
+
+PARSERS = {
+    'lr1': LR1Parser,
+    'lalr1': LALR1Parser,
+    'slr1': SLR1Parser,
+}
+
+# Functions whose cumulative time is each phase of the construction. Filling the table is what building it takes
+# besides the automaton and the FOLLOW sets
+PHASES = {
+    'first_follow': [SymbolBitsets.__init__, SymbolBitsets._compute_follow],
+    'closure': [InternedItems.closure, State.epsilon_closure_by_state],
+    'goto': [InternedItems.gotos, State.move_by_state],
+    'item_sets': [InternedItems.state],
+}
+AUTOMATON_BUILDERS = [build_LR1_automaton, build_LALR1_automaton, build_LR0_automaton]
+
+
+def function_key(function):
+    code = function.__code__
+    return code.co_filename, code.co_firstlineno, code.co_name
+
+
+def cumulative_seconds(stats, functions):
+    return sum(stats.get(function_key(function), (0, 0, 0, 0))[3] for function in functions)
+
+
+def profile_phases(parser_class, G):
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        parser_class(G)
+    except GrammarConflictError:
+        pass
+    finally:
+        profile.disable()
+    stats = pstats.Stats(profile).stats
+
+    phases = {name: cumulative_seconds(stats, functions) for name, functions in PHASES.items()}
+    build = cumulative_seconds(stats, [parser_class._build_parsing_table])
+    automaton = cumulative_seconds(stats, AUTOMATON_BUILDERS)
+    # SLR(1) computes the FOLLOW sets while filling the table, the other parsers while building the automaton
+    follow = cumulative_seconds(stats, [SymbolBitsets._compute_follow])
+    phases['table_fill'] = build - automaton - follow
+    phases['compile'] = cumulative_seconds(stats, [CompactTable.__init__])
+    return phases
+
+
+def table_bytes(parser, G):
+    gc.collect()
+    tracemalloc.start()
+    # The tuples are copied too, the productions they refer to are shared with the compact table
+    table = {(state, symbol): (action, tag) for (state, symbol), (action, tag) in parser.table.items()}
+    dict_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del table
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / 'table.bin'
+        save_parse_table(path, grammar_fingerprint(G, parser.grammar_class), parser.compact_table, G)
+        cache_bytes = path.stat().st_size
+
+    return {'dict': dict_bytes, 'compact': parser.compact_table.nbytes(), 'cache': cache_bytes}
+
+
+def measure(parser_class, G):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        parser = parser_class(G)
+    except GrammarConflictError as e:
+        tracemalloc.stop()
+        return {'conflicts': len(e.conflicts)}
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Timed again without tracing the allocations, which slows the construction down
+    gc.collect()
+    start = time.perf_counter()
+    parser_class(G)
+    seconds = min(seconds, time.perf_counter() - start)
+
+    nonterminals = {symbol.Name for symbol in G.nonTerminals}
+    return {
+        'conflicts': 0,
+        'states': len({state for state, _ in parser.table}),
+        'action_entries': sum(1 for _, symbol in parser.table if symbol not in nonterminals),
+        'goto_entries': sum(1 for _, symbol in parser.table if symbol in nonterminals),
+        'bytes': table_bytes(parser, G),
+        'seconds': seconds,
+        'peak_memory_bytes': peak,
+        'phase_seconds': profile_phases(parser_class, G),
+    }
+
+
+def tables_report(parsers=tuple(PARSERS)):
+    G = hulk_grammar.G
+    return {
+        'grammar': {'terminals': len(G.terminals), 'nonterminals': len(G.nonTerminals),
+                    'productions': len(G.Productions)},
+        'results': [{'parser': name, **measure(PARSERS[name], G)} for name in parsers],
+    }
+
+
+def print_report(report):
+    grammar = report['grammar']
+    print(f"{grammar['terminals']} terminals, {grammar['nonterminals']} nonterminals, "
+          f"{grammar['productions']} productions")
+    print()
+    print(f"{'parser':<8}{'states':>8}{'action':>8}{'goto':>7}{'dict KiB':>10}{'compact KiB':>13}{'cache KiB':>11}"
+          f"{'seconds':>9}{'peak MiB':>10}")
+    for row in report['results']:
+        if row['conflicts']:
+            print(f"{row['parser']:<8}{row['conflicts']} conflicts")
+            continue
+        print(f"{row['parser']:<8}{row['states']:>8}{row['action_entries']:>8}{row['goto_entries']:>7}"
+              f"{row['bytes']['dict'] / 1024:>10.0f}{row['bytes']['compact'] / 1024:>13.0f}"
+              f"{row['bytes']['cache'] / 1024:>11.0f}{row['seconds']:>9.3f}{row['peak_memory_bytes'] / 2 ** 20:>10.1f}")
+
+    print()
+    print(f"{'parser':<8}" + ''.join(f'{phase:>13}' for phase in [*PHASES, 'table_fill', 'compile']) + '  (profiled ms)')
+    for row in report['results']:
+        if not row['conflicts']:
+            print(f"{row['parser']:<8}" + ''.join(f'{seconds * 1e3:>13.1f}' for seconds in row['phase_seconds'].values()))
+
+
+if __name__ == '__main__':
+    sys.setrecursionlimit(10000)
+    report = tables_report()
+    print_report(report)
+
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], 'w') as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,105 @@
+"""
+Measures the throughput of the LR(1) and LALR(1) HULK parsers on programs of increasing size, and the memory taken by
+their compact tables against the dict they're compiled from. Building the AST by evaluating the derivation after
+parsing (two passes) is compared with building it while parsing (fused), in time and peak memory.
+
+Usage: python -m benchmarks.parser_throughput [output.json]
+"""
+import gc
+import json
+import sys
+import time
+import tracemalloc
+
+from src.lexer.hulk_lexer import HulkLexer
+from src.evaluation import evaluate_reverse_parse
+from src.parser.hulk_parser import HulkParser, tokens_terminals_map
+from src.parsing import CompactTable
+
+DECLARATIONS = [100, 400, 1_600]
+
+PROGRAM_UNIT = ('function f(x: Number) => x ^ 2 + [i || i in range(0, x)][0];\n'
+                'type A(x) inherits B(x) { y = let z = x * 2 in z @ "!"; m() => if (self.y is String) 1 else 2; }\n')
+
+
+def program(declarations):
+    return PROGRAM_UNIT * (declarations // 2) + 'print(f(3));'
+
+
+def best_time(function, runs=5):
+    best = float('inf')
+    for _ in range(runs):
+        gc.collect()
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def memory_of(build):
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def peak_memory_of(function):
+    gc.collect()
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def two_passes(parser, tokens):
+    derivation, operations, _ = parser(tokens)
+    return evaluate_reverse_parse(derivation, operations, tokens)
+
+
+def throughput_report(declarations=DECLARATIONS):
+    lexer = HulkLexer()
+    report = {'tables': {}, 'results': []}
+
+    for name, lalr in [('lr1', False), ('lalr1', True)]:
+        parser = HulkParser(rebuild=True, lalr=lalr)
+        # The dict is measured by copying it with its tuples, the productions it refers to are shared with the compact
+        # table
+        _, dict_bytes = memory_of(lambda: {(state, symbol): (action, tag)
+                                           for (state, symbol), (action, tag) in parser.table.items()})
+        table = CompactTable(parser.table)
+        report['tables'][name] = {'entries': len(parser.table), 'dict_bytes': dict_bytes, 'compact_bytes': table.nbytes()}
+
+        for count in declarations:
+            tokens, _ = lexer(program(count))
+            w = tokens.map_types(tokens_terminals_map)
+            for mode, build in [('parse', lambda: parser(tokens)), ('two_passes', lambda: two_passes(parser, tokens)),
+                                ('fused', lambda: parser.parse(tokens))]:
+                seconds = best_time(build)
+                report['results'].append({'parser': name, 'mode': mode, 'tokens': len(w), 'seconds': seconds,
+                                          'tokens_per_second': len(w) / seconds,
+                                          'peak_memory_bytes': peak_memory_of(build)})
+    return report
+
+
+def print_report(report):
+    print(f"{'parser':<8}{'entries':>9}{'dict KiB':>10}{'compact KiB':>13}")
+    for name, row in report['tables'].items():
+        print(f"{name:<8}{row['entries']:>9}{row['dict_bytes'] / 1024:>10.0f}{row['compact_bytes'] / 1024:>13.0f}")
+    print()
+    print(f"{'parser':<8}{'mode':<12}{'tokens':>9}{'seconds':>10}{'tokens/s':>11}{'peak KiB':>10}")
+    for row in report['results']:
+        print(f"{row['parser']:<8}{row['mode']:<12}{row['tokens']:>9}{row['seconds']:>10.3f}"
+              f"{row['tokens_per_second']:>11.0f}{row['peak_memory_bytes'] / 1024:>10.0f}")
+
+
+if __name__ == '__main__':
+    sys.setrecursionlimit(10000)
+    report = throughput_report()
+    print_report(report)
+
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], 'w') as f:
+            json.dump(report, f, indent=2)
@@ -1,9 +1,167 @@
+from bisect import bisect_right
+
 try:
     import pydot
 except:
     pass
 
 
+class CharClass:
+    """
+    Set of characters used to label a single transition, such as `[a-z]` or `[^"]`. It's stored as sorted, disjoint
+    and non-adjacent ranges of code points.
+    """
+    MAX_CODE_POINT = 0x10FFFF
+
+    def __init__(self, ranges):
+        merged = []
+        for low, high in sorted(ranges):
+            if merged and low <= merged[-1][1] + 1:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], high))
+            else:
+                merged.append((low, high))
+
+        self.ranges = tuple(merged)
+        self._lows = [low for low, _ in self.ranges]
+
+    def negate(self):
+        ranges = []
+        low = 0
+        for start, end in self.ranges:
+            if low < start:
+                ranges.append((low, start - 1))
+            low = end + 1
+        if low <= CharClass.MAX_CODE_POINT:
+            ranges.append((low, CharClass.MAX_CODE_POINT))
+        return CharClass(ranges)
+
+    @property
+    def single_char(self):
+        """The only character of the class, or None if it has more than one."""
+        if len(self.ranges) == 1 and self.ranges[0][0] == self.ranges[0][1]:
+            return chr(self.ranges[0][0])
+        return None
+
+    def __contains__(self, char):
+        if not isinstance(char, str) or len(char) != 1:
+            return False
+        code = ord(char)
+        i = bisect_right(self._lows, code) - 1
+        return i >= 0 and code <= self.ranges[i][1]
+
+    def __eq__(self, other):
+        return isinstance(other, CharClass) and self.ranges == other.ranges
+
+    def __hash__(self):
+        return hash(self.ranges)
+
+    def __repr__(self):
+        return str(self)
+
+    def __str__(self):
+        def show(code):
+            return repr(chr(code))[1:-1]
+
+        return '[%s]' % ''.join(show(low) if low == high else f'{show(low)}-{show(high)}' for low, high in self.ranges)
+
+
+def split_char_classes(symbols):
+    """
+    Splits the characters and classes in `symbols` into disjoint ones, so that each of them is either contained in or
+    disjoint from every symbol given. Single characters are returned as plain strings.
+    """
+    bounds = set()
+    for symbol in symbols:
+        for low, high in _ranges_of(symbol):
+            bounds.add(low)
+            bounds.add(high + 1)
+
+    covered = CharClass(range_ for symbol in symbols for range_ in _ranges_of(symbol))
+    bounds = sorted(bounds)
+
+    parts = []
+    for low, next_low in zip(bounds, bounds[1:]):
+        if chr(low) in covered:
+            parts.append(chr(low) if low == next_low - 1 else CharClass([(low, next_low - 1)]))
+    return parts
+
+
+def _ranges_of(symbol):
+    if isinstance(symbol, CharClass):
+        return symbol.ranges
+    return [(ord(symbol), ord(symbol))]
+
+
+def hopcroft_partition(states_count, symbols_count, transition, labels):
+    """Hopcroft's algorithm: block of each state in the coarsest partition that never merges different `labels`."""
+    # Missing transitions go to an extra dead state, which is kept apart from the others by its own block
+    dead = states_count
+    inverse = [[[] for _ in range(states_count + 1)] for _ in range(symbols_count)]
+    for state in range(states_count):
+        for symbol in range(symbols_count):
+            target = transition(state, symbol)
+            inverse[symbol][dead if target < 0 else target].append(state)
+    for symbol in range(symbols_count):
+        inverse[symbol][dead].append(dead)
+
+    groups = {}
+    for state in range(states_count):
+        groups.setdefault(labels[state], []).append(state)
+
+    blocks = [set(group) for group in groups.values()] + [{dead}]
+    block_of = [0] * (states_count + 1)
+    for i, block in enumerate(blocks):
+        for state in block:
+            block_of[state] = i
+
+    pending = {(i, symbol) for i in range(len(blocks)) for symbol in range(symbols_count)}
+
+    while pending:
+        splitter, symbol = pending.pop()
+
+        predecessors = {}
+        for target in blocks[splitter]:
+            for state in inverse[symbol][target]:
+                predecessors.setdefault(block_of[state], []).append(state)
+
+        for i, states in predecessors.items():
+            if len(states) == len(blocks[i]):
+                continue
+
+            new_block = set(states)
+            blocks[i] -= new_block
+            j = len(blocks)
+            blocks.append(new_block)
+            for state in new_block:
+                block_of[state] = j
+
+            for other in range(symbols_count):
+                if (i, other) in pending:
+                    pending.add((j, other))
+                else:
+                    pending.add((j, other) if len(new_block) <= len(blocks[i]) else (i, other))
+
+    # Numbered in order of first appearance, so the numbering doesn't depend on the order the blocks were split in
+    numbers = {}
+    return [numbers.setdefault(block_of[state], len(numbers)) for state in range(states_count)]
+
+
+def reachable_states(automaton):
+    """States reachable from `automaton`, starting by it."""
+    # States are hashed by their `state` attribute, which is None for most NFA states, so they're tracked by id
+    nodes = [automaton]
+    visited = {id(automaton)}
+
+    for node in nodes:
+        for target in [target for targets in node.transitions.values() for target in targets] + list(
+                node.epsilon_transitions):
+            if id(target) not in visited:
+                visited.add(id(target))
+                nodes.append(target)
+
+    return nodes
+
+
 class State:
     def __init__(self, state, final=False, formatter=lambda x: str(x), shape='circle'):
         self.state = state
@@ -31,7 +189,7 @@ class State:
         return self
 
     def has_transition(self, symbol):
-        return symbol in self.transitions
+        return bool(self[symbol])
 
     def add_transition(self, symbol, state):
         try:
@@ -48,7 +206,6 @@ class State:
         states = self.epsilon_closure
         for symbol in string:
             states = self.move_by_state(symbol, *states)
-            states = self.epsilon_closure_by_state(*states)
         return any(s.final for s in states)
 
     def to_deterministic(self, formatter=lambda x: str(x)):
@@ -61,6 +218,8 @@ class State:
         while pending:
             state = pending.pop()
             symbols = {symbol for s in state.state for symbol in s.transitions}
+            if any(isinstance(symbol, CharClass) for symbol in symbols):
+                symbols = split_char_classes(symbols)
 
             for symbol in symbols:
                 closure = tuple(self.move_by_state(symbol, *state.state))
@@ -76,6 +235,35 @@ class State:
 
         return start
 
+    def minimize(self, key=lambda state: state.final):
+        """
+        Minimal DFA equivalent to this one, which must be deterministic. States for which `key` returns different
+        values are never merged, so passing the token a state recognizes keeps apart states that recognize different
+        tokens. Each state of the result keeps the `state` and `final` of one of the states merged into it.
+        """
+        nodes = reachable_states(self)
+        index = {id(node): i for i, node in enumerate(nodes)}
+
+        symbols = {}
+        for node in nodes:
+            for symbol in node.transitions:
+                symbols.setdefault(symbol, len(symbols))
+
+        table = [{symbols[symbol]: index[id(targets[0])] for symbol, targets in node.transitions.items()}
+                 for node in nodes]
+        blocks = hopcroft_partition(len(nodes), len(symbols), lambda state, symbol: table[state].get(symbol, -1),
+                                    [key(node) for node in nodes])
+
+        representatives = {}
+        for i, block in enumerate(blocks):
+            representatives.setdefault(block, nodes[i])
+
+        states = [State(node.state, node.final, node.formatter, node.shape) for node in representatives.values()]
+        for block, node in representatives.items():
+            for symbol, targets in node.transitions.items():
+                states[block].add_transition(symbol, states[blocks[index[id(targets[0])]]])
+
+        return states[0]
 
     @staticmethod
     def from_nfa(nfa, get_states=False):
@@ -134,10 +322,18 @@ class State:
     def __getitem__(self, symbol):
         if symbol == '':
             return self.epsilon_transitions
-        try:
-            return self.transitions[symbol]
-        except KeyError:
-            return None
+
+        targets = self.transitions.get(symbol)
+
+        # Transitions labelled with a class also apply to its characters and to the classes it contains, which are
+        # looked up by their first character because `split_char_classes` never returns overlapping classes
+        char = chr(symbol.ranges[0][0]) if isinstance(symbol, CharClass) and symbol.ranges else symbol
+        if isinstance(char, str) and len(char) == 1:
+            for label, destinations in self.transitions.items():
+                if label != symbol and isinstance(label, CharClass) and char in label:
+                    targets = (targets or []) + destinations
+
+        return targets
 
     def __setitem__(self, symbol, value):
         if symbol == '':
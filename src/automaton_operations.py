@@ -1,4 +1,4 @@
-from src.automaton import State
+from src.automaton import State, CharClass
 
 
 def build_basic_nfa(symbol):
@@ -12,6 +12,19 @@ def build_basic_nfa(symbol):
     return initial, final
 
 
+def build_char_class_nfa(char_class: CharClass):
+    # A class with a single character is just that character, so it doesn't need a range-labelled transition
+    symbol = char_class.single_char
+    if symbol is not None:
+        return build_basic_nfa(symbol)
+
+    initial = State(None)
+    final = State(None, final=True)
+
+    initial.add_transition(char_class, final)
+    return initial, final
+
+
 def join_nfas(nfa1: tuple[State, State], nfa2: tuple[State, State]):
     initial = State(None)
     final = State(None, final=True)
@@ -48,3 +61,54 @@ def kleene_closure(nfa: tuple[State, State]):
     nfa[1].add_epsilon_transition(final)
 
     return initial, final
+
+
+def positive_closure(nfa: tuple[State, State]):
+    initial = State(None)
+    final = State(None, final=True)
+
+    initial.add_epsilon_transition(nfa[0])
+
+    nfa[1].final = False
+
+    nfa[1].add_epsilon_transition(nfa[0])
+    nfa[1].add_epsilon_transition(final)
+
+    return initial, final
+
+
+def optional_nfa(nfa: tuple[State, State]):
+    initial = State(None)
+    final = State(None, final=True)
+
+    initial.add_epsilon_transition(nfa[0])
+    initial.add_epsilon_transition(final)
+
+    nfa[1].final = False
+
+    nfa[1].add_epsilon_transition(final)
+
+    return initial, final
+
+
+def copy_nfa(nfa: tuple[State, State]):
+    initial, final = nfa
+    copies = {id(initial): State(initial.state, initial.final, initial.formatter, initial.shape)}
+    pending = [initial]
+
+    # States are tracked by id because NFA states are hashed by their `state`, which is usually None
+    while pending:
+        state = pending.pop()
+        copy = copies[id(state)]
+
+        for target in [target for targets in state.transitions.values() for target in targets] + list(
+                state.epsilon_transitions):
+            if id(target) not in copies:
+                copies[id(target)] = State(target.state, target.final, target.formatter, target.shape)
+                pending.append(target)
+
+        for symbol, targets in state.transitions.items():
+            copy.transitions[symbol] = [copies[id(target)] for target in targets]
+        copy.epsilon_transitions = {copies[id(target)] for target in state.epsilon_transitions}
+
+    return copies[id(initial)], copies[id(final)]
@@ -0,0 +1,20 @@
+"""
+Generates the module with the HULK lexer tables, which `HulkLexer` imports instead of building them as long as it was
+generated from the current tokens. Run it again whenever the tokens change.
+
+Usage: python -m src.lexer.generate_hulk_lexer_tables
+"""
+from src.lexer.hulk_lexer import HulkLexer, HULK_LEXER_TABLES_MODULE_PATH, hulk_lexer_fingerprint
+from src.lexer.lexer_table import tables_module_source
+
+
+def generate_hulk_lexer_tables(path=HULK_LEXER_TABLES_MODULE_PATH):
+    lexer = HulkLexer(rebuild=True)
+    source = tables_module_source(hulk_lexer_fingerprint(), [lexer.lexer_table, lexer.synchronizing_lexer_table],
+                                  'python -m src.lexer.generate_hulk_lexer_tables')
+    path.write_text(source)
+
+
+if __name__ == '__main__':
+    generate_hulk_lexer_tables()
+    print(f'Generated {HULK_LEXER_TABLES_MODULE_PATH}')
@@ -1,18 +1,22 @@
-import sys
-
-import dill
+import os
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from types import MappingProxyType
 
 import src.hulk_grammar.hulk_grammar as hulk_grammar
 from src.errors import HulkLexicographicError
 from src.lexer.hulk_token_types import TokenType
-from src.lexer.lexer import Lexer
+from src.lexer.lexer import Lexer, read_chunks, CHUNK_SIZE
+from src.lexer.lexer_table import tables_fingerprint, load_tables, save_tables, load_tables_module
+from src.lexer.token_stream import TokenStream
 from src.utils import Token
 
 operators = [
     ("{", TokenType.OPEN_BRACKET), ("}", TokenType.CLOSE_BRACKET), (";", TokenType.SEMICOLON),
     ("\\(", TokenType.OPEN_PAREN), ("\\)", TokenType.CLOSE_PAREN), ("=>", TokenType.ARROW), (",", TokenType.COMMA),
     ("=", TokenType.ASSIGMENT), (":=", TokenType.DEST_ASSIGMENT),
-    ("+", TokenType.PLUS), ("-", TokenType.MINUS), ("\\*", TokenType.STAR), ("/", TokenType.DIV),
+    ("\\+", TokenType.PLUS), ("-", TokenType.MINUS), ("\\*", TokenType.STAR), ("/", TokenType.DIV),
     ("^", TokenType.POWER), ("%", TokenType.MOD), ("\\*\\*", TokenType.POWER2),
     ("==", TokenType.EQ), ("!=", TokenType.NEQ), ("<=", TokenType.LEQ), (">=", TokenType.GEQ),
     ("<", TokenType.LT), (">", TokenType.GT), ("&", TokenType.AND), ("\\|", TokenType.OR),
@@ -20,81 +24,234 @@ operators = [
     (":", TokenType.COLON), ("\\|\\|", TokenType.DOUBLE_BAR), ("\\[", TokenType.OPEN_SQUARE_BRACKET),
     ("\\]", TokenType.CLOSE_SQUARE_BRACKET)]
 
-reserved_words = [("let", TokenType.LET), ("in", TokenType.IN),
-                  ("if", TokenType.IF), ("else", TokenType.ELSE), ("elif", TokenType.ELIF),
-                  ("function", TokenType.FUNCTION),
-                  ("while", TokenType.WHILE), ("for", TokenType.FOR),
-                  ("new", TokenType.NEW), ("is", TokenType.IS), ("as", TokenType.AS),
-                  ("protocol", TokenType.PROTOCOL), ("extends", TokenType.EXTENDS),
-                  ("type", TokenType.TYPE), ("inherits", TokenType.INHERITS), ("base", TokenType.BASE),
-                  ("true|false", TokenType.BOOLEAN), ("PI", TokenType.PI)]
+# Keywords are recognized as identifiers and then looked up here, so they don't add states to the automaton
+reserved_words = MappingProxyType({
+    "let": TokenType.LET, "in": TokenType.IN,
+    "if": TokenType.IF, "else": TokenType.ELSE, "elif": TokenType.ELIF,
+    "function": TokenType.FUNCTION,
+    "while": TokenType.WHILE, "for": TokenType.FOR,
+    "new": TokenType.NEW, "is": TokenType.IS, "as": TokenType.AS,
+    "protocol": TokenType.PROTOCOL, "extends": TokenType.EXTENDS,
+    "type": TokenType.TYPE, "inherits": TokenType.INHERITS, "base": TokenType.BASE,
+    "true": TokenType.BOOLEAN, "false": TokenType.BOOLEAN, "PI": TokenType.PI})
 
-nonzero_digits = '|'.join(str(n) for n in range(1, 10))
-digits = '|'.join(str(n) for n in range(10))
-lower_letters = '|'.join(chr(n) for n in range(ord('a'), ord('z') + 1))
-upper_letters = '|'.join(chr(n) for n in range(ord('A'), ord('Z') + 1))
+# Characters allowed in string literals: printable ASCII and Latin-1 characters but the quote and the soft hyphen
+string_char = '[ -!#-~\\xa1-\\xac\\xae-\\xff]'
 
-string_regex = "\"(\\\\\"|\\x00|\\x01|\\x02|\\x03|\\x04|\\x05|\\x06|\\x07|\\x08|\\t|\\n|\\x0b|\\x0c|\\r|\\x0e|\\x0f|\\x10|\\x11|\\x12|\\x13|\\x14|\\x15|\\x16|\\x17|\\x18|\\x19|\\x1a|\\x1b|\\x1c|\\x1d|\\x1e|\\x1f| |!|#|$|%|&|\'|\\(|\\)|\\*|+|,|-|.|/|0|1|2|3|4|5|6|7|8|9|:|;|<|=|>|?|@|A|B|C|D|E|F|G|H|I|J|K|L|M|N|O|P|Q|R|S|T|U|V|W|X|Y|Z|[|\\\\|]|^|_|`|a|b|c|d|e|f|g|h|i|j|k|l|m|n|o|p|q|r|s|t|u|v|w|x|y|z|{|\\||}|~|\\x7f|\\x80|\\x81|\\x82|\\x83|\\x84|\\x85|\\x86|\\x87|\\x88|\\x89|\\x8a|\\x8b|\\x8c|\\x8d|\\x8e|\\x8f|\\x90|\\x91|\\x92|\\x93|\\x94|\\x95|\\x96|\\x97|\\x98|\\x99|\\x9a|\\x9b|\\x9c|\\x9d|\\x9e|\\x9f|\\xa0|¡|¢|£|¤|¥|¦|§|¨|©|ª|«|¬|\\xad|®|¯|°|±|²|³|´|µ|¶|·|¸|¹|º|»|¼|½|¾|¿|À|Á|Â|Ã|Ä|Å|Æ|Ç|È|É|Ê|Ë|Ì|Í|Î|Ï|Ð|Ñ|Ò|Ó|Ô|Õ|Ö|×|Ø|Ù|Ú|Û|Ü|Ý|Þ|ß|à|á|â|ã|ä|å|æ|ç|è|é|ê|ë|ì|í|î|ï|ð|ñ|ò|ó|ô|õ|ö|÷|ø|ù|ú|û|ü|ý|þ|ÿ)*\""
+string_regex = f'"(\\\\"|{string_char})*"'
 
-unterminated_string_regex = "\"(\\x00|\\x01|\\x02|\\x03|\\x04|\\x05|\\x06|\\x07|\\x08|\\t|\\n|\\x0b|\\x0c|\\r|\\x0e|\\x0f|\\x10|\\x11|\\x12|\\x13|\\x14|\\x15|\\x16|\\x17|\\x18|\\x19|\\x1a|\\x1b|\\x1c|\\x1d|\\x1e|\\x1f| |!|#|$|%|&|\'|\\(|\\)|\\*|+|,|-|.|/|0|1|2|3|4|5|6|7|8|9|:|;|<|=|>|?|@|A|B|C|D|E|F|G|H|I|J|K|L|M|N|O|P|Q|R|S|T|U|V|W|X|Y|Z|[|\\\\|]|^|_|`|a|b|c|d|e|f|g|h|i|j|k|l|m|n|o|p|q|r|s|t|u|v|w|x|y|z|{|\\||}|~|\\x7f|\\x80|\\x81|\\x82|\\x83|\\x84|\\x85|\\x86|\\x87|\\x88|\\x89|\\x8a|\\x8b|\\x8c|\\x8d|\\x8e|\\x8f|\\x90|\\x91|\\x92|\\x93|\\x94|\\x95|\\x96|\\x97|\\x98|\\x99|\\x9a|\\x9b|\\x9c|\\x9d|\\x9e|\\x9f|\\xa0|¡|¢|£|¤|¥|¦|§|¨|©|ª|«|¬|\\xad|®|¯|°|±|²|³|´|µ|¶|·|¸|¹|º|»|¼|½|¾|¿|À|Á|Â|Ã|Ä|Å|Æ|Ç|È|É|Ê|Ë|Ì|Í|Î|Ï|Ð|Ñ|Ò|Ó|Ô|Õ|Ö|×|Ø|Ù|Ú|Û|Ü|Ý|Þ|ß|à|á|â|ã|ä|å|æ|ç|è|é|ê|ë|ì|í|î|ï|ð|ñ|ò|ó|ô|õ|ö|÷|ø|ù|ú|û|ü|ý|þ|ÿ)*"
+unterminated_string_regex = f'"{string_char}*'
 
-number_regex = '|'.join([f"({nonzero_digits})({digits})*",
-                         f"({nonzero_digits})({digits})*.({digits})({digits})*",
-                         f"0.({digits})({digits})*",
-                         "0"])
+number_regex = '[1-9][0-9]*|[1-9][0-9]*.[0-9]+|0.[0-9]+|0'
 
-identifier_regex = f"(_|{upper_letters}|{lower_letters})(_|{upper_letters}|{lower_letters}|{digits})*"
+identifier_regex = '[_A-Za-z][_A-Za-z0-9]*'
 
-hulk_tokens = operators + reserved_words + [
+hulk_tokens = operators + [
     (number_regex, TokenType.NUMBER), (identifier_regex, TokenType.IDENTIFIER),
     (string_regex, TokenType.STRING), (unterminated_string_regex, TokenType.UNTERMINATED_STRING),
-    ("  *", TokenType.SPACES), ("\n|\t", TokenType.ESCAPED_CHAR)
+    (" +", TokenType.SPACES), ("[\\n\\t]", TokenType.ESCAPED_CHAR)
 ]
 
 # Tokens that are going to be used to synchronize the lexer when an error occurs
-hulk_lexer_synchronizing_tokens = [("  *", TokenType.SPACES), ("\n|\t", TokenType.ESCAPED_CHAR)] + operators
+hulk_lexer_synchronizing_tokens = [(" +", TokenType.SPACES), ("[\\n\\t]", TokenType.ESCAPED_CHAR)] + operators
+
+
+# Cache of the compiled lexer tables, rebuilt whenever the token tables above change
+HULK_LEXER_TABLES_PATH = Path(__file__).parent / 'hulk_lexer_tables.bin'
+
+# Module generated ahead of time with the lexer tables, see `generate_hulk_lexer_tables.py`
+HULK_LEXER_TABLES_MODULE_PATH = Path(__file__).parent / 'hulk_lexer_tables.py'
+
+
+def hulk_lexer_fingerprint():
+    return tables_fingerprint(hulk_tokens, hulk_lexer_synchronizing_tokens)
+
+
+def load_generated_tables(fingerprint):
+    """Tables of the generated module, or None if it doesn't exist or it was generated from other tokens."""
+    try:
+        from src.lexer import hulk_lexer_tables
+    except ImportError:
+        return None
+    return load_tables_module(hulk_lexer_tables, fingerprint)
 
 
 class HulkLexer(Lexer):
-    def __init__(self, rebuild=False, convert_to_dfa=False, save=False) -> None:
-        super().__init__(hulk_tokens, hulk_grammar.G.EOF, rebuild, convert_to_dfa, hulk_lexer_synchronizing_tokens)
-
-        if not rebuild:
-            try:
-                with open('src/lexer/hulk_lexer.pkl', 'rb') as automaton_pkl:
-                    self.automaton = dill.load(automaton_pkl)
-                with open('src/lexer/hulk_lexer_synchronizing.pkl', 'rb') as synchronizing_automaton_pkl:
-                    self.synchronizing_automaton = dill.load(synchronizing_automaton_pkl)
-            except:
-                super().__init__(hulk_tokens, hulk_grammar.G.EOF, True, convert_to_dfa, hulk_lexer_synchronizing_tokens)
-
-        if save:
-            sys.setrecursionlimit(10000)
-
-            with open('src/lexer/hulk_lexer.pkl', 'wb') as automaton_pkl:
-                dill.dump(self.automaton, automaton_pkl)
-            with open('src/lexer/hulk_lexer_synchronizing.pkl', 'wb') as synchronizing_automaton_pkl:
-                dill.dump(self.synchronizing_automaton, synchronizing_automaton_pkl)
+    def __init__(self, rebuild=False, convert_to_dfa=False, save=False, use_tables=True, minimize=True) -> None:
+        super().__init__(hulk_tokens, hulk_grammar.G.EOF, synchronizing_tokens=hulk_lexer_synchronizing_tokens,
+                         keywords=reserved_words)
+
+        fingerprint = hulk_lexer_fingerprint()
+
+        # Only the minimized tables are generated or cached
+        if use_tables and minimize and not rebuild:
+            tables = load_generated_tables(fingerprint)
+            if tables is None:
+                tables = load_tables(HULK_LEXER_TABLES_PATH, fingerprint)
+            if tables is not None:
+                self.lexer_table, self.synchronizing_lexer_table = tables
+                return
+
+        super().__init__(hulk_tokens, hulk_grammar.G.EOF, True, convert_to_dfa, hulk_lexer_synchronizing_tokens,
+                         use_tables, minimize, reserved_words)
+
+        if (use_tables and minimize) or save:
+            if use_tables and minimize:
+                tables = [self.lexer_table, self.synchronizing_lexer_table]
+            else:
+                tables = self.build_tables(self.automaton, self.synchronizing_automaton, True)
+            save_tables(HULK_LEXER_TABLES_PATH, fingerprint, tables)
 
     @staticmethod
     def report_errors(tokens):
         errors = []
         for token in tokens:
-            if not token.is_valid:
-                error_text = HulkLexicographicError.UNKNOWN_TOKEN % token.lex
-                errors.append(HulkLexicographicError(error_text, token.row, token.column))
-            elif token.token_type == TokenType.UNTERMINATED_STRING:
-                error_text = HulkLexicographicError.UNTERMINATED_STRING % token.lex
-                errors.append(HulkLexicographicError(error_text, token.row, token.column))
+            error = HulkLexer._token_error(token.lex, token.token_type if token.is_valid else None, token.row,
+                                           token.column)
+            if error is not None:
+                errors.append(error)
         return errors
 
+    @staticmethod
+    def _token_error(lex, token_type, row, column):
+        if token_type is None:
+            return HulkLexicographicError(HulkLexicographicError.UNKNOWN_TOKEN % lex, row, column)
+        if token_type == TokenType.UNTERMINATED_STRING:
+            return HulkLexicographicError(HulkLexicographicError.UNTERMINATED_STRING % lex, row, column)
+        return None
+
+    def _filter(self, tokens, errors, offset=0):
+        """
+        Turns the tokens produced by the automaton into the ones the parser reads: whitespace and invalid tokens are
+        dropped, with the errors they cause appended to `errors`, and PI is replaced by its value. The offset of each
+        token in the text, from `offset` on, is yielded along with it.
+        """
+        for lex, token_type, row, column in tokens:
+            if token_type is None or token_type == TokenType.UNTERMINATED_STRING:
+                errors.append(self._token_error(lex, token_type, row, column))
+            elif token_type == TokenType.PI:
+                yield '3.141592', TokenType.NUMBER, row, column, offset
+            elif token_type != TokenType.SPACES and token_type != TokenType.ESCAPED_CHAR:
+                yield lex, token_type, row, column, offset
+            offset += len(lex)
+
+    def stream(self, source, errors, chunk_size=CHUNK_SIZE):
+        """
+        Yields the same tokens as calling the lexer on the text of `source`, as the source is read, and appends the
+        errors to `errors` as they're found. `source` is a path, a file object or a buffer such as an `mmap`, see
+        `read_chunks`.
+        """
+        for lex, token_type, row, column, _ in self._filter(self.tokenize_stream(read_chunks(source, chunk_size)),
+                                                            errors):
+            yield Token(lex, token_type, row, column)
+
+    def lex_file(self, path):
+        """Tokens and errors of the file in `path`."""
+        with open(path) as f:
+            return self(f.read())
+
+    def lex_files(self, paths, workers=None):
+        """
+        Tokens and errors of each file in `paths`, in the same order. The files are lexed in parallel by a pool of
+        `workers` processes, as many as CPUs by default, each with a lexer of its own. With a single worker they're lexed
+        in this process instead. If a file can't be read, the error is raised once the results before it are collected.
+        """
+        paths = list(paths)
+        workers = workers or os.cpu_count() or 1
+        if workers == 1 or len(paths) <= 1:
+            return [self.lex_file(path) for path in paths]
+
+        chunk_size = max(1, len(paths) // (4 * workers))
+        with ProcessPoolExecutor(workers, initializer=_initialize_worker) as executor:
+            return [_from_worker(*result) for result in executor.map(_lex_file_in_worker, paths, chunksize=chunk_size)]
+
+    def filter_tokens(self, tokens):
+        """
+        Tokens and errors of the text of `tokens`, a stream returned by `token_stream` and maybe updated by `relex`, as
+        returned by calling the lexer on it.
+        """
+        return self._filtered_stream(tokens.source, ((tokens.lex(i), tokens.token_type(i), tokens.row(i),
+                                                      tokens.columns[i]) for i in range(len(tokens))))
+
+    def refilter(self, tokens, filtered, errors, start, replaced, added):
+        """
+        Updates `filtered` and `errors`, returned by `filter_tokens(tokens)`, after `relex` replaced `replaced` tokens
+        of `tokens` from `start` by `added` ones. Returns the range of `filtered` that changed in the same way.
+        """
+        shift = len(tokens.source) - len(filtered.source)
+        begin = tokens.offset(start)
+        new_errors = []
+        relexed = ((tokens.lex(i), tokens.token_type(i), tokens.row(i), tokens.columns[i])
+                   for i in range(start, start + added))
+        new_tokens = [(token_type, offset, row, column, lex, offset + len(lex))
+                      for lex, token_type, row, column, offset in self._filter(relexed, new_errors, begin)]
+        filtered_start = filtered.index_at(begin - 1) + 1
+        first_error = bisect_left(errors, (tokens.row(start), tokens.columns[start]), key=_position)
+
+        after = start + added
+        if after == len(tokens):
+            # The new tokens reached the end of file
+            filtered_stop = len(filtered)
+            filtered.splice(filtered_start, filtered_stop, new_tokens, tokens.source, 0, 0)
+            errors[first_error:] = new_errors
+            return filtered_start, filtered_stop - filtered_start, len(new_tokens)
+
+        # The tokens after the new ones are shifted as `relex` shifted them: all of them by the same number of rows, and
+        # the ones in the line of the token after the new ones by the same number of columns
+        old_end = tokens.offset(after) - shift
+        filtered_stop = filtered.index_at(old_end - 1) + 1
+        row_shift = tokens.row(tokens.index_at(filtered.offset(filtered_stop) + shift)) - filtered.row(filtered_stop)
+        line = tokens.row(after)
+        column_shift = 0
+        if after < len(tokens) - 1:
+            column_shift = tokens.columns[after] - (old_end - filtered.source.rfind('\n', 0, old_end))
+
+        last_error = bisect_left(errors, (line - row_shift, tokens.columns[after] - column_shift), key=_position)
+        for error in errors[last_error:]:
+            if error.line == line - row_shift:
+                error.column += column_shift
+            error.line += row_shift
+        errors[first_error: last_error] = new_errors
+
+        filtered.splice(filtered_start, filtered_stop, new_tokens, tokens.source, shift, row_shift)
+        i = filtered_start + len(new_tokens)
+        while i < len(filtered) and filtered.row(i) == line:
+            filtered.columns[i] += column_shift
+            i += 1
+        return filtered_start, filtered_stop - filtered_start, len(new_tokens)
+
+    def _filtered_stream(self, text, tokens):
+        errors = []
+        filtered = TokenStream(text)
+        for lex, token_type, row, column, offset in self._filter(tokens, errors):
+            filtered.append(token_type, offset, row, column, lex)
+        return filtered, errors
+
     def __call__(self, text):
-        tokens = super().__call__(text)
-        errors = self.report_errors(tokens)
-        tokens = [
-            token if token.token_type != TokenType.PI else Token('3.141592', TokenType.NUMBER, token.row, token.column)
-            for token in tokens]
-        filtered_tokens = [token for token in tokens if token.is_valid and
-                           token.token_type not in [TokenType.SPACES, TokenType.ESCAPED_CHAR,
-                                                    TokenType.UNTERMINATED_STRING]]
-        return filtered_tokens, errors
+        return self._filtered_stream(text, self._tokenize(text))
+
+
+def _position(error):
+    return error.line, error.column
+
+
+# Lexer of each process of the pool used by `HulkLexer.lex_files`, which loads its tables once
+_worker_lexer = None
+
+
+def _initialize_worker():
+    global _worker_lexer
+    _worker_lexer = HulkLexer()
+
+
+def _lex_file_in_worker(path):
+    tokens, errors = _worker_lexer.lex_file(path)
+    # The end of file is a symbol of the grammar and the errors take more than their text to be built, so neither can be
+    # pickled. They're sent as plain values and built again by `_from_worker`
+    tokens.replace_type(hulk_grammar.G.EOF, None)
+    return tokens, [(error.text, error.line, error.column) for error in errors]
+
+
+def _from_worker(tokens, errors):
+    tokens.replace_type(None, hulk_grammar.G.EOF)
+    return tokens, [HulkLexicographicError(text, line, column) for text, line, column in errors]
@@ -1,11 +1,51 @@
+import codecs
+import io
+import os
+
 from src.automaton import State
+from src.lexer.lexer_table import LexerTable, accepting_priority
+from src.lexer.token_stream import TokenStream
 from src.regex.regex_automaton import get_regex_automaton
 from src.utils import Token, UnknownToken
 
+CHUNK_SIZE = 1 << 16
+
+
+def read_chunks(source, chunk_size=CHUNK_SIZE):
+    """
+    Yields the text of `source` in chunks. `source` is either the path of a file, a file object opened in text or
+    binary mode, or a buffer such as `bytes` or an `mmap`. Bytes are decoded as UTF-8 and their line endings are
+    translated to '\\n', as when a file is opened in text mode.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source) as f:
+            yield from read_chunks(f, chunk_size)
+        return
+
+    decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder('utf-8')(), translate=True)
+
+    if hasattr(source, 'read'):
+        while chunk := source.read(chunk_size):
+            yield decoder.decode(chunk) if isinstance(chunk, (bytes, bytearray)) else chunk
+    else:
+        buffer = memoryview(source)
+        for start in range(0, len(buffer), chunk_size):
+            yield decoder.decode(buffer[start: start + chunk_size].tobytes())
+
+    yield decoder.decode(b'', final=True)
+
 
 class Lexer:
-    def __init__(self, table, eof, build_automaton=False, convert_to_dfa=False, synchronizing_tokens=None):
+    def __init__(self, table, eof, build_automaton=False, convert_to_dfa=False, synchronizing_tokens=None,
+                 use_tables=False, minimize=False, keywords=None):
         self.eof = eof
+        self.minimize = minimize
+        # Tokens whose lexeme is a keyword are of the keyword's token type instead of the one recognized
+        self.keywords = keywords if keywords is not None else {}
+        self.terminals = [terminal for _, terminal in table]
+
+        self.lexer_table = None
+        self.synchronizing_lexer_table = None
 
         if synchronizing_tokens is None:
             synchronizing_tokens = []
@@ -18,6 +58,35 @@ class Lexer:
                 self.automaton = self.automaton.to_deterministic()
                 self.synchronizing_automaton = self.synchronizing_automaton.to_deterministic()
 
+                if minimize:
+                    self.automaton = self.automaton.minimize(accepting_priority)
+                    self.synchronizing_automaton = self.synchronizing_automaton.minimize(accepting_priority)
+
+            if use_tables:
+                self.compile_tables()
+
+    def compile_tables(self):
+        """Compiles the automata into dense tables, which are used from now on instead of simulating them."""
+        tables = self.build_tables(self.automaton, self.synchronizing_automaton, self.minimize)
+        self.lexer_table, self.synchronizing_lexer_table = tables
+
+    @staticmethod
+    def build_tables(automaton, synchronizing_automaton, minimize):
+        """The main and the synchronizing tables of a lexer with the given automata."""
+        lexer_table = LexerTable.from_automaton(automaton)
+        synchronizing_lexer_table = LexerTable.from_automaton(synchronizing_automaton)
+
+        # Unknown tokens are matched by the main table if the synchronizing tokens allow it
+        with_error_state = lexer_table.with_error_state(synchronizing_lexer_table)
+        if with_error_state is not None:
+            lexer_table = with_error_state
+
+        if minimize:
+            lexer_table = lexer_table.minimize()
+            synchronizing_lexer_table = synchronizing_lexer_table.minimize()
+
+        return lexer_table, synchronizing_lexer_table
+
     @staticmethod
     def _build_automaton(table) -> State:
         start = State(None)
@@ -34,17 +103,17 @@ class Lexer:
         return start
 
     @staticmethod
-    def _get_new_row_col(text, start, end, row, col):
-        if end >= len(text):
-            return row, col
-
-        for j in range(start, end):
-            if text[j] == '\n':
-                row += 1
-                col = 1
-            else:
-                col += 1
-        return row, col
+    def _advance_position(text, start, end, row, line_start):
+        """
+        Row and offset of the beginning of the line after `text[start: end]`, given the ones before it. The lexeme is
+        scanned for line breaks with `str.count` and `str.rfind`, so keeping track of positions is linear in the text.
+        The column of a token starting at `start` is `start - line_start + 1`.
+        """
+        newlines = text.count('\n', start, end)
+        if newlines:
+            row += newlines
+            line_start = text.rfind('\n', start, end) + 1
+        return row, line_start
 
     def find_next_valid_token_after_an_error(self, text, start):
         i = start
@@ -56,9 +125,8 @@ class Lexer:
             new_states = set()
 
             for state in current_states:
-                if char in state.transitions:
-                    for new_state in state.transitions[char]:
-                        new_states.update(new_state.epsilon_closure)
+                for new_state in state[char] or []:
+                    new_states.update(new_state.epsilon_closure)
 
             current_states = new_states
 
@@ -88,21 +156,229 @@ class Lexer:
         return max_pos[0]
 
     def _tokenize(self, text):
+        if self.lexer_table is not None:
+            return self._tokenize_with_tables(text)
+        return self._tokenize_with_automaton(text)
+
+    def _tokenize_with_tables(self, text, start=0, row=1, line_start=0, stops=None):
+        table = self.lexer_table
+        terminals = self.terminals
+        keywords = self.keywords
+
+        n = len(text)
+
+        while start < n:
+            end, recognized, stop = table.scan(text, start)
+            if recognized < 0 and recognized != LexerTable.UNKNOWN:
+                end = self._synchronize(text, start + 1)
+                # Synchronizing may have read up to the end of the text
+                stop = n
+            # The position where the scan of each token stopped is added to `stops` before yielding it
+            if stops is not None:
+                stops.append(stop)
+
+            if recognized >= 0:
+                lex = text[start: end]
+                yield lex, keywords.get(lex, terminals[recognized]), row, start - line_start + 1
+            else:
+                # return an unknown token
+                yield text[start: end], None, row, start - line_start + 1
+
+            # The position isn't advanced past the last token, the end of file is in the line after the one it starts in
+            if end < n:
+                row, line_start = self._advance_position(text, start, end, row, line_start)
+            start = end
+
+        if stops is not None:
+            stops.append(n)
+        yield '$', self.eof, row + 1, 0
+
+    def token_stream(self, text):
+        """Every token of `text`, including whitespace, unknown tokens and the end of file, as a `TokenStream`."""
+        tokens = TokenStream(text)
+        # The streams of a lexer without tables are lexed again whole on every edit, how far it read isn't needed
+        stops = [] if self.lexer_table is not None else None
+        lexed = self._tokenize(text) if stops is None else self._tokenize_with_tables(text, stops=stops)
+        offset = 0
+        for lex, token_type, row, column in lexed:
+            tokens.append(token_type, offset, row, column, lex, stops[-1] if stops else None)
+            offset += len(lex)
+        return tokens
+
+    def relex(self, tokens, offset, deleted, inserted):
+        """Updates `tokens` after an edit, returning the first token replaced and how many were removed and added."""
+        source = tokens.source
+        text = source[:offset] + inserted + source[offset + deleted:]
+        if self.lexer_table is None:
+            new_tokens = self.token_stream(text)
+            replaced = len(tokens)
+            tokens.splice(0, replaced, [(new_tokens.token_type(i), new_tokens.offset(i), new_tokens.row(i),
+                                         new_tokens.columns[i], new_tokens.lex(i), new_tokens.reach(i))
+                                        for i in range(len(new_tokens))],
+                          text, 0, 0)
+            return 0, replaced, len(new_tokens)
+
+        # The token that contains the character before the edit may be extended by it, and the ones before it if
+        # recognizing any of them read that far
+        eof = len(tokens) - 1
+        start = max(tokens.index_at(offset - 1), 0)
+        while start > 0 and tokens.reach(start - 1) >= offset:
+            start -= 1
+
+        if start == eof:
+            # The text was empty
+            position, row, line_start = 0, 1, 0
+        else:
+            position = tokens.offset(start)
+            row = tokens.row(start)
+            line_start = position - tokens.columns[start] + 1
+
+        shift = len(inserted) - deleted
+        edit_end = offset + len(inserted)
+        # First old token that starts after the deleted text, where the new tokens may synchronize
+        old = tokens.index_at(offset + deleted - 1) + 1
+
+        new_tokens = []
+        stops = []
+        for lex, token_type, token_row, column in self._tokenize_with_tables(text, position, row, line_start, stops):
+            # Once a new token starts where an old one did after the edit, the rest of the tokens are the same
+            if position >= edit_end:
+                while old < eof and tokens.offset(old) < position - shift:
+                    old += 1
+                if old < eof and tokens.offset(old) == position - shift:
+                    row_shift = token_row - tokens.row(old)
+                    column_shift = column - tokens.columns[old]
+                    break
+            new_tokens.append((token_type, position, token_row, column, lex, stops[-1]))
+            position += len(lex)
+        else:
+            # The new tokens reached the end of the text, including the end of file
+            tokens.splice(start, eof + 1, new_tokens, text, 0, 0)
+            return start, eof + 1 - start, len(new_tokens)
+
+        tokens.splice(start, old, new_tokens, text, shift, row_shift)
+
+        # The tokens after the new ones are the same, but the new ones may have read further or less far than the ones
+        # they replaced. How far the lexer read is updated until it's the same as before the edit
+        i = start + len(new_tokens)
+        reach = tokens.reach(i - 1) if i else 0
+        while i < len(tokens):
+            token_offset = tokens.offset(i)
+            reach = max(reach, self._scan_stop(text, token_offset) if i < len(tokens) - 1 else token_offset)
+            if tokens.reaches[i] == reach - token_offset:
+                break
+            tokens.reaches[i] = reach - token_offset
+            i += 1
+
+        # Only the tokens in the line of the edit are moved to another column
+        if column_shift:
+            i = start + len(new_tokens)
+            line = tokens.row(i)
+            while i < len(tokens) and tokens.row(i) == line:
+                tokens.columns[i] += column_shift
+                i += 1
+        return start, old - start, len(new_tokens)
+
+    def _scan_stop(self, text, start):
+        """Position where the scan of the token at `start` stopped, as `_tokenize_with_tables` adds it to `stops`."""
+        _, recognized, stop = self.lexer_table.scan(text, start)
+        return stop if recognized >= 0 or recognized == LexerTable.UNKNOWN else len(text)
+
+    def tokenize_stream(self, chunks):
+        """
+        Yields the same tokens as `_tokenize` over the concatenation of `chunks`, as the chunks are read. Only the text
+        from the start of the token being recognized on is kept, and a token can span several chunks.
+        """
+        if self.lexer_table is None:
+            yield from self._tokenize(''.join(chunks))
+            return
+
+        table = self.lexer_table
+        terminals = self.terminals
+        keywords = self.keywords
+
+        buffer = ''
+        # `line_start` is relative to the start of the buffer, so it's negative if the line began in a previous chunk
+        row, line_start = 1, 0
+        last_row = row
+        chunks = iter(chunks)
+        done = False
+
+        while not done:
+            chunk = next(chunks, None)
+            if chunk is None:
+                done = True
+            else:
+                buffer += chunk
+
+            start = 0
+            n = len(buffer)
+
+            while start < n:
+                # A token that reaches the end of the buffer may continue in the next chunk
+                end, recognized, stop = table.scan(buffer, start)
+                if stop >= n and not done:
+                    break
+
+                if recognized < 0 and recognized != LexerTable.UNKNOWN:
+                    end = self._synchronize(buffer, start + 1)
+                    if end >= n and not done:
+                        break
+
+                lex = buffer[start: end]
+                token_type = keywords.get(lex, terminals[recognized]) if recognized >= 0 else None
+                yield lex, token_type, row, start - line_start + 1
+
+                last_row = row
+                row, line_start = self._advance_position(buffer, start, end, row, line_start)
+                start = end
+
+            buffer = buffer[start:]
+            line_start -= start
+
+        yield '$', self.eof, last_row + 1, 0
+
+    def _synchronize(self, text, start):
+        """Table based counterpart of `find_next_valid_token_after_an_error`."""
+        table = self.synchronizing_lexer_table
+        transitions, accepting, width = table.transitions, table.accepting, table.width
+
+        i = start
+        while i < len(text):
+            state = 0
+            j = i
+            while j < len(text):
+                column = table.column(text[j])
+                if column < 0:
+                    break
+                state = transitions[state * width + column]
+                if state < 0:
+                    break
+                if accepting[state] >= 0:
+                    return i
+                j += 1
+            else:
+                return len(text)
+
+            i = j + 1
+
+        return i
+
+    def _tokenize_with_automaton(self, text):
         max_pos = (0, None)
 
         current_states = self.automaton.epsilon_closure
         i = 0
 
-        row, col = 1, 1
+        row, line_start = 1, 0
 
         while i < len(text):
             char = text[i]
             new_states = set()
 
             for state in current_states:
-                if char in state.transitions:
-                    for new_state in state.transitions[char]:
-                        new_states.update(new_state.epsilon_closure)
+                for new_state in state[char] or []:
+                    new_states.update(new_state.epsilon_closure)
 
             current_states = new_states
 
@@ -121,9 +397,11 @@ class Lexer:
                             priority = state.state[0]
 
             if (len(current_states) == 0 or i + 1 == len(text)) and max_pos[1] is not None:
-                yield text[max_pos[0]: max_pos[1] + 1], max_pos[2], row, col
+                lex = text[max_pos[0]: max_pos[1] + 1]
+                yield lex, self.keywords.get(lex, max_pos[2]), row, max_pos[0] - line_start + 1
                 # update row and col
-                row, col = self._get_new_row_col(text, max_pos[0], max_pos[1] + 1, row, col)
+                if max_pos[1] + 1 < len(text):
+                    row, line_start = self._advance_position(text, max_pos[0], max_pos[1] + 1, row, line_start)
                 i = max_pos[1]
                 max_pos = (max_pos[1] + 1, None, None)
                 current_states = self.automaton.epsilon_closure
@@ -133,10 +411,11 @@ class Lexer:
                 i = self.find_next_valid_token_after_an_error(text, max_pos[0] + 1)
 
                 # return an unknown token
-                yield text[max_pos[0]: i], None, row, col
+                yield text[max_pos[0]: i], None, row, max_pos[0] - line_start + 1
 
                 # update row and col
-                row, col = self._get_new_row_col(text, max_pos[0], i, row, col)
+                if i < len(text):
+                    row, line_start = self._advance_position(text, max_pos[0], i, row, line_start)
                 max_pos = (i, None, None)
                 current_states = self.automaton.epsilon_closure
                 continue
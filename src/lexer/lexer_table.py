@@ -0,0 +1,387 @@
+import hashlib
+import struct
+import textwrap
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+from typing import Optional
+
+from src.automaton import State, CharClass, split_char_classes, hopcroft_partition, reachable_states
+from src.utils import little_endian, read_array, read_cache, write_cache
+
+# Bump it whenever the meaning of the tables or the layout of the cache file changes
+TABLES_FORMAT_VERSION = 5
+
+_MAGIC = b'HULKLEX'
+_COUNT = struct.Struct('<I')
+_TABLE_HEADER = struct.Struct('<III')
+
+
+class LexerTable:
+    """Dense DFA compiled from a lexer automaton, with a column for each class of equivalent characters."""
+
+    # Recognized in the error state, see `with_error_state`
+    UNKNOWN = -2
+
+    def __init__(self, transitions: array, accepting: array, ranges: list[tuple[int, int]], range_columns: array):
+        # The next state of a state on a character is `transitions[state * width + column(char)]`, -1 if there's none,
+        # and `accepting[state]` is the index in the token table of the token it recognizes, -1 if it isn't final
+        self.transitions = transitions
+        self.accepting = accepting
+        self.ranges = ranges
+        self.range_columns = range_columns
+        self.width = max(range_columns) + 1 if range_columns else 0
+
+        self.lows = [low for low, _ in ranges]
+
+        # Columns of the Latin-1 characters, which are most of the input, so they're found without a binary search
+        self.byte_columns = array('i', [-1]) * 256
+        for (low, high), column in zip(ranges, range_columns):
+            for code in range(low, min(high, 255) + 1):
+                self.byte_columns[code] = column
+
+    def column(self, char):
+        code = ord(char)
+        if code < 256:
+            return self.byte_columns[code]
+
+        i = bisect_right(self.lows, code) - 1
+        if i >= 0 and code <= self.ranges[i][1]:
+            return self.range_columns[i]
+        return -1
+
+    def statistics(self):
+        """Size of the table, and what its size would be with a column for each range of characters instead."""
+        itemsize = self.transitions.itemsize
+        return {
+            'states': self.states_count,
+            'ranges': len(self.ranges),
+            'classes': self.width,
+            'uncompressed_table_bytes': (self.states_count * len(self.ranges) + len(self.byte_columns)) * itemsize,
+            'table_bytes': (len(self.transitions) + len(self.byte_columns) + len(self.range_columns)) * itemsize,
+        }
+
+    @property
+    def states_count(self):
+        return len(self.accepting)
+
+    @staticmethod
+    def from_automaton(automaton: State) -> 'LexerTable':
+        """
+        Builds the table from the automaton returned by `Lexer._build_automaton`, either the NFA or the DFA obtained
+        from it with `State.to_deterministic`.
+        """
+        nodes = reachable_states(automaton)
+        index = {id(node): i for i, node in enumerate(nodes)}
+
+        moves = [[(symbol, index[id(target)]) for symbol, targets in node.transitions.items() for target in targets]
+                 for node in nodes]
+        epsilons = [[index[id(target)] for target in node.epsilon_transitions] for node in nodes]
+        priorities = [accepting_priority(node) for node in nodes]
+
+        # Only states with transitions or that recognize a token tell two sets of NFA states apart
+        important = [bool(moves[i]) or priorities[i] >= 0 for i in range(len(nodes))]
+        closures = {}
+
+        def closure(kernel):
+            try:
+                return closures[kernel]
+            except KeyError:
+                closures[kernel] = result = frozenset(
+                    state for state in _epsilon_closure(kernel, epsilons) if important[state])
+                return result
+
+        labels = {symbol for node_moves in moves for symbol, _ in node_moves}
+        parts = split_char_classes(labels)
+        ranges = [(ord(part), ord(part)) if isinstance(part, str) else part.ranges[0] for part in parts]
+
+        # Ranges in the same labels are equivalent, so the subset construction only looks at one column for all of them
+        label_columns = {label: set() for label in labels}
+        signatures = {}
+        range_columns = array('i')
+        for low, _ in ranges:
+            signature = frozenset(label for label in labels if _label_contains(label, low))
+            column = signatures.setdefault(signature, len(signatures))
+            range_columns.append(column)
+            for label in signature:
+                label_columns[label].add(column)
+        width = len(signatures)
+
+        start = closure(frozenset([0]))
+        ids = {start: 0}
+        pending = [start]
+        rows = []
+        accepting = array('i')
+
+        for current in pending:
+            row = array('i', [-1]) * width
+            targets = {}
+            for nfa_state in current:
+                for symbol, destination in moves[nfa_state]:
+                    for column in label_columns[symbol]:
+                        targets.setdefault(column, set()).add(destination)
+
+            for column, kernel in targets.items():
+                destination_set = closure(frozenset(kernel))
+                if destination_set not in ids:
+                    ids[destination_set] = len(ids)
+                    pending.append(destination_set)
+                row[column] = ids[destination_set]
+
+            recognized = [priorities[nfa_state] for nfa_state in current if priorities[nfa_state] >= 0]
+            accepting.append(min(recognized) if recognized else -1)
+            rows.append(row)
+
+        transitions = array('i')
+        for row in rows:
+            transitions.extend(row)
+
+        return LexerTable(transitions, accepting, ranges, range_columns)
+
+    def minimize(self) -> 'LexerTable':
+        """Equivalent table with the least number of states. States that recognize different tokens are never merged."""
+        transitions, width = self.transitions, self.width
+        blocks = hopcroft_partition(self.states_count, width, lambda state, column: transitions[state * width + column],
+                                    self.accepting)
+        representatives = {}
+        for state, block in enumerate(blocks):
+            representatives.setdefault(block, state)
+
+        # States are numbered in breadth first order, so equivalent automata always give the same table
+        numbers = {blocks[0]: 0}
+        pending = [blocks[0]]
+        for block in pending:
+            state = representatives[block]
+            for column in range(width):
+                target = transitions[state * width + column]
+                if target >= 0 and blocks[target] not in numbers:
+                    numbers[blocks[target]] = len(numbers)
+                    pending.append(blocks[target])
+
+        minimized = array('i', [-1]) * (len(numbers) * width)
+        accepting = array('i', [-1]) * len(numbers)
+        for block, number in numbers.items():
+            state = representatives[block]
+            accepting[number] = self.accepting[state]
+            for column in range(width):
+                target = transitions[state * width + column]
+                minimized[number * width + column] = numbers[blocks[target]] if target >= 0 else -1
+
+        return LexerTable(minimized, accepting, self.ranges, self.range_columns)
+
+    def with_error_state(self, synchronizing: 'LexerTable') -> Optional['LexerTable']:
+        """Equivalent table with an error state that recognizes `UNKNOWN` up to the next synchronizing token."""
+        # The end of an unknown token can only be told by a single character if every synchronizing token accepts it
+        sync_width = synchronizing.width
+        if any(target >= 0 and synchronizing.accepting[target] < 0 for target in synchronizing.transitions[:sync_width]):
+            return None
+
+        bounds = {0, CharClass.MAX_CODE_POINT + 1}
+        for low, high in self.ranges + synchronizing.ranges:
+            bounds.add(low)
+            bounds.add(high + 1)
+        bounds = sorted(bounds)
+
+        # Characters are split by their column in this table and whether they start a synchronizing token
+        signatures = {}
+        ranges = []
+        range_columns = array('i')
+        for low, next_low in zip(bounds, bounds[1:]):
+            sync_column = synchronizing.column(chr(low))
+            signature = (self.column(chr(low)), sync_column >= 0 and synchronizing.transitions[sync_column] >= 0)
+            column = signatures.setdefault(signature, len(signatures))
+            if range_columns and range_columns[-1] == column:
+                ranges[-1] = (ranges[-1][0], next_low - 1)
+            else:
+                ranges.append((low, next_low - 1))
+                range_columns.append(column)
+
+        width = len(signatures)
+        error = self.states_count
+        transitions = array('i', [-1]) * ((self.states_count + 1) * width)
+        for (old_column, synchronizes), column in signatures.items():
+            if old_column >= 0:
+                for state in range(self.states_count):
+                    transitions[state * width + column] = self.transitions[state * self.width + old_column]
+            # The characters no token starts with go to the error state, which consumes the ones no synchronizing
+            # token starts with
+            if transitions[column] < 0:
+                transitions[column] = error
+            if not synchronizes:
+                transitions[error * width + column] = error
+
+        accepting = array('i', self.accepting)
+        accepting.append(LexerTable.UNKNOWN)
+        return LexerTable(transitions, accepting, ranges, range_columns)
+
+    def to_bytes(self) -> bytes:
+        bounds = array('i', [bound for range_ in self.ranges for bound in range_])
+        return b''.join([_TABLE_HEADER.pack(self.states_count, len(self.ranges), self.width), little_endian(bounds),
+                         little_endian(self.range_columns), little_endian(self.accepting),
+                         little_endian(self.transitions)])
+
+    @staticmethod
+    def from_bytes(data: memoryview, offset=0) -> tuple['LexerTable', int]:
+        """Reads a table written by `to_bytes` starting at `offset`. Returns it and the offset right after it."""
+        states_count, ranges_count, width = _TABLE_HEADER.unpack_from(data, offset)
+        offset += _TABLE_HEADER.size
+
+        bounds, offset = read_array(data, offset, 2 * ranges_count)
+        range_columns, offset = read_array(data, offset, ranges_count)
+        accepting, offset = read_array(data, offset, states_count)
+        transitions, offset = read_array(data, offset, states_count * width)
+
+        if any(not 0 <= column < width for column in range_columns):
+            raise ValueError('Corrupted lexer table')
+
+        ranges = [(bounds[i], bounds[i + 1]) for i in range(0, len(bounds), 2)]
+        return LexerTable(transitions, accepting, ranges, range_columns), offset
+
+    def match(self, text, start):
+        """
+        Returns the end of the longest token that starts at `start` and the index of the token recognized, or
+        `(start, -1)` if there is no token starting there.
+        """
+        end, recognized, _ = self.scan(text, start)
+        return end, recognized
+
+    def scan(self, text, start):
+        """
+        Same as `match`, plus the position where the automaton stopped. If it's the end of the text, a longer token
+        could be recognized in a text that continues this one.
+        """
+        transitions, accepting, byte_columns, width = self.transitions, self.accepting, self.byte_columns, self.width
+
+        end, recognized = start, -1
+        state = 0
+        i = start
+        n = len(text)
+
+        while i < n:
+            code = ord(text[i])
+            column = byte_columns[code] if code < 256 else self.column(text[i])
+            if column < 0:
+                break
+            state = transitions[state * width + column]
+            if state < 0:
+                break
+            i += 1
+            if accepting[state] != -1:
+                end, recognized = i, accepting[state]
+
+        return end, recognized, i
+
+
+def _label_contains(label, code):
+    if isinstance(label, CharClass):
+        return chr(code) in label
+    return ord(label) == code
+
+
+def accepting_priority(node: State):
+    """Index in the token table of the token recognized in a state of a lexer automaton, or -1 if there is none."""
+    if not node.final:
+        return -1
+
+    # States of a DFA built with `to_deterministic` hold the NFA states they come from
+    if isinstance(node.state, tuple) and node.state and isinstance(node.state[0], State):
+        priorities = [nfa.state[0] for nfa in node.state if nfa.final]
+        return min(priorities) if priorities else -1
+
+    return node.state[0]
+
+
+def _epsilon_closure(kernel, epsilons):
+    closure = set(kernel)
+    pending = list(kernel)
+
+    while pending:
+        current = pending.pop()
+        for target in epsilons[current]:
+            if target not in closure:
+                closure.add(target)
+                pending.append(target)
+
+    return closure
+
+
+def tables_fingerprint(*token_tables) -> bytes:
+    """Digest of the token tables the lexer tables are built from, including the format version of the tables."""
+    digest = hashlib.sha256(str(TABLES_FORMAT_VERSION).encode())
+    for token_table in token_tables:
+        digest.update(repr([(regex, str(terminal)) for regex, terminal in token_table]).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.digest()
+
+
+def load_tables(path: Path, fingerprint: bytes):
+    """Returns the tables cached in `path`, or None if there's no cache or it was built from other token tables."""
+    data = read_cache(path, _MAGIC, TABLES_FORMAT_VERSION, fingerprint)
+    if data is None:
+        return None
+    try:
+        count, = _COUNT.unpack_from(data, 0)
+        tables = []
+        offset = _COUNT.size
+        for _ in range(count):
+            table, offset = LexerTable.from_bytes(data, offset)
+            tables.append(table)
+        return tables
+    except (ValueError, struct.error):
+        return None
+
+
+def save_tables(path: Path, fingerprint: bytes, tables):
+    """Writes the tables in `path`, for `load_tables`."""
+    write_cache(path, _MAGIC, TABLES_FORMAT_VERSION, fingerprint,
+                _COUNT.pack(len(tables)) + b''.join(table.to_bytes() for table in tables))
+
+
+def tables_module_source(fingerprint: bytes, tables, generator: str) -> str:
+    """
+    Source of a Python module with the tables as constants, so loading them is just importing it. `generator` is the
+    command that generates the module, which is written in its docstring.
+    """
+
+    def values(numbers, indent):
+        return textwrap.fill(', '.join(str(number) for number in numbers), width=120, initial_indent=indent,
+                             subsequent_indent=indent)
+
+    lines = ['"""',
+             f'Lexer tables generated by `{generator}`.',
+             'Don\'t edit this file, generate it again when the tokens change.',
+             '"""',
+             f'TABLES_FORMAT_VERSION = {TABLES_FORMAT_VERSION}',
+             f"FINGERPRINT = '{fingerprint.hex()}'",
+             '',
+             'TABLES = [']
+    for table in tables:
+        bounds = [bound for range_ in table.ranges for bound in range_]
+        lines.append('    {')
+        for name, numbers in [('transitions', table.transitions), ('accepting', table.accepting),
+                              ('bounds', bounds), ('range_columns', table.range_columns)]:
+            lines.append(f"        '{name}': (")
+            if numbers:
+                lines.append(values(numbers, ' ' * 12) + ',')
+            lines.append('        ),')
+        lines.append('    },')
+    lines.append(']')
+
+    return '\n'.join(lines) + '\n'
+
+
+def load_tables_module(module, fingerprint: bytes):
+    """Returns the tables of a module generated with `tables_module_source`, or None if they're for other tokens."""
+    try:
+        if module.TABLES_FORMAT_VERSION != TABLES_FORMAT_VERSION or module.FINGERPRINT != fingerprint.hex():
+            return None
+
+        tables = []
+        for table in module.TABLES:
+            bounds = table['bounds']
+            ranges = [(bounds[i], bounds[i + 1]) for i in range(0, len(bounds), 2)]
+            tables.append(LexerTable(array('i', table['transitions']), array('i', table['accepting']), ranges,
+                                     array('i', table['range_columns'])))
+        return tables
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return None
@@ -0,0 +1,217 @@
+from array import array
+
+from src.utils import Token
+
+
+class TokenStream:
+    """Tokens of a source text stored in parallel arrays, read as `TokenView` objects with the interface of `Token`."""
+    __slots__ = ('source', 'types', 'type_ids', 'offsets', 'lengths', 'rows', 'columns', 'reaches', '_type_indices',
+                 '_lexemes', '_shift_start', '_offset_shift', '_row_shift')
+
+    def __init__(self, source: str):
+        self.source = source
+        # Types are indices into `types`, and lexemes are only sliced from the source when asked for
+        self.types = []
+        self.type_ids = array('H')
+        self.offsets = array('I')
+        self.lengths = array('I')
+        self.rows = array('I')
+        self.columns = array('I')
+        # How far past the offset of each token the lexer read to recognize it and the tokens before it, which doesn't
+        # change when the token is shifted
+        self.reaches = array('I')
+
+        self._type_indices = {}
+        # Lexemes that aren't the text of the source at their offset, such as the end of file
+        self._lexemes = {}
+
+        # The offsets and rows of the tokens from `_shift_start` on are shifted by these when read, so an edit only
+        # updates the tokens between it and the previous one
+        self._shift_start = 0
+        self._offset_shift = 0
+        self._row_shift = 0
+
+    def append(self, token_type, offset, row, column, lex, stop=None):
+        try:
+            type_id = self._type_indices[token_type]
+        except KeyError:
+            type_id = self._type_indices[token_type] = len(self.types)
+            self.types.append(token_type)
+
+        if not self.source.startswith(lex, offset):
+            self._lexemes[len(self.type_ids)] = lex
+
+        # The position where the scan of the token stopped, which is past its end if it had to read ahead
+        reach = offset + len(lex) if stop is None else stop
+        if self.reaches:
+            reach = max(reach, self.reach(len(self.reaches) - 1))
+
+        self.type_ids.append(type_id)
+        self.offsets.append(offset - self._offset_shift)
+        self.lengths.append(len(lex))
+        self.rows.append(row - self._row_shift)
+        self.columns.append(column)
+        self.reaches.append(reach - offset)
+
+    def offset(self, index):
+        if index >= self._shift_start:
+            return self.offsets[index] + self._offset_shift
+        return self.offsets[index]
+
+    def row(self, index):
+        if index >= self._shift_start:
+            return self.rows[index] + self._row_shift
+        return self.rows[index]
+
+    def reach(self, index):
+        """Position up to which the lexer read the source to recognize the tokens up to `index`."""
+        return self.offset(index) + self.reaches[index]
+
+    def lex(self, index):
+        try:
+            return self._lexemes[index]
+        except KeyError:
+            offset = self.offset(index)
+            return self.source[offset: offset + self.lengths[index]]
+
+    def token_type(self, index):
+        return self.types[self.type_ids[index]]
+
+    def replace_type(self, token_type, new_type):
+        """Makes the tokens of type `token_type` be of type `new_type` instead, which mustn't be in the stream yet."""
+        type_id = self._type_indices.pop(token_type, None)
+        if type_id is not None:
+            self.types[type_id] = new_type
+            self._type_indices[new_type] = type_id
+
+    def map_types(self, mapping):
+        """Values of `mapping` for the type of each token, looking up each distinct type only once."""
+        values = [mapping[token_type] for token_type in self.types]
+        return [values[type_id] for type_id in self.type_ids]
+
+    def index_at(self, offset):
+        """Index of the last token that starts at or before `offset`, or -1 if there's none."""
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if self.offset(middle) <= offset:
+                low = middle + 1
+            else:
+                high = middle
+        return low - 1
+
+    def splice(self, start, stop, tokens, source, offset_shift, row_shift):
+        """
+        Replaces the tokens from `start` to `stop` by `tokens`, tuples of the arguments of `append`, including `stop`, in
+        the new `source`. The offsets and rows of the tokens after them are shifted by `offset_shift` and `row_shift`.
+        Only the tokens between the lazily shifted ones and the replaced ones are updated, the rest share the
+        accumulated shift.
+        """
+        reach = self.reach(start - 1) if start else 0
+        reaches = array('I')
+        for _, offset, _, _, _, token_stop in tokens:
+            reach = max(reach, token_stop)
+            reaches.append(reach - offset)
+
+        shift_start, offset_total, row_total = self._shift_start, self._offset_shift, self._row_shift
+        if shift_start > stop:
+            # The tokens between this edit and a previous one after it are only shifted by this one
+            self._shift_range(stop, shift_start, offset_shift, row_shift)
+        else:
+            if shift_start < start:
+                # The tokens between a previous edit and this one are shifted once and for all
+                self._shift_range(shift_start, start, offset_total, row_total)
+            shift_start = stop
+
+        added = len(tokens) - (stop - start)
+        self._shift_start = shift_start + added
+        self._offset_shift = offset_total + offset_shift
+        self._row_shift = row_total + row_shift
+
+        type_ids = array('H')
+        for token_type, *_ in tokens:
+            try:
+                type_ids.append(self._type_indices[token_type])
+            except KeyError:
+                type_ids.append(len(self.types))
+                self._type_indices[token_type] = len(self.types)
+                self.types.append(token_type)
+
+        self.source = source
+        self.type_ids[start: stop] = type_ids
+        self.offsets[start: stop] = array('I', [offset for _, offset, *_ in tokens])
+        self.lengths[start: stop] = array('I', [len(lex) for _, _, _, _, lex, _ in tokens])
+        self.rows[start: stop] = array('I', [row for _, _, row, *_ in tokens])
+        self.columns[start: stop] = array('I', [column for _, _, _, column, *_ in tokens])
+        self.reaches[start: stop] = reaches
+
+        lexemes = {}
+        for index, lex in self._lexemes.items():
+            if index < start:
+                lexemes[index] = lex
+            elif index >= stop:
+                lexemes[index + added] = lex
+        for index, (_, offset, _, _, lex, _) in enumerate(tokens, start):
+            if not source.startswith(lex, offset):
+                lexemes[index] = lex
+        self._lexemes = lexemes
+
+    def _shift_range(self, start, stop, offset_shift, row_shift):
+        if offset_shift:
+            self.offsets[start: stop] = array('I', [offset + offset_shift for offset in self.offsets[start: stop]])
+        if row_shift:
+            self.rows[start: stop] = array('I', [row + row_shift for row in self.rows[start: stop]])
+
+    def nbytes(self):
+        """Memory used by the arrays of the stream, which grows with the number of tokens."""
+        return sum(len(column) * column.itemsize for column in
+                   [self.type_ids, self.offsets, self.lengths, self.rows, self.columns, self.reaches])
+
+    def __len__(self):
+        return len(self.type_ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [TokenView(self, i) for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('token index out of range')
+        return TokenView(self, index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield TokenView(self, i)
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class TokenView(Token):
+    """A token of a `TokenStream`, whose attributes are read from the stream when asked for."""
+    __slots__ = ('stream', 'index')
+
+    def __init__(self, stream: TokenStream, index):
+        self.stream = stream
+        self.index = index
+
+    @property
+    def lex(self):
+        return self.stream.lex(self.index)
+
+    @property
+    def token_type(self):
+        return self.stream.token_type(self.index)
+
+    @property
+    def row(self):
+        return self.stream.row(self.index)
+
+    @property
+    def column(self):
+        return self.stream.columns[self.index]
+
+    @property
+    def is_valid(self):
+        return self.token_type is not None
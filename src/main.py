@@ -5,7 +5,6 @@ from pathlib import Path
 from lexer.hulk_lexer import HulkLexer
 from src.code_gen.code_generator import CCodeGenerator
 from src.errors import HulkIOError
-from src.evaluation import evaluate_reverse_parse
 from src.parser.hulk_parser import HulkParser
 from src.semantics.semantic_analysis_pipeline import semantic_analysis_pipeline
 
@@ -20,26 +19,23 @@ def run_pipeline(input_path: Path, output_path: Path):
     if not input_path.match('*.hulk'):
         raise HulkIOError(HulkIOError.INVALID_EXTENSION % input_path)
 
+    hulk_lexer = HulkLexer()
+
+    lexicographic_errors = []
     try:
-        with open(input_path) as f:
-            text = f.read()
+        tokens = list(hulk_lexer.stream(input_path, lexicographic_errors))
     except FileNotFoundError:
         error = HulkIOError(HulkIOError.ERROR_READING_FILE % input_path)
         print_error(error)
         return
 
-    hulk_lexer = HulkLexer(rebuild=True)
-    hulk_parser = HulkParser(rebuild=True)
-
-    tokens, lexicographic_errors = hulk_lexer(text)
-
     if lexicographic_errors:
         for err in lexicographic_errors:
             print_error(err)
         return
 
-    derivation, operations, syntactic_errors = hulk_parser(tokens)
-    ast = evaluate_reverse_parse(derivation, operations, tokens)
+    hulk_parser = HulkParser()
+    ast, syntactic_errors = hulk_parser.parse(tokens)
 
     if syntactic_errors:
         for err in syntactic_errors:
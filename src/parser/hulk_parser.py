@@ -1,46 +1,288 @@
-import sys
+from bisect import bisect_left
+from itertools import accumulate
+from pathlib import Path
 from typing import List
 
-import dill
-
+import src.hulk_grammar.hulk_ast_nodes as hulk_ast_nodes
 import src.hulk_grammar.hulk_grammar as hulk_grammar
 from src.errors import HulkSyntacticError
 from src.lexer.hulk_token_types import TokenType
-from src.parsing import LR1Parser, ParserError
+from src.lexer.token_stream import TokenStream
+from src.parsing import LR1Parser, LALR1Parser, ParserError, build_LALR1_automaton, grammar_fingerprint, \
+    load_parse_table, save_parse_table
 from src.utils import Token
 
+# Next to this module, so every compile finds them wherever it's run from
+HULK_PARSER_TABLE_PATH = Path(__file__).parent / 'hulk_parser_table.bin'
+HULK_LALR_PARSER_TABLE_PATH = Path(__file__).parent / 'hulk_lalr_parser_table.bin'
+
+# The parser recovers from a syntactic error at the next end of an expression, or start of a declaration
+synchronizing_terminals = [hulk_grammar.semicolon, hulk_grammar.cbracket, hulk_grammar.cpar, hulk_grammar.function,
+                           hulk_grammar.word_type, hulk_grammar.protocol]
+
+declaration_keywords = hulk_grammar.function, hulk_grammar.word_type, hulk_grammar.protocol
+opening_terminals = hulk_grammar.opar, hulk_grammar.obracket, hulk_grammar.o_square_bracket
+closing_terminals = hulk_grammar.cpar, hulk_grammar.cbracket, hulk_grammar.c_square_bracket
+
+
+class DeclarationCache:
+    """Trees of the top-level declarations of the last program parsed with `HulkParser.parse_incremental`."""
+
+    def __init__(self):
+        # Text or lexemes of each declaration, and its tree, or None if it has to be parsed again
+        self.keys = []
+        self.nodes = []
+        # Number of tokens of each declaration of `tokens`, while it's the stream they were split from and has `size`
+        # tokens, so an edit of it only splits again the declarations around the edit
+        self.lengths = []
+        self.tokens = None
+        self.size = 0
+        # How many declarations of the last parse were taken from the cache and how many were parsed
+        self.reused = 0
+        self.parsed = 0
+
 
 class HulkParser(LR1Parser):
-    def __init__(self, rebuild=False, save=False):
-        if rebuild:
-            super().__init__(hulk_grammar.G)
+    def __init__(self, rebuild=False, save=False, lalr=False, recover=True, workers=1):
+        """Reads the compact table from its cache, building and caching it again if it's missing or out of date."""
+        self.lalr = lalr
+        self.recover = recover
+        table_path = HULK_LALR_PARSER_TABLE_PATH if lalr else HULK_PARSER_TABLE_PATH
+        fingerprint = grammar_fingerprint(hulk_grammar.G, self.grammar_class)
+
+        compact_table = None if rebuild else load_parse_table(table_path, fingerprint, hulk_grammar.G)
+        if compact_table is not None:
+            self.G = hulk_grammar.G
+            self.verbose = False
+            self.workers = workers
+            # Only the compact table is cached, the dict it was compiled from is built with `rebuild`
+            self.table = None
+            self.compact_table = compact_table
         else:
-            try:
-                with open('parser/hulk_parser_table.pkl', 'rb') as table_pkl:
-                    self.table = dill.load(table_pkl)
-                with open('parser/hulk_parser_verbose.pkl', 'rb') as verbose_pkl:
-                    self.verbose = dill.load(verbose_pkl)
-            except:
-                super().__init__(hulk_grammar.G)
-
-        if save:
-            sys.setrecursionlimit(10000)
-
-            with open('parser/hulk_parser_table.pkl', 'wb') as table_pkl:
-                dill.dump(self.table, table_pkl)
-            with open('parser/hulk_parser_verbose.pkl', 'wb') as verbose_pkl:
-                dill.dump(self.verbose, verbose_pkl)
+            super().__init__(hulk_grammar.G, workers=workers)
+            # A table built with `rebuild` is only cached if asked to
+            if save or not rebuild:
+                save_parse_table(table_path, fingerprint, self.compact_table, self.G)
+
+    @property
+    def grammar_class(self):
+        return LALR1Parser.grammar_class if self.lalr else LR1Parser.grammar_class
+
+    def _build_automaton(self, G):
+        return build_LALR1_automaton(G) if self.lalr else super()._build_automaton(G)
 
     def __call__(self, tokens: List[Token]):
+        w = self._terminals(tokens)
         try:
-            mapped_terminals = [tokens_terminals_map[t.token_type] for t in tokens]
-            derivation, operations = super().__call__(mapped_terminals)
+            derivation, operations = super().__call__(w)
             return derivation, operations, []
         except ParserError as e:
-            error_token = tokens[e.token_index]
-            error_text = HulkSyntacticError.PARSING_ERROR % error_token.lex
-            errors = [HulkSyntacticError(error_text, error_token.row, error_token.column)]
-            return None, None, errors
+            return None, None, self._syntactic_errors(tokens, w, e)
+
+    def parse(self, tokens: List[Token]):
+        """Abstract syntax tree of `tokens` and the syntactic errors, building the tree while parsing."""
+        lexeme = tokens.lex if isinstance(tokens, TokenStream) else lambda i: tokens[i].lex
+        w = self._terminals(tokens)
+        try:
+            return self.evaluate(w, lexeme), []
+        except ParserError as e:
+            return None, self._syntactic_errors(tokens, w, e)
+
+    def parse_incremental(self, tokens: List[Token], cache: DeclarationCache, edit=None):
+        """
+        Returns what `parse` does, reusing the trees in `cache` of the declarations whose tokens didn't change. `edit`
+        is the range of `tokens` replaced since the last parse with `cache`, as returned by `HulkLexer.refilter`.
+        """
+        if edit is not None and cache.tokens is tokens and cache.size + edit[2] - edit[1] == len(tokens):
+            return self._parse_edited(tokens, cache, *edit)
+
+        w = self._terminals(tokens)
+        spans = self._declaration_spans(w)
+        if spans is None:
+            cache.tokens = None
+            return self.parse(tokens)
+
+        keys = [self._declaration_key(tokens, start, end) for start, end in spans]
+        cached = dict(zip(cache.keys, cache.nodes))
+        # A declaration written twice is parsed again the second time, the same tree mustn't be twice in the program
+        nodes, seen = [], set()
+        for key in keys:
+            nodes.append(cached.get(key) if key not in seen else None)
+            seen.add(key)
+
+        lengths = [end - start for start, end in spans]
+        program, parsed = self._parse_declarations(tokens, w, lengths, nodes)
+        if program is None:
+            # The cache keeps the trees of the last program without errors
+            cache.tokens = None
+            return self.parse(tokens)
+
+        cache.keys = keys
+        cache.nodes = [node if self._reusable(node) else None for node in program.declarations]
+        cache.lengths, cache.tokens, cache.size = lengths, tokens, len(tokens)
+        cache.parsed = len(parsed)
+        cache.reused = len(nodes) - cache.parsed
+        return program, []
+
+    def _parse_edited(self, tokens, cache, start, replaced, added):
+        # The declarations are split again from the one before the edit, which may take a `;` after it, until one ends
+        # where an old one did after the edit. From there on the tokens and the declarations are the same
+        w = _Terminals(tokens)
+        shift = added - replaced
+        ends = list(accumulate(cache.lengths))
+        first = bisect_left(ends, start)
+        i = ends[first - 1] if first else 0
+        lengths = []
+        while True:
+            if i >= start + added:
+                last = bisect_left(ends, i - shift, first)
+                if last < len(ends) and ends[last] == i - shift:
+                    break
+            if w[i] not in declaration_keywords:
+                last = len(ends) - 1
+                break
+            end = self._declaration_end(w, i)
+            if end is None:
+                cache.tokens = None
+                return self.parse(tokens)
+            lengths.append(end - i)
+            i = end
+
+        # The declarations split again that didn't change keep their trees
+        old_nodes = {key: node for key, node in zip(cache.keys[first: last + 1], cache.nodes[first: last + 1])
+                     if node is not None}
+        keys = []
+        i = ends[first - 1] if first else 0
+        for length in lengths:
+            keys.append(self._declaration_key(tokens, i, i + length))
+            i += length
+        cache.lengths[first: last + 1] = lengths
+        cache.keys[first: last + 1] = keys
+        cache.nodes[first: last + 1] = [old_nodes.pop(key, None) for key in keys]
+        cache.size = len(tokens)
+
+        program, parsed = self._parse_declarations(tokens, w, cache.lengths, cache.nodes)
+        if program is None:
+            # The edited declarations are parsed again the next time
+            return self.parse(tokens)
+
+        for k in parsed:
+            node = program.declarations[k]
+            cache.nodes[k] = node if self._reusable(node) else None
+        cache.parsed = len(parsed)
+        cache.reused = len(cache.nodes) - cache.parsed
+        return program, []
+
+    def _parse_declarations(self, tokens, w, lengths, nodes):
+        """
+        Program of `tokens`, whose declarations have `lengths` tokens, parsing the ones without a node in `nodes` and
+        the main expression. Returns it, or None if it has errors, and the indices of the parsed declarations.
+        """
+        starts = list(accumulate(lengths, initial=0))
+        parsed = [k for k, node in enumerate(nodes) if node is None]
+        # A `;` after the declarations is an error, but it would be taken as the end of a function parsed before it
+        if w[starts[-1]] is hulk_grammar.semicolon:
+            return None, parsed
+        # The declarations and the main expression are parsed together as a single program
+        indices = [i for k in parsed for i in range(starts[k], starts[k + 1])]
+        indices.extend(range(starts[-1], len(tokens)))
+        lexeme = tokens.lex if isinstance(tokens, TokenStream) else lambda i: tokens[i].lex
+        try:
+            program = self.evaluate([w[i] for i in indices], lambda j: lexeme(indices[j]))
+        except ParserError:
+            return None, parsed
+
+        declarations = list(nodes)
+        for k, node in zip(parsed, program.declarations):
+            declarations[k] = node
+        program.declarations = declarations
+        return program, parsed
+
+    @staticmethod
+    def _declaration_spans(w):
+        """Start and end of each top-level declaration of `w`, or None if the brackets of one aren't balanced."""
+        spans = []
+        i = 0
+        while w[i] in declaration_keywords:
+            end = HulkParser._declaration_end(w, i)
+            if end is None:
+                return None
+            spans.append((i, end))
+            i = end
+        return spans
+
+    @staticmethod
+    def _declaration_end(w, start):
+        """End of the declaration of `w` that starts at `start`, or None if its brackets aren't balanced."""
+        # The declaration keywords can only start a declaration. A function ends at the `;` after the expression of its
+        # `=>` or at the brace closing its body, and the `;` that may follow it, a type or a protocol at that brace
+        i = start
+        depth = 0
+        while not (depth == 0 and (w[i] is hulk_grammar.obracket or
+                                   w[i] is hulk_grammar.arrow and w[start] is hulk_grammar.function)):
+            depth += (w[i] in opening_terminals) - (w[i] in closing_terminals)
+            i += 1
+            if depth < 0 or i == len(w):
+                return None
+
+        end = hulk_grammar.semicolon if w[i] is hulk_grammar.arrow else hulk_grammar.cbracket
+        while True:
+            depth += (w[i] in opening_terminals) - (w[i] in closing_terminals)
+            if depth == 0 and w[i] is end:
+                break
+            i += 1
+            if depth < 0 or i == len(w):
+                return None
+
+        i += 1
+        if end is hulk_grammar.cbracket and w[start] is hulk_grammar.function and w[i] is hulk_grammar.semicolon:
+            i += 1
+        return i
+
+    @staticmethod
+    def _declaration_key(tokens, start, end):
+        # The text of a declaration in a stream is sliced at once, instead of each of its lexemes. It's the same for the
+        # same lexemes unless the whitespace between them changed, which only makes the declaration be parsed again
+        if isinstance(tokens, TokenStream):
+            return tokens.source[tokens.offset(start): tokens.offset(end - 1) + tokens.lengths[end - 1]]
+        return tuple(tokens[i].lex for i in range(start, end))
+
+    @staticmethod
+    def _reusable(declaration):
+        # The variable collector gives the types without parameters the ones of their parent, which may change
+        return not isinstance(declaration, hulk_ast_nodes.TypeDeclarationNode) or declaration.params_ids is not None
+
+    def _syntactic_errors(self, tokens, w, error: ParserError):
+        # The input is only parsed again to recover from its errors once the first one is found, so correct programs
+        # take a single pass
+        errors = self.find_errors(w, synchronizing_terminals) if self.recover else [error]
+        return [self._syntactic_error(tokens, e) for e in errors]
+
+    @staticmethod
+    def _terminals(tokens):
+        if isinstance(tokens, TokenStream):
+            return tokens.map_types(tokens_terminals_map)
+        return [tokens_terminals_map[t.token_type] for t in tokens]
+
+    @staticmethod
+    def _syntactic_error(tokens, error: ParserError):
+        error_token = tokens[error.token_index]
+        error_text = HulkSyntacticError.PARSING_ERROR % error_token.lex
+        return HulkSyntacticError(error_text, error_token.row, error_token.column)
+
+
+class _Terminals:
+    """Terminals of some tokens, looked up as they're read."""
+
+    def __init__(self, tokens):
+        self.token_type = tokens.token_type if isinstance(tokens, TokenStream) else lambda i: tokens[i].token_type
+        self.size = len(tokens)
+
+    def __getitem__(self, index):
+        return tokens_terminals_map[self.token_type(index)]
+
+    def __len__(self):
+        return self.size
 
 
 tokens_terminals_map = {
@@ -1,8 +1,20 @@
+import hashlib
+import os
+import struct
 from abc import abstractmethod, ABC
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 
 from src.automaton import State, multiline_formatter
 from src.pycompiler import Grammar, Production, Item
-from src.utils import ContainerSet
+from src.utils import ContainerSet, little_endian, read_array, read_cache, write_cache
+
+# Format version of the compact parsing tables written by `save_parse_table`, changed with their meaning or layout
+PARSE_TABLE_FORMAT_VERSION = 1
+
+_MAGIC = b'HULKPAR'
+_SIZES = struct.Struct('<IIII')
 
 
 class ParserError(Exception):
@@ -11,72 +23,167 @@ class ParserError(Exception):
         self.token_index = token_index
 
 
-def compute_firsts(G: Grammar):
-    first_sets = {symbol: (set() if symbol.IsNonTerminal else {symbol}) for symbol in G.nonTerminals + G.terminals}
-    changed = True
+class GrammarConflictError(Exception):
+    """
+    Raised when building the table of a grammar that isn't of the class the parser accepts. `conflicts` has a tuple of
+    the state, the terminal and the two actions for each entry of the table that got more than one action.
+    """
 
-    while changed:
-        changed = False
-        for nt in G.nonTerminals:
-            for production in nt.productions:
-                for symbol in production.Right:
-                    before_update = len(first_sets[nt])
-                    if symbol.IsTerminal and not symbol.IsEpsilon:
-                        first_sets[nt].add(symbol)
+    def __init__(self, grammar_class, conflicts):
+        super().__init__(f"Grammar is not {grammar_class}. " + '\n'.join(
+            f"A {GrammarConflictError.kind(first, second)} conflict had happened at {state, terminal}: "
+            f"table[{state},{terminal}] = {first} and tried to set it to {second}"
+            for state, terminal, first, second in conflicts))
+        self.conflicts = conflicts
 
-                        if len(first_sets[nt]) > before_update:
-                            changed = True
+    @staticmethod
+    def kind(first, second):
+        if first[0] == second[0] == ShiftReduceParser.REDUCE:
+            return 'reduce/reduce'
+        return 'shift/reduce'
 
-                        break
-                    elif not symbol.IsEpsilon:
-                        first_sets[nt] |= (first_sets[symbol] - {G.Epsilon})
 
-                        if len(first_sets[nt]) > before_update:
-                            changed = True
+def grammar_fingerprint(G: Grammar, *options) -> bytes:
+    """
+    Digest of the productions of `G` and of `options`, such as the kind of parser, including the format version of the
+    parsing tables.
+    """
+    digest = hashlib.sha256(str(PARSE_TABLE_FORMAT_VERSION).encode())
+    digest.update(G.to_json.encode('utf-8'))
+    digest.update(repr(options).encode('utf-8'))
+    return digest.digest()
 
-                        if G.Epsilon not in first_sets[symbol]:
-                            break
-                else:
-                    first_sets[nt].add(G.Epsilon)
-    return first_sets
 
+def load_parse_table(path: Path, fingerprint: bytes, G: Grammar):
+    """Returns the table cached in `path`, or None if there's no cache or it was built from another grammar."""
+    data = read_cache(path, _MAGIC, PARSE_TABLE_FORMAT_VERSION, fingerprint)
+    if data is None:
+        return None
+    try:
+        productions_count, states_count, slots, _ = _SIZES.unpack_from(data, 0)
+        return CompactTable.from_bytes(data[_SIZES.size:], G, productions_count, states_count, slots)
+    except (ValueError, struct.error):
+        return None
 
-def compute_follows(G: Grammar, firsts):
-    follow_sets = {nt: set() for nt in G.nonTerminals}
-    follow_sets[G.startSymbol].add(G.EOF)
 
-    changed = True
-    while changed:
-        changed = False
-        for nt in G.nonTerminals:
-            for production in nt.productions:
-                for i, symbol in enumerate(production.Right):
-                    if symbol.IsNonTerminal:
-                        before_update = len(follow_sets[symbol])
-
-                        if i + 1 < len(production.Right):
-                            next_symbol = production.Right[i + 1]
-                            follow_sets[symbol] |= (firsts[next_symbol] - {G.Epsilon})
-
-                            j = 2
-                            while i + j <= len(production.Right):
-                                if i + j == len(production.Right):
-                                    if G.Epsilon in firsts[next_symbol]:
-                                        follow_sets[symbol] |= follow_sets[nt]
-                                    break
-                                elif G.Epsilon in firsts[next_symbol]:
-                                    next_symbol = production.Right[i + j]
-                                    follow_sets[symbol] |= (firsts[next_symbol] - {G.Epsilon})
-                                    j += 1
-                                else:
-                                    break
+def save_parse_table(path: Path, fingerprint: bytes, table: 'CompactTable', G: Grammar):
+    """Writes the table in `path`, for `load_parse_table`."""
+    sizes = _SIZES.pack(len(table.productions), len(table.base), len(table.check), 0)
+    write_cache(path, _MAGIC, PARSE_TABLE_FORMAT_VERSION, fingerprint, sizes + table.to_bytes(G))
+
+
+class SymbolBitsets:
+    """Nullable nonterminals and FIRST and FOLLOW sets of a grammar, as bitsets where bit `i` is `terminals[i]`."""
+
+    def __init__(self, G: Grammar):
+        self.G = G
+        self.terminals = G.terminals + [G.EOF]
+        self.bits = {terminal: 1 << i for i, terminal in enumerate(self.terminals)}
+
+        # Bodies of the productions without epsilons, which only stand for the empty sentence
+        self._bodies = [(production.Left, [symbol for symbol in production.Right if not symbol.IsEpsilon])
+                        for production in G.Productions]
+
+        self.nullable = self._compute_nullable()
+        self.first = self._compute_first()
+        self._follow = None
+
+    def _compute_nullable(self):
+        # Symbols of each body not known to be nullable yet, and the bodies each nonterminal is in
+        remaining = [len(body) for _, body in self._bodies]
+        occurrences = {}
+        for i, (_, body) in enumerate(self._bodies):
+            for symbol in body:
+                if symbol.IsNonTerminal:
+                    occurrences.setdefault(symbol, []).append(i)
+
+        nullable = set()
+        pending = [head for head, body in self._bodies if not body]
+        while pending:
+            symbol = pending.pop()
+            if symbol in nullable:
+                continue
+            nullable.add(symbol)
+            for i in occurrences.get(symbol, ()):
+                remaining[i] -= 1
+                if remaining[i] == 0:
+                    pending.append(self._bodies[i][0])
+        return nullable
+
+    def _compute_first(self):
+        first = {terminal: bit for terminal, bit in self.bits.items()}
+        first.update((nt, 0) for nt in self.G.nonTerminals)
+
+        # FIRST(A) includes FIRST(B) if A -> α B β with α nullable
+        dependents = {nt: set() for nt in self.G.nonTerminals}
+        for head, body in self._bodies:
+            for symbol in body:
+                if symbol.IsTerminal:
+                    first[head] |= first[symbol]
+                    break
+                dependents[symbol].add(head)
+                if symbol not in self.nullable:
+                    break
+
+        self._propagate(first, dependents)
+        return first
+
+    def _compute_follow(self):
+        follow = {nt: 0 for nt in self.G.nonTerminals}
+        follow[self.G.startSymbol] = self.bits[self.G.EOF]
+
+        # FOLLOW(B) includes FOLLOW(A) if A -> α B β with β nullable
+        dependents = {nt: set() for nt in self.G.nonTerminals}
+        for head, body in self._bodies:
+            suffix, suffix_nullable = 0, True
+            for symbol in reversed(body):
+                if symbol.IsNonTerminal:
+                    follow[symbol] |= suffix
+                    if suffix_nullable:
+                        dependents[head].add(symbol)
+                    suffix = self.first[symbol] | (suffix if symbol in self.nullable else 0)
+                    suffix_nullable = suffix_nullable and symbol in self.nullable
+                else:
+                    suffix, suffix_nullable = self.first[symbol], False
+
+        self._propagate(follow, dependents)
+        return follow
 
-                        else:
-                            follow_sets[symbol] |= follow_sets[nt]
+    @staticmethod
+    def _propagate(sets, dependents):
+        # Worklist: only the sets that depend on one that changed are revisited
+        pending = list(dependents)
+        while pending:
+            symbol = pending.pop()
+            for dependent in dependents[symbol]:
+                if sets[dependent] | sets[symbol] != sets[dependent]:
+                    sets[dependent] |= sets[symbol]
+                    pending.append(dependent)
+
+    @property
+    def follow(self):
+        if self._follow is None:
+            self._follow = self._compute_follow()
+        return self._follow
+
+    def to_set(self, bits):
+        return {terminal for terminal in self.terminals if bits & self.bits[terminal]}
+
+
+def compute_firsts(G: Grammar, bitsets=None):
+    """FIRST set of each symbol, where the epsilon of `G` stands for the nonterminals that derive the empty sentence."""
+    bitsets = bitsets or SymbolBitsets(G)
+    first_sets = {symbol: bitsets.to_set(bitsets.first[symbol]) for symbol in G.nonTerminals}
+    for nt in bitsets.nullable:
+        first_sets[nt].add(G.Epsilon)
+    first_sets.update((terminal, {terminal}) for terminal in G.terminals)
+    return first_sets
 
-                        if len(follow_sets[symbol]) > before_update:
-                            changed = True
-    return follow_sets
+
+def compute_follows(G: Grammar, firsts=None, bitsets=None):
+    """FOLLOW set of each nonterminal. `firsts` is only kept for compatibility, the sets are computed from `G`."""
+    bitsets = bitsets or SymbolBitsets(G)
+    return {nt: bitsets.to_set(bits) for nt, bits in bitsets.follow.items()}
 
 
 def compute_local_first(G: Grammar, firsts, preview):
@@ -154,66 +261,335 @@ class ShiftReduceParser(ABC):
     REDUCE = 'REDUCE'
     OK = 'OK'
 
+    # Symbols to shift after recovering from a syntactic error before reporting the next one
+    RECOVERY_SHIFTS = 3
+
     def __init__(self, G, verbose=False):
         self.G = G
         self.verbose = verbose
         self.table = {}
         self._build_parsing_table()
+        self._compile_table()
 
     @abstractmethod
     def _build_parsing_table(self):
         raise NotImplementedError()
 
+    def _compile_table(self):
+        """Compiles `table` into the `CompactTable` the parser runs on, which must be done again if it changes."""
+        self.compact_table = CompactTable(self.table)
+
     def __call__(self, w):
+        table = self.compact_table
+        base, check, actions = table.base, table.check, table.actions
+        productions, heads, lengths = table.productions, table.heads, table.lengths
+        columns = table.columns(w)
+
         stack = [0]
         cursor = 0
         output_parse = []
         operations = []
 
-        while cursor < len(w):
+        while True:
             state = stack[-1]
-            lookahead = w[cursor].Name
             if self.verbose:
                 print(stack, '<---||--->', w[cursor:])
 
-            if (state, lookahead) in self.table.keys():
-                action, tag = self.table[state, lookahead]
+            i = base[state] + columns[cursor]
+            if check[i] != state:
+                raise ParserError("Chain cannot be parsed", cursor)
+            action = actions[i]
 
-                operations.append(action)
+            if action > 0:
+                operations.append(ShiftReduceParser.SHIFT)
+                stack.append(action)
+                cursor += 1
+                continue
 
-                match action:
-                    case ShiftReduceParser.OK:
-                        return output_parse, operations
+            production = productions[-action - 1]
+            if production is None:
+                operations.append(ShiftReduceParser.OK)
+                return output_parse, operations
 
-                    case ShiftReduceParser.SHIFT:
-                        stack.append(tag)
-                        cursor += 1
+            operations.append(ShiftReduceParser.REDUCE)
+            output_parse.append(production)
+            if lengths[-action - 1]:
+                del stack[-lengths[-action - 1]:]
 
-                    case ShiftReduceParser.REDUCE:
-                        output_parse.append(tag)
-                        Left, Right = tag
+            state = stack[-1]
+            i = base[state] + heads[-action - 1]
+            if check[i] != state or actions[i] <= 0:
+                raise ParserError("Chain cannot be parsed", cursor)
+            stack.append(actions[i])
+
+    def evaluate(self, w, lexeme):
+        """Parses `w` running the attribute rules as it reduces, with `lexeme(i)` the value of the token at `i`."""
+        table = self.compact_table
+        base, check, actions = table.base, table.check, table.actions
+        heads, lengths = table.heads, table.lengths
+        columns = table.columns(w)
+
+        rules = []
+        for production in table.productions:
+            if production is not None:
+                assert all(rule is None for rule in production.attributes[1:]), \
+                    'There must be only synthesized attributes.'
+                rules.append(production.attributes[0])
+            else:
+                rules.append(None)
 
-                        for symbol in Right:
-                            if not symbol.IsEpsilon:
-                                stack.pop()
+        stack = [0]
+        values = []
+        cursor = 0
 
-                        if (stack[-1], Left.Name) in self.table and self.table[(stack[-1], Left.Name)][
-                            0] == ShiftReduceParser.SHIFT:
-                            stack.append(self.table[(stack[-1], Left.Name)][1])
-                        else:
-                            raise ParserError("Chain cannot be parsed", cursor)
+        while True:
+            state = stack[-1]
+            i = base[state] + columns[cursor]
+            if check[i] != state:
+                raise ParserError("Chain cannot be parsed", cursor)
+            action = actions[i]
+
+            if action > 0:
+                stack.append(action)
+                values.append(lexeme(cursor))
+                cursor += 1
+                continue
+
+            rule = rules[-action - 1]
+            if rule is None:
+                return values[-1]
+
+            length = lengths[-action - 1]
+            if length:
+                del stack[-length:]
+                values[-length:] = [rule(None, [None] + values[-length:])]
             else:
+                values.append(rule(None, None))
+
+            state = stack[-1]
+            i = base[state] + heads[-action - 1]
+            if check[i] != state or actions[i] <= 0:
                 raise ParserError("Chain cannot be parsed", cursor)
+            stack.append(actions[i])
+
+    def find_errors(self, w, synchronizing):
+        """A `ParserError` for each syntactic error of `w`, recovering from each one in panic mode."""
+        table = self.compact_table
+        base, check, actions = table.base, table.check, table.actions
+        productions, heads, lengths = table.productions, table.heads, table.lengths
+        columns = table.columns(w)
+        synchronizing_columns = {table.symbols[symbol.Name] for symbol in synchronizing if symbol.Name in table.symbols}
+        if w:
+            synchronizing_columns.add(columns[len(w) - 1])
+        nonterminals = [table.symbols[symbol.Name] for symbol in self.G.nonTerminals if symbol.Name in table.symbols]
+
+        errors = []
+        stack = [0]
+        cursor = 0
+        shifted = ShiftReduceParser.RECOVERY_SHIFTS
+
+        while True:
+            state = stack[-1]
+            i = base[state] + columns[cursor]
+            if check[i] == state:
+                action = actions[i]
+                if action > 0:
+                    stack.append(action)
+                    cursor += 1
+                    shifted += 1
+                    continue
+                if productions[-action - 1] is None:
+                    return errors
+
+                if lengths[-action - 1]:
+                    del stack[-lengths[-action - 1]:]
+                state = stack[-1]
+                stack.append(actions[base[state] + heads[-action - 1]])
+                continue
+
+            # As yacc does, errors found right after a recovery are most likely caused by resuming in the wrong state
+            if shifted >= ShiftReduceParser.RECOVERY_SHIFTS:
+                errors.append(ParserError("Chain cannot be parsed", cursor))
+            shifted = 0
+            # Skip up to the next synchronizing terminal some state of the stack can resume parsing on. The terminal
+            # after it has to be shifted too, or the error it causes would be taken as caused by resuming there. If no
+            # state can, the synchronizing terminal is taken as the end of the phrase with the error and parsing resumes
+            # after it
+            for cursor in range(cursor, len(w)):
+                if columns[cursor] not in synchronizing_columns:
+                    continue
+                next_column, after_column = (columns[i] if i < len(w) else None for i in (cursor + 1, cursor + 2))
+                if self._resume(stack, columns[cursor], next_column, nonterminals):
+                    break
+                if next_column is not None and self._resume(stack, next_column, after_column, nonterminals):
+                    cursor += 1
+                    break
+            else:
+                return errors
+
+    def _resume(self, stack, column, next_column, nonterminals):
+        """
+        Pops `stack` to the topmost state that shifts `column` and then `next_column`, unless it's None, or does after a
+        goto on one of `nonterminals`.
+        """
+        table = self.compact_table
+        base, check, actions = table.base, table.check, table.actions
+
+        for depth in range(len(stack), 0, -1):
+            if self._shifts(stack, depth, [], column, next_column):
+                del stack[depth:]
+                return True
+
+            state = stack[depth - 1]
+            for nonterminal in nonterminals:
+                i = base[state] + nonterminal
+                if check[i] == state and self._shifts(stack, depth, [actions[i]], column, next_column):
+                    del stack[depth:]
+                    stack.append(actions[i])
+                    return True
+        return False
+
+    def _shifts(self, stack, depth, pushed, column, next_column=None):
+        """
+        Whether the parser with `stack[:depth] + pushed` as its stack shifts or accepts `column` after reducing, and
+        then `next_column` unless it's None.
+        """
+        table = self.compact_table
+        base, check, actions = table.base, table.check, table.actions
+        productions, heads, lengths = table.productions, table.heads, table.lengths
+
+        while True:
+            state = pushed[-1] if pushed else stack[depth - 1]
+            i = base[state] + column
+            if check[i] != state:
+                return False
+            action = actions[i]
+            if action > 0 and next_column is not None:
+                pushed.append(action)
+                column, next_column = next_column, None
+                continue
+            if action > 0 or productions[-action - 1] is None:
+                return True
+
+            length = lengths[-action - 1]
+            popped = min(length, len(pushed))
+            del pushed[len(pushed) - popped:]
+            depth -= length - popped
+            state = pushed[-1] if pushed else stack[depth - 1]
+            pushed.append(actions[base[state] + heads[-action - 1]])
+
+
+class CompactTable:
+    """A parsing table compiled to integer arrays, with its rows overlapped by row displacement."""
+
+    def __init__(self, table):
+        self.symbols = {}
+        self.productions = []
+        production_indices = {}
+        rows = {}
+
+        # The entries are numbered in order, so the same table is always compiled to the same arrays. A positive action
+        # shifts to that state, or goes to it after a reduction, and a negative one reduces by `productions[-action - 1]`
+        for (state, symbol), (action, tag) in sorted(table.items(), key=lambda entry: entry[0]):
+            column = self.symbols.setdefault(symbol, len(self.symbols))
+            if action == ShiftReduceParser.SHIFT:
+                assert tag > 0, 'The start state must not be the target of a transition'
+                code = tag
+            else:
+                if tag not in production_indices:
+                    production_indices[tag] = len(self.productions)
+                    self.productions.append(tag)
+                code = -production_indices[tag] - 1
+            rows.setdefault(state, []).append((column, code))
+
+        # Symbols not in the table, such as the ones past the end of the input, fall in a column no row has
+        self.unknown = len(self.symbols)
+
+        self.heads = array('i', [0]) * len(self.productions)
+        self.lengths = array('i', [0]) * len(self.productions)
+        for i, production in enumerate(self.productions):
+            if production is not None:
+                left, right = production
+                self.heads[i] = self.symbols.get(left.Name, self.unknown)
+                self.lengths[i] = sum(1 for symbol in right if not symbol.IsEpsilon)
+
+        # The action of a state on a symbol is at `actions[base[state] + symbol]` if `check` has the state there
+        self.base = array('i', [0]) * (max(rows, default=0) + 1)
+        # Bit `i` of `used` is set if slot `i` is taken, and bit `i` of `blocked` if the row doesn't fit at base `i`. The
+        # first base where it fits is the lowest bit not set in `blocked`
+        used = 0
+        for state in sorted(rows, key=lambda state: (-len(rows[state]), state)):
+            row = rows[state]
+            blocked = 0
+            for column, _ in row:
+                blocked |= used >> column
+            free = ~blocked & ((1 << (used.bit_length() + 1)) - 1)
+            offset = (free & -free).bit_length() - 1
+
+            for column, _ in row:
+                used |= 1 << (offset + column)
+            self.base[state] = offset
+
+        size = max(self.base, default=0) + self.unknown + 1
+        self.check = array('i', [-1]) * size
+        self.actions = array('i', [0]) * size
+        for state, row in rows.items():
+            for column, code in row:
+                self.check[self.base[state] + column] = state
+                self.actions[self.base[state] + column] = code
+
+    def to_bytes(self, G: Grammar) -> bytes:
+        """
+        Layout of the table in the cache. The productions are written as their index in `G.Productions`, so they're
+        read back with their attribute rules, and the symbols as their names.
+        """
+        names = '\0'.join(self.symbols).encode('utf-8')
+        indices = {production: i for i, production in enumerate(G.Productions)}
+        productions = array('i', [indices[production] if production is not None else -1
+                                  for production in self.productions])
+        return b''.join([struct.pack('<I', len(names)), names, little_endian(productions), little_endian(self.heads),
+                         little_endian(self.lengths), little_endian(self.base), little_endian(self.check),
+                         little_endian(self.actions)])
 
-        raise ParserError("Chain cannot be parsed", cursor)
+    @staticmethod
+    def from_bytes(data: memoryview, G: Grammar, productions_count, states_count, slots) -> 'CompactTable':
+        """Reads a table written by `to_bytes` for `G`, given the sizes written in the header of the cache."""
+        (names_size,) = struct.unpack_from('<I', data, 0)
+        names = bytes(data[4: 4 + names_size]).decode('utf-8')
+
+        table = CompactTable.__new__(CompactTable)
+        table.symbols = {name: i for i, name in enumerate(names.split('\0'))} if names else {}
+        table.unknown = len(table.symbols)
+
+        offset = 4 + names_size
+        productions, offset = read_array(data, offset, productions_count)
+        table.heads, offset = read_array(data, offset, productions_count)
+        table.lengths, offset = read_array(data, offset, productions_count)
+        table.base, offset = read_array(data, offset, states_count)
+        table.check, offset = read_array(data, offset, slots)
+        table.actions, offset = read_array(data, offset, slots)
+
+        if offset != len(data) or any(not -1 <= i < len(G.Productions) for i in productions):
+            raise ValueError('Corrupted parsing table')
+        table.productions = [G.Productions[i] if i >= 0 else None for i in productions]
+        return table
+
+    def columns(self, w):
+        """Column of each symbol of `w`, followed by the one of symbols not in the table."""
+        symbols, unknown = self.symbols, self.unknown
+        return [symbols.get(symbol.Name, unknown) for symbol in w] + [unknown]
+
+    def nbytes(self):
+        return sum(len(column) * column.itemsize for column in
+                   [self.base, self.check, self.actions, self.heads, self.lengths])
 
 
 class SLR1Parser(ShiftReduceParser):
+    grammar_class = 'SLR(1)'
 
     def _build_parsing_table(self):
         G = self.G.AugmentedGrammar(True)
-        firsts = compute_firsts(G)
-        follows = compute_follows(G, firsts)
+        follows = compute_follows(G)
 
         automaton = build_LR0_automaton(G).to_deterministic()
 
@@ -242,17 +618,22 @@ class SLR1Parser(ShiftReduceParser):
                     if node.state.production == G.startSymbol.productions[0] and node.state.IsReduceItem:
                         self.table[states[state], G.EOF.Name] = (ShiftReduceParser.OK, None)
 
+        conflicts = []
         for state in states.keys():
             if state.final:
                 for node in state.state:
                     if node.state.IsReduceItem:
                         if node.state.production != G.startSymbol.productions[0]:
                             for terminal in follows[node.state.production.Left]:
-                                if (states[state], terminal) not in self.table:
+                                if (states[state], terminal.Name) not in self.table:
                                     self.table[states[state], terminal.Name] = (
                                         ShiftReduceParser.REDUCE, node.state.production)
                                 else:
-                                    raise Exception("Bad Grammar")
+                                    conflicts.append((states[state], terminal.Name,
+                                                      self.table[states[state], terminal.Name],
+                                                      (ShiftReduceParser.REDUCE, node.state.production)))
+        if conflicts:
+            raise GrammarConflictError(self.grammar_class, conflicts)
 
     @staticmethod
     def _register(table, key, value):
@@ -313,45 +694,260 @@ def goto_lr1(G: Grammar, items, symbol, firsts=None, just_kernel=False):
     return items if just_kernel else closure_lr1(G, items, firsts)
 
 
-def build_LR1_automaton(G):
-    assert len(G.startSymbol.productions) == 1, 'Grammar must be augmented'
+class InternedItems:
+    """LR(1) items of a grammar as integers, an item set being a dict from them to the bitset of their lookaheads."""
+
+    def __init__(self, G: Grammar):
+        bitsets = SymbolBitsets(G)
+        self.terminals, self.bits = bitsets.terminals, bitsets.bits
+        nullable, first_bits = bitsets.nullable, bitsets.first
+
+        # Items without lookaheads, numbered so that the one after item `i` is `i + 1`
+        self.cores = []
+        self.first_core = {}
+        for production in G.Productions:
+            self.first_core[production] = len(self.cores)
+            self.cores.extend((production, pos) for pos in range(len(production.Right) + 1))
+
+        self.next_symbols = []
+        # Items added to the closure by each item, and the FIRST of what follows its next symbol
+        self.expansions = []
+        self.follow_bits = []
+        self.follow_nullable = []
+        for production, pos in self.cores:
+            symbol = production.Right[pos] if pos < len(production.Right) else None
+            self.next_symbols.append(symbol)
+
+            if symbol is None or not symbol.IsNonTerminal:
+                self.expansions.append(())
+                self.follow_bits.append(0)
+                self.follow_nullable.append(False)
+                continue
+
+            self.expansions.append([self.first_core[next_production] for next_production in symbol.productions])
+            lookaheads = 0
+            for i in range(pos + 1, len(production.Right)):
+                lookaheads |= first_bits[production.Right[i]]
+                if production.Right[i] not in nullable:
+                    self.follow_bits.append(lookaheads)
+                    self.follow_nullable.append(False)
+                    break
+            else:
+                self.follow_bits.append(lookaheads)
+                self.follow_nullable.append(True)
+
+        self._lookahead_sets = {}
+
+    def __getstate__(self):
+        # The pools of `build_LR1_automaton` only close kernels and find their targets, so they get the tables that
+        # takes with the symbols numbered, instead of the grammar, which is not picklable because of its attribute rules
+        symbols = {symbol: i for i, symbol in enumerate(dict.fromkeys(self.next_symbols)) if symbol is not None}
+        return {'expansions': self.expansions, 'follow_bits': self.follow_bits, 'follow_nullable': self.follow_nullable,
+                'next_symbols': [symbols.get(symbol) for symbol in self.next_symbols]}
+
+    def closure(self, kernel):
+        expansions, follow_bits, follow_nullable = self.expansions, self.follow_bits, self.follow_nullable
+        items = dict(kernel)
+        pending = list(items)
+
+        while pending:
+            item = pending.pop()
+            if expansions[item]:
+                lookaheads = follow_bits[item] | (items[item] if follow_nullable[item] else 0)
+                for new_item in expansions[item]:
+                    old_lookaheads = items.get(new_item, 0)
+                    if old_lookaheads | lookaheads != old_lookaheads:
+                        items[new_item] = old_lookaheads | lookaheads
+                        pending.append(new_item)
+
+        return items
+
+    def gotos(self, items):
+        """Kernels of the targets of the transitions of `items`, found by grouping them by their next symbol."""
+        targets = {}
+        for item, lookaheads in items.items():
+            symbol = self.next_symbols[item]
+            if symbol is not None:
+                targets.setdefault(symbol, {})[item + 1] = lookaheads
+        return targets
+
+    def state(self, items):
+        item_set = frozenset(Item(*self.cores[item], self._lookahead_set(lookaheads))
+                             for item, lookaheads in items.items())
+        return State(item_set, final=any(item.IsReduceItem for item in item_set))
+
+    def _lookahead_set(self, lookaheads):
+        try:
+            return self._lookahead_sets[lookaheads]
+        except KeyError:
+            self._lookahead_sets[lookaheads] = result = [terminal for terminal in self.terminals
+                                                         if lookaheads & self.bits[terminal]]
+            return result
 
-    firsts = compute_firsts(G)
-    firsts[G.EOF] = {G.EOF}
 
-    start_production = G.startSymbol.productions[0]
-    start_item = Item(start_production, 0, lookaheads=(G.EOF,))
-    start = frozenset([start_item])
+def _link_states(states, gotos):
+    for state, transitions in zip(states, gotos):
+        for symbol, target in transitions:
+            state.add_transition(symbol.Name, states[target])
 
-    closure = frozenset(closure_lr1(G, start, firsts))
-    automaton = State(closure, final = any(item.IsReduceItem for item in closure))
+    automaton = states[0]
+    automaton.set_formatter(multiline_formatter)
+    return automaton
 
-    pending = [closure]
-    visited = {closure: automaton}
 
+def build_LR1_automaton(G, workers=1):
+    """Canonical collection of LR(1) item sets of `G`, closing only the kernels not seen before."""
+    assert len(G.startSymbol.productions) == 1, 'Grammar must be augmented'
+
+    interned = InternedItems(G)
+    start_kernel = ((interned.first_core[G.startSymbol.productions[0]], interned.bits[G.EOF]),)
+    kernels = [start_kernel]
+    indices = {start_kernel: 0}
+    item_sets = []
+    gotos = []
+
+    def add_transitions(items, targets):
+        gotos.append([])
+        for key in targets:
+            if key not in indices:
+                indices[key] = len(kernels)
+                kernels.append(key)
+            # All the items of a kernel come from items with the same next symbol
+            gotos[-1].append((interned.next_symbols[key[0][0] - 1], indices[key]))
+        item_sets.append(items)
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        i = 0
+        while i < len(kernels):
+            items = interned.closure(kernels[i])
+            add_transitions(items, [_kernel_key(kernel) for kernel in interned.gotos(items).values()])
+            i += 1
+    else:
+        # A level of the state graph at a time, merged in the order of its kernels so the states are numbered the same
+        with ProcessPoolExecutor(workers, initializer=_initialize_lr1_worker, initargs=(interned,)) as executor:
+            level_start = 0
+            while level_start < len(kernels):
+                level = kernels[level_start:]
+                level_start = len(kernels)
+                chunk_size = max(1, len(level) // (4 * workers))
+                chunks = [level[i: i + chunk_size] for i in range(0, len(level), chunk_size)]
+                for targets, results in executor.map(_close_kernels_in_worker, chunks):
+                    for items, transitions in results:
+                        add_transitions(dict(items), [targets[target] for target in transitions])
+
+    return _link_states([interned.state(items) for items in item_sets], gotos)
+
+
+def _kernel_key(kernel):
+    return tuple(sorted(kernel.items()))
+
+
+# Items of the grammar whose automaton the processes of the pool of `build_LR1_automaton` are building
+_worker_items = None
+
+
+def _initialize_lr1_worker(interned):
+    global _worker_items
+    _worker_items = interned
+
+
+def _close_kernels_in_worker(kernels):
+    # The targets of the kernels are sent once each, and the transitions as indices into them
+    targets = []
+    indices = {}
+    results = []
+    for kernel in kernels:
+        items = _worker_items.closure(kernel)
+        transitions = []
+        for target in _worker_items.gotos(items).values():
+            key = _kernel_key(target)
+            if key not in indices:
+                indices[key] = len(targets)
+                targets.append(key)
+            transitions.append(indices[key])
+        results.append((tuple(items.items()), transitions))
+    return targets, results
+
+
+def build_LALR1_automaton(G):
+    """LALR(1) automaton of `G`, from the LR(0) one by propagating lookaheads (algorithm 4.63 of the Dragon Book)."""
+    assert len(G.startSymbol.productions) == 1, 'Grammar must be augmented'
+
+    interned = InternedItems(G)
+    dummy = 1 << len(interned.terminals)
+
+    start_item = interned.first_core[G.startSymbol.productions[0]]
+    kernels = [(start_item,)]
+    indices = {frozenset(kernels[0]): 0}
+    # Transitions of each state, and the lookaheads each kernel item generates and propagates for those of its targets
+    gotos = []
+    generated = []
+
+    i = 0
+    while i < len(kernels):
+        targets = {}
+        generated.append({})
+        for item in kernels[i]:
+            # Closed on its own with a dummy lookahead, which stands for the lookaheads it propagates
+            generated[i][item] = closure = interned.closure({item: dummy})
+            for symbol, kernel in interned.gotos(closure).items():
+                targets.setdefault(symbol, set()).update(kernel)
+
+        gotos.append([])
+        for symbol, kernel in targets.items():
+            key = frozenset(kernel)
+            if key not in indices:
+                indices[key] = len(kernels)
+                kernels.append(tuple(kernel))
+            gotos[i].append((symbol, indices[key]))
+        i += 1
+
+    lookaheads = {(state, item): 0 for state, kernel in enumerate(kernels) for item in kernel}
+    lookaheads[0, start_item] = interned.bits[G.EOF]
+    propagation = {key: [] for key in lookaheads}
+
+    for state, transitions in enumerate(gotos):
+        targets = {symbol: target for symbol, target in transitions}
+        for item, closure in generated[state].items():
+            for closure_item, closure_lookaheads in closure.items():
+                symbol = interned.next_symbols[closure_item]
+                if symbol is None:
+                    continue
+
+                target = targets[symbol], closure_item + 1
+                lookaheads[target] |= closure_lookaheads & ~dummy
+                if closure_lookaheads & dummy:
+                    propagation[state, item].append(target)
+
+    pending = list(propagation)
     while pending:
-        current = pending.pop()
-        current_state = visited[current]
+        source = pending.pop()
+        for target in propagation[source]:
+            if lookaheads[target] | lookaheads[source] != lookaheads[target]:
+                lookaheads[target] |= lookaheads[source]
+                pending.append(target)
 
-        for symbol in G.terminals + G.nonTerminals:
-            closure = frozenset(goto_lr1(G, current, symbol, firsts))
+    states = [interned.state(interned.closure({item: lookaheads[state, item] for item in kernel}))
+              for state, kernel in enumerate(kernels)]
+    return _link_states(states, gotos)
 
-            if len(closure) > 0:
-                if closure not in visited:
-                    visited[closure] = State(closure, final = any(item.IsReduceItem for item in closure))
-                    pending.append(closure)
 
-                current_state.add_transition(symbol.Name, visited[closure])
+class LR1Parser(ShiftReduceParser):
+    grammar_class = 'LR(1)'
 
-    automaton.set_formatter(multiline_formatter)
-    return automaton
+    def __init__(self, G, verbose=False, workers=1):
+        """With more than one of `workers` the automaton is built by a pool of processes, see `build_LR1_automaton`."""
+        self.workers = workers
+        super().__init__(G, verbose)
 
+    def _build_automaton(self, G):
+        return build_LR1_automaton(G, self.workers)
 
-class LR1Parser(ShiftReduceParser):
     def _build_parsing_table(self):
         G = self.G.AugmentedGrammar(True)
 
-        automaton = build_LR1_automaton(G)
+        automaton = self._build_automaton(G)
 
         index = 0
         states = {automaton: index}
@@ -379,6 +975,7 @@ class LR1Parser(ShiftReduceParser):
                     if item.production == G.startSymbol.productions[0] and item.IsReduceItem:
                         self.table[states[state], G.EOF.Name] = (ShiftReduceParser.OK, None)
 
+        conflicts = []
         for state in states.keys():
             if state.final:
                 for item in state.state:
@@ -389,10 +986,25 @@ class LR1Parser(ShiftReduceParser):
                                     self.table[states[state], terminal.Name] = (
                                         ShiftReduceParser.REDUCE, item.production)
                                 else:
-                                    raise Exception(
-                                        f"Grammar is not LR(1). A conflict had happened at {states[state], terminal.Name}: table[{states[state]},{terminal.Name}] = {self.table[states[state], terminal.Name]} and tried to set it to {ShiftReduceParser.REDUCE, item.production}")
+                                    conflicts.append((states[state], terminal.Name,
+                                                      self.table[states[state], terminal.Name],
+                                                      (ShiftReduceParser.REDUCE, item.production)))
+        if conflicts:
+            raise GrammarConflictError(self.grammar_class, conflicts)
 
     @staticmethod
     def _register(table, key, value):
         assert key not in table or table[key] == value, 'Shift-Reduce or Reduce-Reduce conflict!!!'
         table[key] = value
+
+
+class LALR1Parser(LR1Parser):
+    """
+    LR(1) parser whose states with the same LR(0) items are merged, which gives far fewer states. Merging them may make
+    a LR(1) grammar have reduce/reduce conflicts, which are reported by the `GrammarConflictError` raised. Its automaton
+    is always built in this process.
+    """
+    grammar_class = 'LALR(1)'
+
+    def _build_automaton(self, G):
+        return build_LALR1_automaton(G)
@@ -1,6 +1,7 @@
 import src.regex.regex_nodes as regex_nodes
 import src.automaton_operations as regex_operations_automata
 import src.visitor as visitor
+from src.automaton import CharClass
 
 
 class AutomataBuilderVisitor(object):
@@ -30,3 +31,20 @@ class AutomataBuilderVisitor(object):
     @visitor.when(regex_nodes.CharNode)
     def visit(self, node: regex_nodes.CharNode):
         return regex_operations_automata.build_basic_nfa(node.token)
+
+    @visitor.when(regex_nodes.PlusNode)
+    def visit(self, node: regex_nodes.PlusNode):
+        value = self.visit(node.child)
+        return regex_operations_automata.positive_closure(value)
+
+    @visitor.when(regex_nodes.OptionalNode)
+    def visit(self, node: regex_nodes.OptionalNode):
+        value = self.visit(node.child)
+        return regex_operations_automata.optional_nfa(value)
+
+    @visitor.when(regex_nodes.CharClassNode)
+    def visit(self, node: regex_nodes.CharClassNode):
+        char_class = CharClass(node.ranges)
+        if node.negated:
+            char_class = char_class.negate()
+        return regex_operations_automata.build_char_class_nfa(char_class)
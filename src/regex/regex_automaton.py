@@ -1,46 +1,98 @@
+from functools import lru_cache
+
+from src.automaton_operations import copy_nfa
 from src.evaluation import evaluate_reverse_parse
 from src.parsing import LR1Parser
 from src.regex.build_automaton_visitor import AutomataBuilderVisitor
 from src.regex.regex_grammar import get_regex_grammar
 from src.utils import Token
 
+# NFAs already built for each regex. Callers get copies, since building a lexer modifies the final states
+_regex_automata = {}
+
+
+@lru_cache(maxsize=None)
+def get_regex_parser():
+    """The regex grammar and its LR(1) parser, built only once per process."""
+    grammar = get_regex_grammar()
+    return grammar, LR1Parser(grammar[0])
+
 
 def get_regex_automaton(regex: str):
-    G, star, bar, opar, cpar, char = get_regex_grammar()
-
-    def get_regex_terminal_token(charrr, force_char):
-        if not force_char:
-            match charrr:
-                case star.Name:
-                    return star, Token(charrr, star)
-                case bar.Name:
-                    return bar, Token(charrr, bar)
-                case opar.Name:
-                    return opar, Token(charrr, opar)
-                case cpar.Name:
-                    return cpar, Token(charrr, cpar)
-        return char, Token(charrr, char)
-
-    parser = LR1Parser(G)
-
-    terminals = []
+    try:
+        return copy_nfa(_regex_automata[regex])
+    except KeyError:
+        _regex_automata[regex] = nfa = _build_regex_automaton(regex)
+        return copy_nfa(nfa)
+
+
+# Characters written after a backslash that stand for another character
+_escapes = {'n': '\n', 't': '\t', 'r': '\r', 'f': '\f', 'v': '\v', '0': '\0'}
+
+# Number of hexadecimal digits after `\x` and `\u`
+_hex_escapes = {'x': 2, 'u': 4}
+
+
+def _read_char(regex: str, i: int):
+    """Reads the character at `i`, which may be an escape sequence. Returns it, whether it was escaped, and the next
+    position."""
+    if regex[i] != '\\' or i + 1 == len(regex):
+        return regex[i], False, i + 1
+
+    char = regex[i + 1]
+    digits = _hex_escapes.get(char)
+    if digits is not None:
+        code = regex[i + 2: i + 2 + digits]
+        if len(code) == digits and all(c in '0123456789abcdefABCDEF' for c in code):
+            return chr(int(code, 16)), True, i + 2 + digits
+
+    return _escapes.get(char, char), True, i + 2
+
+
+def _tokenize_regex(regex: str, terminals):
+    star, bar, opar, cpar, plus, question, obracket, cbracket, caret, dash, char = terminals
+
+    operators = {star.Name: star, bar.Name: bar, opar.Name: opar, cpar.Name: cpar, plus.Name: plus,
+                 question.Name: question, obracket.Name: obracket}
+
     tokens = []
+    in_class = False
+    class_start = False
 
-    force_char = False
+    i = 0
+    while i < len(regex):
+        lex, escaped, i = _read_char(regex, i)
 
-    for charrr in regex:
-        if charrr != '\\' or force_char:
-            terminal, token = get_regex_terminal_token(charrr, force_char)
-            terminals.append(terminal)
-            tokens.append(token)
-            force_char = False
+        if escaped:
+            terminal = char
+        elif not in_class:
+            terminal = operators.get(lex, char)
+            in_class = class_start = terminal == obracket
+        elif lex == cbracket.Name:
+            terminal = cbracket
+            in_class = False
+        elif lex == caret.Name and class_start and tokens[-1][0] == obracket:
+            terminal = caret
+        elif lex == dash.Name and not class_start and i < len(regex) and regex[i] != cbracket.Name:
+            terminal = dash
         else:
-            force_char = True
+            terminal = char
+
+        if terminal not in (obracket, caret):
+            class_start = False
+
+        tokens.append((terminal, Token(lex, terminal)))
+
+    return tokens
+
+
+def _build_regex_automaton(regex: str):
+    (G, *terminals), parser = get_regex_parser()
 
-    terminals.append(G.EOF)
-    tokens.append(Token(G.EOF.Name, G.EOF))
+    tokens = _tokenize_regex(regex, terminals)
+    tokens.append((G.EOF, Token(G.EOF.Name, G.EOF)))
 
-    parse, operations = parser(terminals)
+    parse, operations = parser([terminal for terminal, _ in tokens])
 
     visitor = AutomataBuilderVisitor()
-    return visitor.visit(evaluate_reverse_parse(parse, operations, tokens))
+    return visitor.visit(evaluate_reverse_parse(parse, operations, [token for _, token in tokens]))
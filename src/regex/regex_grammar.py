@@ -11,8 +11,12 @@ def get_regex_grammar():
 
     concat, kleene, factor = G.NonTerminals('<concat> <kleene> <factor>')
 
+    char_class, class_items, class_item = G.NonTerminals('<char_class> <class_items> <class_item>')
+
     star, bar, opar, cpar = G.Terminals('* | ( )')
 
+    plus, question, obracket, cbracket, caret, dash = G.Terminals('+ ? [ ] ^ -')
+
     char = G.Terminal('char')
 
     origin %= disjunction, lambda _, s: regex_nodes.OrNode(s[1])
@@ -27,10 +31,28 @@ def get_regex_grammar():
 
     kleene %= kleene + star, lambda _, s: regex_nodes.KleeneNode(s[1])
 
+    kleene %= kleene + plus, lambda _, s: regex_nodes.PlusNode(s[1])
+
+    kleene %= kleene + question, lambda _, s: regex_nodes.OptionalNode(s[1])
+
     kleene %= factor, lambda _, s: s[1]
 
     factor %= opar + disjunction + cpar, lambda _, s: regex_nodes.OrNode(s[2])
 
     factor %= char, lambda _, s: regex_nodes.CharNode(s[1])
 
-    return G, star, bar, opar, cpar, char
+    factor %= char_class, lambda _, s: s[1]
+
+    char_class %= obracket + class_items + cbracket, lambda _, s: regex_nodes.CharClassNode(s[2])
+
+    char_class %= obracket + caret + class_items + cbracket, lambda _, s: regex_nodes.CharClassNode(s[3], True)
+
+    class_items %= class_items + class_item, lambda _, s: s[1] + [s[2]]
+
+    class_items %= class_item, lambda _, s: [s[1]]
+
+    class_item %= char, lambda _, s: (ord(s[1]), ord(s[1]))
+
+    class_item %= char + dash + char, lambda _, s: (ord(s[1]), ord(s[3]))
+
+    return G, star, bar, opar, cpar, plus, question, obracket, cbracket, caret, dash, char
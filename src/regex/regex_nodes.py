@@ -21,3 +21,22 @@ class KleeneNode(Node):
 class OrNode(Node):
     def __init__(self, children) -> None:
         self.children = children
+
+
+class PlusNode(Node):
+    def __init__(self, child) -> None:
+        self.child = child
+
+
+class OptionalNode(Node):
+    def __init__(self, child) -> None:
+        self.child = child
+
+
+class CharClassNode(Node):
+    def __init__(self, ranges, negated=False) -> None:
+        for low, high in ranges:
+            if low > high:
+                raise ValueError(f'Invalid range {low}-{high} in character class')
+        self.ranges = ranges
+        self.negated = negated
@@ -1,3 +1,10 @@
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Optional
+
 from src.pycompiler import Production, Sentence, Symbol, EOF, Epsilon
 
 
@@ -110,6 +117,8 @@ def pprint(item, header=""):
 
 
 class Token:
+    __slots__ = ('lex', 'token_type', 'row', 'column')
+
     def __init__(self, lex, token_type, row=0, column=0):
         self.lex = lex
         self.token_type = token_type
@@ -128,6 +137,8 @@ class Token:
 
 
 class UnknownToken(Token):
+    __slots__ = ()
+
     def __init__(self, lex, row=0, column=0):
         Token.__init__(self, lex, None, row, column)
 
@@ -219,3 +230,57 @@ class DisjointNode:
 
     def __repr__(self):
         return str(self)
+
+
+def little_endian(values: array) -> bytes:
+    """Bytes of `values` in little endian order, which is the one the table caches are written in."""
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def read_array(data: memoryview, offset, length):
+    """Reads `length` ints written by `little_endian` starting at `offset`. Returns them and the offset after them."""
+    values = array('i')
+    end = offset + length * values.itemsize
+    if end > len(data):
+        raise ValueError('Corrupted table')
+
+    values.frombytes(data[offset: end])
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values, end
+
+
+# Magic, format version and fingerprint of the sources that start every table cache file
+_CACHE_HEADER = struct.Struct('<7sI32s')
+
+
+def read_cache(path: Path, magic: bytes, version: int, fingerprint: bytes) -> Optional[memoryview]:
+    """
+    Contents of the cache file `path` after its header, or None if there's no cache or it was written with another
+    format version or from sources with another fingerprint.
+    """
+    try:
+        data = memoryview(path.read_bytes())
+        header = _CACHE_HEADER.unpack_from(data, 0)
+    except (OSError, struct.error):
+        return None
+    if header != (magic, version, fingerprint):
+        return None
+    return data[_CACHE_HEADER.size:]
+
+
+def write_cache(path: Path, magic: bytes, version: int, fingerprint: bytes, data: bytes):
+    """Writes a cache file for `read_cache` atomically, so concurrent readers never read a partially written one."""
+    temporary = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    try:
+        temporary.write_bytes(_CACHE_HEADER.pack(magic, version, fingerprint) + data)
+        os.replace(temporary, path)
+    except OSError:
+        # The cache is an optimization, a read-only installation just builds the tables again on every run
+        try:
+            temporary.unlink()
+        except OSError:
+            pass
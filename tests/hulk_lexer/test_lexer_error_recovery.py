@@ -0,0 +1,52 @@
+import unittest
+
+from src.lexer.hulk_lexer import HulkLexer
+from src.lexer.lexer import Lexer
+from src.lexer.lexer_table import LexerTable
+
+table_lexer = HulkLexer()
+automaton_lexer = HulkLexer(use_tables=False)
+
+
+def fail_to_synchronize(text, start):
+    raise AssertionError('The error state should have matched the unknown token')
+
+
+class TestLexerErrorRecovery(unittest.TestCase):
+
+    def assertSameTokens(self, lexer, expected_lexer, inp):
+        self.assertEqual(list(expected_lexer._tokenize(inp)), list(lexer._tokenize(inp)))
+
+    def test_table_has_error_state(self):
+        self.assertIn(LexerTable.UNKNOWN, table_lexer.lexer_table.accepting)
+        self.assertEqual((4, LexerTable.UNKNOWN), table_lexer.lexer_table.match('$¿ñπ;', 0))
+
+    def test_unknown_tokens_in_a_single_pass(self):
+        lexer = HulkLexer()
+        lexer._synchronize = fail_to_synchronize
+
+        inp = 'let a = $ 1 in ¿¿¿?? a;\n\x00\x01 π 😀 "ok" ~~~'
+        tokens = list(lexer._tokenize(inp))
+        self.assertEqual(list(automaton_lexer._tokenize(inp)), tokens)
+        self.assertEqual(['$', '¿¿¿??', '\x00\x01', 'π', '😀', '~~~'], [lex for lex, ttype, _, _ in tokens if ttype is None])
+
+    def test_every_character_has_a_column(self):
+        table = table_lexer.lexer_table
+        for char in ['\x00', '$', '\xad', 'π', '￿', '\U0010ffff']:
+            self.assertGreaterEqual(table.column(char), 0)
+
+    def test_same_tokens_on_garbage(self):
+        inp = ''.join(chr(code) for code in range(0, 600, 7)) * 3
+        self.assertSameTokens(table_lexer, automaton_lexer, inp)
+
+    def test_no_error_state_if_synchronizing_tokens_need_more_characters(self):
+        table = [('a', 'A'), ('b', 'B'), (' ', 'SPACE')]
+        tables_lexer = Lexer(table, '$', True, synchronizing_tokens=[('ab', 'AB')], use_tables=True)
+        automaton = Lexer(table, '$', True, synchronizing_tokens=[('ab', 'AB')])
+
+        self.assertNotIn(LexerTable.UNKNOWN, tables_lexer.lexer_table.accepting)
+        self.assertSameTokens(tables_lexer, automaton, 'a$$b$ab xx a$xab')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.errors import HulkLexicographicError
+from src.hulk_grammar import hulk_grammar
+from src.lexer.hulk_lexer import HulkLexer
+
+lexer = HulkLexer()
+
+programs = [
+    'let x = 42 in print(x);',
+    'function f(x) => x ? 2;\nf(PI);',
+    '',
+    'type A { x = "unterminated; }\nlet a = new A() in a.x;',
+] * 3
+
+
+class TestLexerFiles(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.paths = []
+        for i, program in enumerate(programs):
+            path = Path(self.directory.name) / f'program_{i}.hulk'
+            path.write_text(program)
+            self.paths.append(path)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def assertSameResults(self, expected, actual):
+        self.assertEqual(len(expected), len(actual))
+        for (expected_tokens, expected_errors), (tokens, errors) in zip(expected, actual):
+            self.assertEqual([str(token) for token in expected_tokens], [str(token) for token in tokens])
+            self.assertEqual([str(error) for error in expected_errors], [str(error) for error in errors])
+
+    def test_serial(self):
+        self.assertSameResults([lexer(program) for program in programs], lexer.lex_files(self.paths, 1))
+
+    def test_parallel(self):
+        results = lexer.lex_files(self.paths, 2)
+        self.assertSameResults([lexer(program) for program in programs], results)
+
+        for tokens, errors in results:
+            self.assertIs(hulk_grammar.G.EOF, tokens[-1].token_type)
+            self.assertTrue(all(isinstance(error, HulkLexicographicError) for error in errors))
+
+    def test_missing_file(self):
+        with self.assertRaises(FileNotFoundError):
+            lexer.lex_files(self.paths[:2] + [Path(self.directory.name) / 'missing.hulk'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
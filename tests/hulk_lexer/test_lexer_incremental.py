@@ -0,0 +1,120 @@
+import random
+import unittest
+from pathlib import Path
+
+from src.lexer.hulk_lexer import HulkLexer
+
+lexer = HulkLexer()
+automaton_lexer = HulkLexer(use_tables=False)
+
+sample = (Path(__file__).parent.parent.parent / 'test.hulk').read_text()
+
+pieces = ['let', ' ', '\n', 'x', '1', '.', '5', '"', 'a"', '\\', '#', 'π', 'in', '=>', '=', '>', '/', '*', '0.', ';',
+          '"open\n', 'fun', 'ction']
+
+
+def positions(tokens):
+    return [(tokens.lex(i), tokens.token_type(i), tokens.row(i), tokens.columns[i], tokens.offset(i), tokens.reach(i))
+            for i in range(len(tokens))]
+
+
+class TestLexerIncremental(unittest.TestCase):
+
+    def assertRelexed(self, lexer, tokens, text):
+        self.assertEqual(text, tokens.source)
+        self.assertEqual(positions(lexer.token_stream(text)), positions(tokens))
+
+    def edit(self, lexer, tokens, offset, deleted, inserted):
+        text = tokens.source[:offset] + inserted + tokens.source[offset + deleted:]
+        result = lexer.relex(tokens, offset, deleted, inserted)
+        self.assertRelexed(lexer, tokens, text)
+        return result
+
+    def test_insert_in_a_token(self):
+        tokens = lexer.token_stream('let abc = 1 in\nprint(abc);')
+        start, replaced, added = self.edit(lexer, tokens, 5, 0, 'x')
+        self.assertEqual((2, 1, 1), (start, replaced, added))
+        self.assertEqual('axbc', tokens.lex(2))
+
+    def test_tokens_after_the_edit_are_shifted(self):
+        tokens = lexer.token_stream('let x = 1 in\nprint(x);\nx;')
+        self.edit(lexer, tokens, 8, 1, '(1\n+ 2)')
+        i = [tokens.lex(i) for i in range(len(tokens))].index('print')
+        self.assertEqual((3, 1), (tokens.row(i), tokens.columns[i]))
+
+    def test_edit_joins_tokens(self):
+        tokens = lexer.token_stream('1 . 5 + x')
+        self.edit(lexer, tokens, 1, 1, '')
+        self.edit(lexer, tokens, 2, 1, '')
+        self.assertEqual('1.5', tokens.lex(0))
+
+    def test_edit_opens_a_string(self):
+        tokens = lexer.token_stream('let a = 1 in\nlet b = "x" in\nprint(a);')
+        self.edit(lexer, tokens, 8, 0, '"')
+        self.edit(lexer, tokens, 8, 1, '')
+
+    def test_edit_closes_a_string_read_past_earlier_tokens(self):
+        # The scan of the unclosed string read up to the end of the text, past the tokens after it
+        text = '"a\\"b c;'
+        tokens = lexer.token_stream(text)
+        self.assertEqual('"a\\"', tokens.lex(0))
+        self.edit(lexer, tokens, len(text) - 1, 0, '"')
+        self.assertEqual(['"a\\"b c"', ';', '$'], [tokens.lex(i) for i in range(len(tokens))])
+        self.edit(lexer, tokens, len(text) - 1, 1, '')
+        self.assertEqual('"a\\"', tokens.lex(0))
+
+    def test_empty_text(self):
+        tokens = lexer.token_stream('')
+        self.edit(lexer, tokens, 0, 0, 'let')
+        self.edit(lexer, tokens, 0, 3, '')
+        self.assertEqual(1, len(tokens))
+
+    def test_random_edits(self):
+        rnd = random.Random(0)
+        for text in [sample, ''.join(rnd.choice(pieces) for _ in range(100))]:
+            tokens = lexer.token_stream(text)
+            for _ in range(200):
+                offset = rnd.randrange(len(tokens.source) + 1)
+                deleted = rnd.randrange(min(4, len(tokens.source) - offset) + 1)
+                self.edit(lexer, tokens, offset, deleted, ''.join(rnd.choice(pieces) for _ in range(rnd.randrange(3))))
+
+    def test_typing_relexes_few_tokens(self):
+        tokens = lexer.token_stream(sample * 20)
+        offset = len(tokens.source) // 2
+        offset = tokens.source.index('\n', offset)
+        for i, char in enumerate('let y = 2 in y;'):
+            start, replaced, added = lexer.relex(tokens, offset + i, 0, char)
+            self.assertLessEqual(replaced + added, 6)
+        self.assertRelexed(lexer, tokens, tokens.source)
+
+    def test_without_tables(self):
+        tokens = automaton_lexer.token_stream('let x = 1 in x;')
+        self.edit(automaton_lexer, tokens, 4, 1, 'yz')
+
+    def test_filter_tokens(self):
+        tokens = lexer.token_stream('let x = "a in\nx + PI #;')
+        lexer.relex(tokens, 9, 0, '"')
+        filtered, errors = lexer.filter_tokens(tokens)
+        expected, expected_errors = lexer(tokens.source)
+        self.assertEqual([str(token) for token in expected], [str(token) for token in filtered])
+        self.assertEqual([str(error) for error in expected_errors], [str(error) for error in errors])
+
+
+    def test_refilter(self):
+        rnd = random.Random(1)
+        for text in [sample, ''.join(rnd.choice(pieces) for _ in range(100))]:
+            tokens = lexer.token_stream(text)
+            filtered, errors = lexer.filter_tokens(tokens)
+            for _ in range(50):
+                offset = rnd.randrange(len(tokens.source) + 1)
+                deleted = rnd.randrange(min(4, len(tokens.source) - offset) + 1)
+                inserted = ''.join(rnd.choice(pieces) for _ in range(rnd.randrange(3)))
+                lexer.refilter(tokens, filtered, errors, *lexer.relex(tokens, offset, deleted, inserted))
+                expected, expected_errors = lexer(tokens.source)
+                self.assertEqual([(str(token), token.row, token.column) for token in expected],
+                                 [(str(token), token.row, token.column) for token in filtered])
+                self.assertEqual([str(error) for error in expected_errors], [str(error) for error in errors])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+
+from src.lexer.hulk_lexer import HulkLexer, reserved_words, hulk_tokens
+from src.lexer.hulk_token_types import TokenType
+
+table_lexer = HulkLexer()
+automaton_lexer = HulkLexer(use_tables=False)
+
+
+class TestLexerKeywords(unittest.TestCase):
+
+    def assertTokenTypes(self, inp, expected):
+        for lexer in [table_lexer, automaton_lexer]:
+            tokens, errors = lexer(inp)
+            self.assertEqual(0, len(errors))
+            self.assertEqual(expected, [token.token_type for token in tokens[:-1]])
+
+    def test_keywords(self):
+        self.assertTokenTypes('type A inherits B { } protocol P extends Q { } function f() => base();', [
+            TokenType.TYPE, TokenType.IDENTIFIER, TokenType.INHERITS, TokenType.IDENTIFIER, TokenType.OPEN_BRACKET,
+            TokenType.CLOSE_BRACKET, TokenType.PROTOCOL, TokenType.IDENTIFIER, TokenType.EXTENDS, TokenType.IDENTIFIER,
+            TokenType.OPEN_BRACKET, TokenType.CLOSE_BRACKET, TokenType.FUNCTION, TokenType.IDENTIFIER,
+            TokenType.OPEN_PAREN, TokenType.CLOSE_PAREN, TokenType.ARROW, TokenType.BASE, TokenType.OPEN_PAREN,
+            TokenType.CLOSE_PAREN, TokenType.SEMICOLON])
+
+    def test_identifiers_that_contain_keywords(self):
+        self.assertTokenTypes('lets inx iff typed _if If LET truex false_ PIE', [TokenType.IDENTIFIER] * 10)
+
+    def test_booleans_and_pi(self):
+        self.assertTokenTypes('true false PI', [TokenType.BOOLEAN, TokenType.BOOLEAN, TokenType.NUMBER])
+        tokens, _ = table_lexer('PI')
+        self.assertEqual('3.141592', tokens[0].lex)
+
+    def test_keywords_are_not_in_the_automaton(self):
+        self.assertFalse(any(token_type in reserved_words.values() for _, token_type in hulk_tokens))
+        with self.assertRaises(TypeError):
+            reserved_words['loop'] = TokenType.WHILE
+
+    def test_new_keywords_do_not_change_the_tables(self):
+        lexer = HulkLexer()
+        lexer.keywords = dict(reserved_words, loop=TokenType.WHILE)
+
+        self.assertEqual(table_lexer.lexer_table.transitions, lexer.lexer_table.transitions)
+        tokens, _ = lexer('loop (x) loops')
+        self.assertEqual([TokenType.WHILE, TokenType.OPEN_PAREN, TokenType.IDENTIFIER, TokenType.CLOSE_PAREN,
+                          TokenType.IDENTIFIER], [token.token_type for token in tokens[:-1]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+
+from src.automaton import hopcroft_partition, reachable_states
+from src.lexer.hulk_lexer import HulkLexer
+from src.lexer.hulk_token_types import TokenType
+from src.lexer.lexer import Lexer
+from src.lexer.lexer_table import LexerTable, accepting_priority
+from src.regex.regex_automaton import get_regex_automaton
+
+minimized_lexer = HulkLexer(rebuild=True)
+unminimized_lexer = HulkLexer(rebuild=True, minimize=False)
+dfa_lexer = HulkLexer(use_tables=False, convert_to_dfa=True, minimize=True)
+
+
+class TestLexerMinimization(unittest.TestCase):
+
+    def test_hopcroft_partition(self):
+        # (a|b)*abb, where states 0 and 2 are equivalent
+        table = [[1, 2], [1, 3], [1, 2], [1, 4], [1, 2]]
+        blocks = hopcroft_partition(5, 2, lambda state, symbol: table[state][symbol], [0, 0, 0, 0, 1])
+        self.assertEqual([0, 1, 0, 2, 3], blocks)
+
+    def test_hopcroft_partition_keeps_labels_apart(self):
+        table = [[1], [-1], [-1]]
+        self.assertEqual([0, 1, 2], hopcroft_partition(3, 1, lambda state, symbol: table[state][symbol], [-1, 0, 1]))
+        self.assertEqual([0, 1, 1], hopcroft_partition(3, 1, lambda state, symbol: table[state][symbol], [-1, 0, 0]))
+
+    def test_state_minimize(self):
+        start, _ = get_regex_automaton('(a|b)*abb')
+        dfa = start.to_deterministic()
+        minimized = dfa.minimize()
+
+        self.assertEqual(5, len(reachable_states(dfa)))
+        self.assertEqual(4, len(reachable_states(minimized)))
+        for word in ['abb', 'aabb', 'babb', 'abababb']:
+            self.assertTrue(minimized.recognize(word))
+        for word in ['', 'ab', 'abba', 'bbb']:
+            self.assertFalse(minimized.recognize(word))
+
+    def test_table_minimize_keeps_token_priority(self):
+        lexer = Lexer([('ab|cb', 'AB'), ('[a-c]b', 'ID')], '$', True)
+        table = LexerTable.from_automaton(lexer.automaton.to_deterministic().minimize(accepting_priority))
+        minimized = table.minimize()
+
+        self.assertEqual((2, 0), minimized.match('ab', 0))
+        self.assertEqual((2, 1), minimized.match('bb', 0))
+        self.assertEqual((2, 0), minimized.match('cb', 0))
+        self.assertLessEqual(minimized.states_count, table.states_count)
+
+    def test_minimized_tables_are_smaller(self):
+        self.assertLess(minimized_lexer.lexer_table.states_count, unminimized_lexer.lexer_table.states_count)
+        self.assertLessEqual(minimized_lexer.synchronizing_lexer_table.states_count,
+                             unminimized_lexer.synchronizing_lexer_table.states_count)
+
+    def test_same_tokens(self):
+        inp = '''
+        type Point(x, y) inherits Object { getX() => self.x; }
+        let p = new Point(3, 4.5), s = "x\\"y" in if (p is Point) print(s @@ p.getX()) elif (true) 0 else ¿ 1;
+        '''
+        expected = list(unminimized_lexer._tokenize(inp))
+        self.assertEqual(expected, list(minimized_lexer._tokenize(inp)))
+        self.assertEqual(expected, list(dfa_lexer._tokenize(inp)))
+
+    def test_minimized_dfa_keeps_keywords(self):
+        tokens, errors = dfa_lexer('let letter in inner')
+        self.assertEqual(0, len(errors))
+        self.assertEqual([TokenType.LET, TokenType.IDENTIFIER, TokenType.IN, TokenType.IDENTIFIER],
+                         [token.token_type for token in tokens[:-1]])
+
+
+if __name__ == '__main__':
+    unittest.main()
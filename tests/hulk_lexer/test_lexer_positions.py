@@ -0,0 +1,43 @@
+import unittest
+
+from src.lexer.hulk_lexer import HulkLexer
+
+table_lexer = HulkLexer()
+automaton_lexer = HulkLexer(use_tables=False)
+
+
+class TestLexerPositions(unittest.TestCase):
+
+    def assertPositions(self, inp, expected):
+        for lexer in [table_lexer, automaton_lexer]:
+            tokens, _ = lexer(inp)
+            self.assertEqual(expected, [(token.lex, token.row, token.column) for token in tokens])
+
+    def test_positions(self):
+        self.assertPositions('let x = 42 in\n  print(x);\n\tx', [
+            ('let', 1, 1), ('x', 1, 5), ('=', 1, 7), ('42', 1, 9), ('in', 1, 12),
+            ('print', 2, 3), ('(', 2, 8), ('x', 2, 9), (')', 2, 10), (';', 2, 11),
+            ('x', 3, 2), ('$', 4, 0)])
+
+    def test_empty_lines(self):
+        self.assertPositions('\n\n\n  a\n\nb\n', [('a', 4, 3), ('b', 6, 1), ('$', 7, 0)])
+
+    def test_positions_of_errors(self):
+        for lexer in [table_lexer, automaton_lexer]:
+            _, errors = lexer('let a = 1 in\n  a ? 2;\n"abc\n  $ b')
+            self.assertEqual([(2, 5), (3, 1), (4, 3)], [(error.line, error.column) for error in errors])
+
+    def test_positions_of_unknown_tokens(self):
+        for lexer in [table_lexer, automaton_lexer]:
+            tokens = [token for token in lexer._tokenize('x\n¿ñ\n  ? ;') if token[1] is None]
+            self.assertEqual([('¿ñ', 2, 1), ('?', 3, 3)], [(lex, row, col) for lex, _, row, col in tokens])
+
+    def test_long_input(self):
+        line = 'let s = "' + 'x' * 1000 + '" in print(s);\n'
+        tokens, errors = table_lexer(line * 200)
+        self.assertEqual(0, len(errors))
+        self.assertEqual([(200, 1), (200, 1012)], [(token.row, token.column) for token in tokens[-11:-6:4]])
+
+
+if __name__ == '__main__':
+    unittest.main()
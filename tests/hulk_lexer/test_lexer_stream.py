@@ -0,0 +1,75 @@
+import io
+import mmap
+import os
+import tempfile
+import unittest
+
+from src.lexer.hulk_lexer import HulkLexer
+from src.lexer.hulk_token_types import TokenType
+from src.lexer.lexer import read_chunks
+
+lexer = HulkLexer()
+
+program = '''
+type Point(x, y) {
+    x = x;
+    y = y;
+    norm() => sqrt(self.x ^ 2 + self.y ^ 2);
+}
+
+let p = new Point(3, 4), s = "¡The norm is \\"" in print(s @@ p.norm() @@ PI) # ?
+let u = "unterminated
+'''
+
+
+class TestLexerStream(unittest.TestCase):
+
+    def assertSameAsCall(self, text, source, chunk_size):
+        expected_tokens, expected_errors = lexer(text)
+        errors = []
+        tokens = list(lexer.stream(source, errors, chunk_size))
+        self.assertEqual([str(token) for token in expected_tokens], [str(token) for token in tokens])
+        self.assertEqual([str(error) for error in expected_errors], [str(error) for error in errors])
+
+    def test_tokens_span_chunks(self):
+        for chunk_size in [1, 2, 3, 7, 64]:
+            self.assertSameAsCall(program, io.StringIO(program), chunk_size)
+
+    def test_binary_file(self):
+        for chunk_size in [1, 5, 4096]:
+            self.assertSameAsCall(program, io.BytesIO(program.encode('utf-8')), chunk_size)
+
+    def test_path_and_mmap(self):
+        fd, path = tempfile.mkstemp(suffix='.hulk')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(program)
+
+            self.assertSameAsCall(program, path, 16)
+
+            with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                self.assertSameAsCall(program, buffer, 16)
+        finally:
+            os.remove(path)
+
+    def test_line_endings_are_translated(self):
+        for chunk_size in [1, 2, 3]:
+            self.assertEqual('a\nb\nc\n', ''.join(read_chunks(b'a\r\nb\rc\r\n', chunk_size)))
+            self.assertEqual('ñ\n', ''.join(read_chunks('ñ\r\n'.encode('utf-8'), chunk_size)))
+
+    def test_tokens_are_lazy(self):
+        errors = []
+        tokens = lexer.stream(io.StringIO('let x = PI in x # 1'), errors, 1)
+        self.assertEqual(TokenType.LET, next(tokens).token_type)
+        self.assertEqual(0, len(errors))
+
+        rest = list(tokens)
+        self.assertEqual(['x', '=', '3.141592', 'in', 'x', '1', '$'], [token.lex for token in rest])
+        self.assertEqual(1, len(errors))
+
+    def test_empty_source(self):
+        self.assertSameAsCall('', io.StringIO(''), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+
+from src.errors import HulkLexicographicError
+from src.lexer.hulk_lexer import HulkLexer
+from src.lexer.hulk_token_types import TokenType
+
+table_lexer = HulkLexer()
+automaton_lexer = HulkLexer(use_tables=False)
+
+
+class TestHulkLexerTables(unittest.TestCase):
+
+    def assertSameTokens(self, inp):
+        expected = list(automaton_lexer._tokenize(inp))
+        actual = list(table_lexer._tokenize(inp))
+        self.assertEqual(expected, actual)
+
+    def test_uses_tables_by_default(self):
+        self.assertIsNotNone(table_lexer.lexer_table)
+        self.assertIsNone(automaton_lexer.lexer_table)
+
+    def test_maximal_munch(self):
+        tokens, errors = table_lexer('let x=>y:=2**3 in x==y')
+        self.assertEqual(0, len(errors))
+        self.assertEqual([TokenType.LET, TokenType.IDENTIFIER, TokenType.ARROW, TokenType.IDENTIFIER,
+                          TokenType.DEST_ASSIGMENT, TokenType.NUMBER, TokenType.POWER2, TokenType.NUMBER, TokenType.IN,
+                          TokenType.IDENTIFIER, TokenType.EQ, TokenType.IDENTIFIER],
+                         [token.token_type for token in tokens[:-1]])
+
+    def test_keywords_have_priority_over_identifiers(self):
+        tokens, errors = table_lexer('let letter in inner')
+        self.assertEqual([TokenType.LET, TokenType.IDENTIFIER, TokenType.IN, TokenType.IDENTIFIER],
+                         [token.token_type for token in tokens[:-1]])
+
+    def test_same_tokens_as_automaton(self):
+        self.assertSameTokens('''
+        function fib(n) => if (n == 0 | n == 1) 1 else fib(n - 1) + fib(n - 2);
+        let s = "The meaning of \\"life\\" is" @@ 42.5 in print(s);
+        ''')
+
+    def test_same_tokens_as_automaton_with_errors(self):
+        self.assertSameTokens('let x = 5 # ¿ ñ π ~~ $$ in 0.x 1. "unterminated')
+
+    def test_same_errors_as_automaton(self):
+        inp = 'let a = 3 in a ? 4 $ "abc'
+        tokens, errors = table_lexer(inp)
+        expected_tokens, expected_errors = automaton_lexer(inp)
+        self.assertEqual([str(error) for error in expected_errors], [str(error) for error in errors])
+        self.assertEqual(2, sum(error.text == HulkLexicographicError.UNKNOWN_TOKEN % '?' or
+                                error.text == HulkLexicographicError.UNKNOWN_TOKEN % '$' for error in errors))
+
+    def test_string_characters(self):
+        tokens, errors = table_lexer('"¡Hola, señor! \\\\ \\" [x]+?"')
+        self.assertEqual(0, len(errors))
+        self.assertEqual([TokenType.STRING], [token.token_type for token in tokens[:-1]])
+
+    def test_characters_outside_latin1_are_unknown(self):
+        tokens, errors = table_lexer('let π = 3 in π')
+        self.assertEqual(2, len(errors))
+        self.assertSameTokens('let π = 3 in "π"')
+
+    def test_equivalent_characters_share_a_column(self):
+        table = table_lexer.lexer_table
+        self.assertEqual(table.column('q'), table.column('z'))
+        self.assertEqual(table.column('Q'), table.column('Z'))
+        self.assertNotEqual(table.column('z'), table.column('9'))
+        self.assertEqual(table.column('π'), table.column('😀'))
+
+    def test_statistics(self):
+        statistics = table_lexer.lexer_table.statistics()
+        self.assertLess(statistics['classes'], statistics['ranges'])
+        self.assertLess(statistics['table_bytes'], statistics['uncompressed_table_bytes'])
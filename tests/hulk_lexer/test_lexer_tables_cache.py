@@ -0,0 +1,52 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.lexer.hulk_lexer import HulkLexer, hulk_tokens, hulk_lexer_synchronizing_tokens
+from src.lexer.hulk_token_types import TokenType
+from src.lexer.lexer_table import tables_fingerprint, load_tables, save_tables
+
+lexer = HulkLexer()
+
+
+class TestHulkLexerTablesCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.directory.name) / 'tables.bin'
+        self.fingerprint = tables_fingerprint(hulk_tokens, hulk_lexer_synchronizing_tokens)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        save_tables(self.path, self.fingerprint, [lexer.lexer_table, lexer.synchronizing_lexer_table])
+        table, synchronizing_table = load_tables(self.path, self.fingerprint)
+
+        for expected, actual in [(lexer.lexer_table, table), (lexer.synchronizing_lexer_table, synchronizing_table)]:
+            self.assertEqual(expected.transitions, actual.transitions)
+            self.assertEqual(expected.accepting, actual.accepting)
+            self.assertEqual(expected.ranges, actual.ranges)
+            self.assertEqual(expected.range_columns, actual.range_columns)
+            self.assertEqual(expected.byte_columns, actual.byte_columns)
+
+    def test_fingerprint_depends_on_token_tables(self):
+        changed = hulk_tokens + [("~", TokenType.NOT)]
+        self.assertNotEqual(self.fingerprint, tables_fingerprint(changed, hulk_lexer_synchronizing_tokens))
+
+    def test_stale_cache_is_ignored(self):
+        save_tables(self.path, self.fingerprint, [lexer.lexer_table, lexer.synchronizing_lexer_table])
+        changed = tables_fingerprint(hulk_tokens + [("~", TokenType.NOT)], hulk_lexer_synchronizing_tokens)
+        self.assertIsNone(load_tables(self.path, changed))
+
+    def test_corrupted_cache_is_ignored(self):
+        save_tables(self.path, self.fingerprint, [lexer.lexer_table, lexer.synchronizing_lexer_table])
+        self.path.write_bytes(self.path.read_bytes()[:100])
+        self.assertIsNone(load_tables(self.path, self.fingerprint))
+
+    def test_missing_cache_is_ignored(self):
+        self.assertIsNone(load_tables(self.path, self.fingerprint))
+
+    def test_rebuilt_lexer_matches_cached_lexer(self):
+        inp = 'let x = "hello" @@ 42 in print(x # 3);'
+        self.assertEqual(list(HulkLexer(rebuild=True)._tokenize(inp)), list(lexer._tokenize(inp)))
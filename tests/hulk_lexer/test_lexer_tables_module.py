@@ -0,0 +1,66 @@
+import types
+import unittest
+from unittest import mock
+
+import src.lexer.hulk_lexer as hulk_lexer
+from src.lexer import hulk_lexer_tables
+from src.lexer.hulk_lexer import HulkLexer, hulk_lexer_fingerprint
+from src.lexer.lexer_table import tables_module_source, load_tables_module
+
+rebuilt_lexer = HulkLexer(rebuild=True)
+
+
+def tables_module(source):
+    module = types.ModuleType('generated_tables')
+    exec(source, module.__dict__)
+    return module
+
+
+def fail_to_load(*args):
+    raise AssertionError('The tables should have been loaded from the generated module')
+
+
+class TestLexerTablesModule(unittest.TestCase):
+
+    def assertSameTables(self, expected, actual):
+        for expected_table, table in zip(expected, actual):
+            self.assertEqual(expected_table.transitions, table.transitions)
+            self.assertEqual(expected_table.accepting, table.accepting)
+            self.assertEqual(expected_table.ranges, table.ranges)
+            self.assertEqual(expected_table.range_columns, table.range_columns)
+
+    def test_generated_module_is_up_to_date(self):
+        tables = load_tables_module(hulk_lexer_tables, hulk_lexer_fingerprint())
+        self.assertIsNotNone(tables, 'Run `python -m src.lexer.generate_hulk_lexer_tables`')
+        self.assertSameTables([rebuilt_lexer.lexer_table, rebuilt_lexer.synchronizing_lexer_table], tables)
+
+    def test_round_trip(self):
+        expected = [rebuilt_lexer.lexer_table, rebuilt_lexer.synchronizing_lexer_table]
+        module = tables_module(tables_module_source(b'\1' * 32, expected, 'test'))
+        self.assertSameTables(expected, load_tables_module(module, b'\1' * 32))
+
+    def test_other_fingerprint_or_version(self):
+        source = tables_module_source(b'\1' * 32, [rebuilt_lexer.lexer_table], 'test')
+        self.assertIsNone(load_tables_module(tables_module(source), b'\2' * 32))
+
+        module = tables_module(source)
+        module.TABLES_FORMAT_VERSION -= 1
+        self.assertIsNone(load_tables_module(module, b'\1' * 32))
+
+    def test_lexer_prefers_the_generated_module(self):
+        with mock.patch.object(hulk_lexer, 'load_tables', fail_to_load):
+            lexer = HulkLexer()
+        self.assertIsNone(getattr(lexer, 'automaton', None))
+        self.assertEqual(list(rebuilt_lexer._tokenize('let x = "a" in x')), list(lexer._tokenize('let x = "a" in x')))
+
+    def test_lexer_builds_the_tables_if_the_module_is_outdated(self):
+        with mock.patch.object(hulk_lexer, 'load_generated_tables', lambda fingerprint: None), \
+                mock.patch.object(hulk_lexer, 'load_tables', lambda path, fingerprint: None):
+            lexer = HulkLexer()
+        self.assertIsNotNone(lexer.automaton)
+        self.assertSameTables([rebuilt_lexer.lexer_table, rebuilt_lexer.synchronizing_lexer_table],
+                              [lexer.lexer_table, lexer.synchronizing_lexer_table])
+
+
+if __name__ == '__main__':
+    unittest.main()
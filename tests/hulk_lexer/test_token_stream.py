@@ -0,0 +1,61 @@
+import unittest
+
+from src.hulk_grammar import hulk_grammar
+from src.lexer.hulk_lexer import HulkLexer
+from src.lexer.hulk_token_types import TokenType
+from src.lexer.token_stream import TokenStream
+from src.parser.hulk_parser import tokens_terminals_map
+from src.utils import Token
+
+lexer = HulkLexer()
+
+
+class TestTokenStream(unittest.TestCase):
+
+    def test_lexer_returns_a_token_stream(self):
+        tokens, errors = lexer('let x = "hi" in\n  print(x);')
+        self.assertIsInstance(tokens, TokenStream)
+        self.assertEqual(['let', 'x', '=', '"hi"', 'in', 'print', '(', 'x', ')', ';', '$'],
+                         [token.lex for token in tokens])
+
+    def test_views_have_the_token_interface(self):
+        tokens, _ = lexer('let x = 1 in\n  x')
+        token = tokens[-2]
+        self.assertIsInstance(token, Token)
+        self.assertTrue(token.is_valid)
+        self.assertEqual(('x', TokenType.IDENTIFIER, 2, 3), (token.lex, token.token_type, token.row, token.column))
+        self.assertEqual(str(Token('x', TokenType.IDENTIFIER, 2, 3)), str(token))
+        self.assertFalse(hasattr(token, '__dict__'))
+
+    def test_unknown_tokens_are_not_valid(self):
+        tokens = lexer.token_stream('let x = 1 ? 2 in x')
+        self.assertEqual(['?'], [token.lex for token in tokens if not token.is_valid])
+
+    def test_indexing(self):
+        tokens, _ = lexer('a + b')
+        self.assertEqual(4, len(tokens))
+        self.assertEqual('b', tokens[2].lex)
+        self.assertEqual('b', tokens[-2].lex)
+        self.assertEqual(['+', 'b'], [token.lex for token in tokens[1:3]])
+        self.assertEqual(hulk_grammar.G.EOF, tokens[-1].token_type)
+        with self.assertRaises(IndexError):
+            tokens[4]
+
+    def test_lexemes_not_in_the_source(self):
+        tokens, _ = lexer('2 * PI')
+        self.assertEqual(['2', '*', '3.141592', '$'], [token.lex for token in tokens])
+        self.assertEqual([TokenType.NUMBER, TokenType.STAR, TokenType.NUMBER],
+                         [token.token_type for token in tokens[:-1]])
+
+    def test_map_types(self):
+        tokens, _ = lexer('let x = 1 in x')
+        self.assertEqual([tokens_terminals_map[token.token_type] for token in tokens],
+                         tokens.map_types(tokens_terminals_map))
+
+    def test_memory_per_token(self):
+        tokens, _ = lexer('let x = [i ^ 2 || i in range(1, 10)] in print(x);\n' * 100)
+        self.assertLessEqual(tokens.nbytes() / len(tokens), 24)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+
+from src.lexer.hulk_lexer import HulkLexer
+from src.parser.hulk_parser import HulkParser
+from src.parsing import ShiftReduceParser, CompactTable, ParserError, LR1Parser
+from src.regex.regex_grammar import get_regex_grammar
+
+lexer = HulkLexer()
+parser = HulkParser(rebuild=True)
+
+
+def lookup(table: CompactTable, state, symbol):
+    i = table.base[state] + table.symbols.get(symbol, table.unknown)
+    if table.check[i] != state:
+        return None
+    action = table.actions[i]
+    if action > 0:
+        return ShiftReduceParser.SHIFT, action
+    production = table.productions[-action - 1]
+    if production is None:
+        return ShiftReduceParser.OK, None
+    return ShiftReduceParser.REDUCE, production
+
+
+class TestCompactTable(unittest.TestCase):
+
+    def test_same_actions_as_the_table(self):
+        table = parser.compact_table
+        for (state, symbol), action in parser.table.items():
+            self.assertEqual(action, lookup(table, state, symbol))
+
+        states = {state for state, _ in parser.table}
+        missing = [(state, symbol) for state in states for symbol in table.symbols
+                   if (state, symbol) not in parser.table]
+        self.assertTrue(all(lookup(table, state, symbol) is None for state, symbol in missing))
+        self.assertIsNone(lookup(table, 0, 'not a symbol'))
+
+    def test_rows_are_overlapped(self):
+        table = parser.compact_table
+        self.assertLess(len(table.check), 2 * len(parser.table))
+        self.assertLess(table.nbytes(), 16 * len(parser.table))
+
+    def test_errors_are_found_at_the_same_token(self):
+        for program, index in [('let x = 1 in ;', 5), ('print(1', 3), ('', 0), ('type A { x = 1 }', 6),
+                               ('function f() => ;', 5)]:
+            tokens, _ = lexer(program)
+            _, _, errors = parser(tokens)
+            self.assertEqual(1, len(errors))
+            self.assertEqual((tokens[index].row, tokens[index].column), (errors[0].line, errors[0].column))
+
+    def test_input_past_the_end(self):
+        G = get_regex_grammar()[0]
+        with self.assertRaises(ParserError) as context:
+            LR1Parser(G)([G.symbDict['char']])
+        self.assertEqual(1, context.exception.token_index)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+
+from src.lexer.hulk_lexer import HulkLexer
+from src.parser.hulk_parser import HulkParser
+from src.parsing import LR1Parser
+from src.regex.regex_grammar import get_regex_grammar
+
+lexer = HulkLexer()
+parser = HulkParser()
+lalr_parser = HulkParser(lalr=True)
+first_error_parser = HulkParser(recover=False)
+
+
+def positions(errors):
+    return [(error.line, error.column) for error in errors]
+
+
+class TestErrorRecovery(unittest.TestCase):
+
+    def assertErrors(self, program, expected):
+        tokens, _ = lexer(program)
+        for p in [parser, lalr_parser]:
+            _, _, errors = p(tokens)
+            self.assertEqual(expected, positions(errors))
+            ast, errors = p.parse(tokens)
+            self.assertIsNone(ast)
+            self.assertEqual(expected, positions(errors))
+
+    def test_errors_in_expressions(self):
+        self.assertErrors('{ print(1 +); print(2 *); print(3); }', [(1, 12), (1, 24)])
+        self.assertErrors('let x = 1 in\nprint(x +);', [(2, 10)])
+
+    def test_errors_in_declarations(self):
+        self.assertErrors('function f() => ;\nfunction g() => 1 + ;\ntype A { x = 1 }\nprotocol P { }\nprint(g(;);',
+                          [(1, 17), (2, 21), (3, 16), (4, 14), (5, 9)])
+
+    def test_resumes_after_a_skipped_phrase(self):
+        self.assertErrors('{ let a = 42, let b = a in print(b);\n let c = 10 in c\n for (x in y) print(x);\n print(1); }',
+                          [(1, 15), (3, 2)])
+
+    def test_cascading_errors_are_not_reported(self):
+        self.assertErrors('{ 1; }\nprint(2);', [(2, 1)])
+        self.assertErrors('{ let a = ; print(a); print(a); }', [(1, 11)])
+        self.assertErrors('print((1 + 2) 3 + 4 + 5);', [(1, 15)])
+
+    def test_errors_in_consecutive_declarations(self):
+        # Resuming on the `;` of the first line must not make the error of the second one look like a cascading error
+        self.assertErrors('function g( { 1 };\nlet a = 3 in print(a +);', [(1, 13), (2, 23)])
+
+    def test_errors_at_the_end(self):
+        self.assertErrors('print(1', [(2, 0)])
+        self.assertErrors('', [(2, 0)])
+
+    def test_first_error_only(self):
+        tokens, _ = lexer('{ print(1 +); print(2 *); print(3); }')
+        self.assertEqual([(1, 12)], positions(first_error_parser(tokens)[2]))
+        self.assertEqual([(1, 12)], positions(first_error_parser.parse(tokens)[1]))
+
+    def test_other_grammars(self):
+        G = get_regex_grammar()[0]
+        char, star, pipe = G.symbDict['char'], G.symbDict['*'], G.symbDict['|']
+        regex_parser = LR1Parser(G)
+        self.assertEqual([], regex_parser.find_errors([char, star, pipe, char, G.EOF], [pipe]))
+        self.assertEqual([2], [error.token_index for error in
+                               regex_parser.find_errors([char, pipe, star, G.EOF], [pipe])])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+
+from src.parsing import compute_firsts, compute_follows, SymbolBitsets
+from src.pycompiler import Grammar
+
+
+def arithmetic_grammar():
+    G = Grammar()
+    E = G.NonTerminal('E', True)
+    T, X, Y = G.NonTerminals('T X Y')
+    plus, star, opar, cpar, num = G.Terminals('+ * ( ) int')
+
+    E %= T + X
+    X %= plus + E
+    X %= G.Epsilon
+    T %= num + Y
+    T %= opar + E + cpar
+    Y %= star + T
+    Y %= G.Epsilon
+    return G
+
+
+def names(symbols):
+    return {symbol.Name for symbol in symbols}
+
+
+class TestFirstFollow(unittest.TestCase):
+
+    def test_firsts(self):
+        G = arithmetic_grammar()
+        firsts = {symbol.Name: names(first) for symbol, first in compute_firsts(G).items()}
+        self.assertEqual({'int', '('}, firsts['E'])
+        self.assertEqual({'int', '('}, firsts['T'])
+        self.assertEqual({'+', 'epsilon'}, firsts['X'])
+        self.assertEqual({'*', 'epsilon'}, firsts['Y'])
+        self.assertEqual({'+'}, firsts['+'])
+
+    def test_follows(self):
+        G = arithmetic_grammar()
+        follows = {symbol.Name: names(follow) for symbol, follow in compute_follows(G).items()}
+        self.assertEqual({'$', ')'}, follows['E'])
+        self.assertEqual({'$', ')'}, follows['X'])
+        self.assertEqual({'+', '$', ')'}, follows['T'])
+        self.assertEqual({'+', '$', ')'}, follows['Y'])
+
+    def test_nullable_chains(self):
+        G = Grammar()
+        S = G.NonTerminal('S', True)
+        A, B, C = G.NonTerminals('A B C')
+        a, b, c = G.Terminals('a b c')
+
+        S %= A + B + C + a
+        A %= B + C
+        B %= C
+        B %= b
+        C %= G.Epsilon
+        C %= c
+
+        bitsets = SymbolBitsets(G)
+        self.assertEqual({A, B, C}, bitsets.nullable)
+        self.assertEqual({'a', 'b', 'c'}, names(bitsets.to_set(bitsets.first[S])))
+        self.assertEqual({'a', 'b', 'c'}, names(bitsets.to_set(bitsets.follow[C])))
+        self.assertEqual({'a', 'b', 'c'}, names(bitsets.to_set(bitsets.follow[A])))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import re
+import unittest
+
+from src.evaluation import evaluate_reverse_parse
+from src.lexer.hulk_lexer import HulkLexer
+from src.parser.hulk_parser import HulkParser
+from src.semantics.formatter_visitor import Formatter
+
+lexer = HulkLexer()
+parser = HulkParser(rebuild=True)
+lalr_parser = HulkParser(rebuild=True, lalr=True)
+
+programs = [
+    'print(42);',
+    'function f(x: Number): Number => x ^ 2 + PI;\nlet a = f(2), b = [i || i in range(0, a)] in print(b[0] @@ "!");',
+    '''
+    protocol Hashable { hash(): Number; }
+    type Point(x: Number, y: Number) inherits Object {
+        x = x;
+        y = y;
+        hash(): Number => self.x * 31 + self.y;
+        norm() { let s = self.x ^ 2 + self.y ^ 2 in s ^ 0.5; }
+    }
+    let p = new Point(3, 4) in {
+        if (p is Point) print(p.norm()) elif (true & !false) print(0) else print(1);
+        while (p.x > 0) p.x := p.x - 1;
+        for (i in [1, 2, 3]) print((p as Point).hash() + i);
+    };
+    ''',
+]
+
+
+def formatted(ast):
+    # Some nodes are formatted with the default repr of their children, which has their address
+    return re.sub(r' at 0x[0-9a-f]+', '', Formatter().visit(ast))
+
+
+class TestFusedEvaluation(unittest.TestCase):
+
+    def assertSameAst(self, parser, program):
+        tokens, errors = lexer(program)
+        self.assertEqual([], errors)
+
+        derivation, operations, _ = parser(tokens)
+        expected = evaluate_reverse_parse(derivation, operations, tokens)
+        ast, errors = parser.parse(tokens)
+        self.assertEqual([], errors)
+        self.assertEqual(formatted(expected), formatted(ast))
+
+    def test_same_ast_as_evaluating_the_derivation(self):
+        for program in programs:
+            self.assertSameAst(parser, program)
+            self.assertSameAst(lalr_parser, program)
+
+    def test_list_of_tokens(self):
+        tokens, _ = lexer(programs[1])
+        ast, errors = parser.parse(list(tokens))
+        self.assertEqual([], errors)
+        self.assertEqual(formatted(parser.parse(tokens)[0]), formatted(ast))
+
+    def test_syntactic_errors(self):
+        tokens, _ = lexer('let x = 1 in\nprint(x +);')
+        ast, errors = parser.parse(tokens)
+        self.assertIsNone(ast)
+        self.assertEqual([str(error) for error in parser(tokens)[2]], [str(error) for error in errors])
+
+
+if __name__ == '__main__':
+    unittest.main()
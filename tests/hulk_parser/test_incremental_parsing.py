@@ -0,0 +1,140 @@
+import re
+import unittest
+
+from src.lexer.hulk_lexer import HulkLexer
+from src.parser.hulk_parser import HulkParser, DeclarationCache
+from src.semantics.formatter_visitor import Formatter
+
+lexer = HulkLexer()
+parser = HulkParser()
+
+program = '''
+function f(x: Number): Number => x ^ 2 + PI;
+function g(x) { let y = {x;} in y; };
+function h() { 1; }
+type Point(x: Number, y) inherits Object() { x = x; norm() => self.x ^ 2; }
+type Origin inherits Point(0, 0) { }
+protocol Hashable extends Object { hash(): Number; }
+let p = new Point(f(1), g(2)) in print(p.norm());
+'''
+
+
+def formatted(ast):
+    # Some nodes are formatted with the default repr of their children, which has their address
+    return re.sub(r' at 0x[0-9a-f]+', '', Formatter().visit(ast))
+
+
+class TestIncrementalParsing(unittest.TestCase):
+
+    def assertParsedAs(self, text, cache, reused, parsed):
+        tokens, _ = lexer(text)
+        ast, errors = parser.parse_incremental(tokens, cache)
+        expected, expected_errors = parser.parse(tokens)
+        self.assertEqual([str(error) for error in expected_errors], [str(error) for error in errors])
+        if expected is not None:
+            self.assertEqual(formatted(expected), formatted(ast))
+        self.assertEqual((reused, parsed), (cache.reused, cache.parsed))
+        return ast
+
+    def assertEdited(self, raw, filtered, errors, cache, offset, deleted, inserted, reused, parsed):
+        edit = lexer.refilter(raw, filtered, errors, *lexer.relex(raw, offset, deleted, inserted))
+        ast, syntactic_errors = parser.parse_incremental(filtered, cache, edit)
+        expected, expected_errors = parser.parse(filtered)
+        self.assertEqual([str(error) for error in expected_errors], [str(error) for error in syntactic_errors])
+        if expected is not None:
+            self.assertEqual(formatted(expected), formatted(ast))
+            self.assertEqual((reused, parsed), (cache.reused, cache.parsed))
+        return ast
+
+    def test_declaration_spans(self):
+        tokens, _ = lexer(program)
+        spans = HulkParser._declaration_spans(HulkParser._terminals(tokens))
+        self.assertEqual(['function f', 'function g', 'function h', 'type Point', 'type Origin', 'protocol Hashable'],
+                         [f'{tokens[start].lex} {tokens[start + 1].lex}' for start, _ in spans])
+        self.assertEqual([';', ';', '}', '}', '}', '}'], [tokens[end - 1].lex for _, end in spans])
+        self.assertEqual('let', tokens[spans[-1][1]].lex)
+
+    def test_only_edited_declarations_are_parsed(self):
+        cache = DeclarationCache()
+        # The type without parameters gets the ones of its parent in the semantic analysis, so it's never reused
+        first = self.assertParsedAs(program, cache, 0, 6)
+        second = self.assertParsedAs(program, cache, 5, 1)
+        self.assertIs(first.declarations[0], second.declarations[0])
+
+        edited = self.assertParsedAs(program.replace('x ^ 2 + PI', 'x ^ 3'), cache, 4, 2)
+        self.assertIsNot(second.declarations[0], edited.declarations[0])
+        self.assertIs(second.declarations[1], edited.declarations[1])
+
+        self.assertParsedAs(program.replace('print(p.norm())', 'p.norm()'), cache, 4, 2)
+
+    def test_added_and_removed_declarations(self):
+        cache = DeclarationCache()
+        self.assertParsedAs(program, cache, 0, 6)
+        self.assertParsedAs('function k() => 0;\n' + program.replace('function h() { 1; }', ''), cache, 4, 2)
+        self.assertParsedAs('print(1);', cache, 0, 0)
+
+    def test_repeated_declarations(self):
+        cache = DeclarationCache()
+        text = 'function f() => 1;\nfunction f() => 1;\nf();'
+        self.assertParsedAs(text, cache, 0, 2)
+        ast = self.assertParsedAs(text, cache, 1, 1)
+        self.assertIsNot(ast.declarations[0], ast.declarations[1])
+
+    def test_errors(self):
+        cache = DeclarationCache()
+        self.assertParsedAs(program, cache, 0, 6)
+        self.assertParsedAs(program.replace('x ^ 2 + PI', 'x ^ + PI'), cache, 0, 6)
+        self.assertParsedAs(program.replace('x ^ 2 + PI', 'x ^ + PI').replace('hash()', 'hash('), cache, 0, 6)
+        self.assertParsedAs('function f() { 1; ', cache, 0, 6)
+        self.assertParsedAs('type A { ] }\n1;', cache, 0, 6)
+        self.assertParsedAs(program, cache, 5, 1)
+
+    def test_semicolon_after_the_declarations(self):
+        cache = DeclarationCache()
+        self.assertParsedAs('function h() { 2; }\ntype P { }\n1;', cache, 0, 2)
+        self.assertParsedAs('function h() { 3; }\ntype P { };\n1;', cache, 0, 2)
+
+    def test_edits(self):
+        raw = lexer.token_stream(program)
+        filtered, errors = lexer.filter_tokens(raw)
+        cache = DeclarationCache()
+        first = parser.parse_incremental(filtered, cache)[0]
+
+        edited = self.assertEdited(raw, filtered, errors, cache, raw.source.index('2 + PI'), 1, '3', 4, 2)
+        self.assertIsNot(first.declarations[0], edited.declarations[0])
+        self.assertIs(first.declarations[1], edited.declarations[1])
+
+        self.assertEdited(raw, filtered, errors, cache, raw.source.index('type Point'), 0, 'function k() => 0;\n', 5, 2)
+        start = raw.source.index('function h')
+        self.assertEdited(raw, filtered, errors, cache, start, raw.source.index('\n', start) - start + 1, '', 5, 1)
+        self.assertEdited(raw, filtered, errors, cache, raw.source.index('in y; };') + len('in y; }'), 1, '', 4, 2)
+        self.assertEdited(raw, filtered, errors, cache, raw.source.index('print(p.norm())'), 0, '1 + ', 5, 1)
+
+    def test_edits_with_errors(self):
+        raw = lexer.token_stream(program)
+        filtered, errors = lexer.filter_tokens(raw)
+        cache = DeclarationCache()
+        parser.parse_incremental(filtered, cache)
+
+        offset = raw.source.index('x ^ 2 + PI')
+        self.assertEdited(raw, filtered, errors, cache, offset + 4, 1, '', 0, 0)
+        self.assertEdited(raw, filtered, errors, cache, offset + 4, 0, '2', 4, 2)
+        # The declarations can't be split with unbalanced brackets, they're looked up by their text again once fixed
+        self.assertEdited(raw, filtered, errors, cache, raw.source.index('hash()') + 5, 1, '', 0, 0)
+        self.assertEdited(raw, filtered, errors, cache, raw.source.index('hash(') + 5, 0, ')', 5, 1)
+        self.assertEdited(raw, filtered, errors, cache, raw.source.index('type Point'), 0, 'type A { ] }\n', 0, 0)
+        self.assertEdited(raw, filtered, errors, cache, raw.source.index('type A'), len('type A { ] }\n'), '', 5, 1)
+        self.assertIs(filtered, cache.tokens)
+
+    def test_list_of_tokens(self):
+        cache = DeclarationCache()
+        tokens, _ = lexer(program)
+        parser.parse_incremental(tokens, cache)
+        ast, errors = parser.parse_incremental(list(tokens), cache)
+        self.assertEqual([], errors)
+        self.assertEqual(formatted(parser.parse(tokens)[0]), formatted(ast))
+        self.assertEqual((0, 6), (cache.reused, cache.parsed))
+
+
+if __name__ == '__main__':
+    unittest.main()
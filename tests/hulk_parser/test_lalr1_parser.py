@@ -0,0 +1,79 @@
+import unittest
+
+from src.lexer.hulk_lexer import HulkLexer
+from src.parser.hulk_parser import HulkParser
+from src.parsing import LR1Parser, LALR1Parser, SLR1Parser, GrammarConflictError
+from src.pycompiler import Grammar
+from src.regex.regex_grammar import get_regex_grammar
+
+lexer = HulkLexer()
+parser = HulkParser(rebuild=True, lalr=True)
+
+
+def terminals(G, text):
+    return [G.symbDict[symbol] for symbol in text.split()] + [G.EOF]
+
+
+def lr1_not_lalr1_grammar():
+    G = Grammar()
+    S = G.NonTerminal('S', True)
+    A, B = G.NonTerminals('A B')
+    a, b, c, d, e = G.Terminals('a b c d e')
+
+    S %= a + A + d
+    S %= b + B + d
+    S %= a + B + e
+    S %= b + A + e
+    A %= c
+    B %= c
+    return G
+
+
+class TestLALR1Parser(unittest.TestCase):
+
+    def test_same_parses_as_lr1(self):
+        G = get_regex_grammar()[0]
+        lr1, lalr1 = LR1Parser(G), LALR1Parser(G)
+        self.assertLess(len({state for state, _ in lalr1.table}), len({state for state, _ in lr1.table}))
+
+        for text in ['char', 'char | char char *', '( char | [ char - char ] ) + ?', '[ ^ char char ]']:
+            w = terminals(G, text)
+            self.assertEqual(lr1(w), lalr1(w))
+
+    def test_reduce_reduce_conflicts_are_reported(self):
+        G = lr1_not_lalr1_grammar()
+        LR1Parser(G)
+
+        with self.assertRaises(GrammarConflictError) as context:
+            LALR1Parser(G)
+        self.assertEqual(2, len(context.exception.conflicts))
+        self.assertEqual({'d', 'e'}, {terminal for _, terminal, _, _ in context.exception.conflicts})
+        self.assertIn('reduce/reduce', str(context.exception))
+
+    def test_slr1_conflicts_are_reported(self):
+        G = lr1_not_lalr1_grammar()
+        with self.assertRaises(GrammarConflictError) as context:
+            SLR1Parser(G)
+        self.assertIn('Grammar is not SLR(1)', str(context.exception))
+
+        G = get_regex_grammar()[0]
+        w = terminals(G, 'char | char char *')
+        self.assertEqual(LR1Parser(G)(w), SLR1Parser(G)(w))
+
+    def test_hulk_parser(self):
+        tokens, _ = lexer('function f(x: Number) => x ^ 2;\n'
+                          'type A(x) inherits B(x) { y = [i || i in range(0, x)]; }\n'
+                          'let a = new A(3) in if (a is A) print(f(a.y[0]) @ "!") else { 4; };')
+        derivation, operations, errors = parser(tokens)
+        self.assertEqual([], errors)
+        self.assertEqual('OK', operations[-1])
+
+    def test_hulk_parser_errors(self):
+        tokens, _ = lexer('let x = 4 in\nprint(x +);')
+        _, _, errors = parser(tokens)
+        self.assertEqual(1, len(errors))
+        self.assertEqual((2, 10), (errors[0].line, errors[0].column))
+
+
+if __name__ == '__main__':
+    unittest.main()
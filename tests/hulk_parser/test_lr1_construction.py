@@ -0,0 +1,72 @@
+import pickle
+import unittest
+
+import src.hulk_grammar.hulk_grammar as hulk_grammar
+from src.parsing import build_LR1_automaton, closure_lr1, goto_lr1, compute_firsts, LR1Parser, InternedItems
+from src.pycompiler import Item
+from src.regex.regex_grammar import get_regex_grammar
+
+
+def reference_item_sets(G):
+    """Canonical LR(1) collection built by closing every kernel with `closure_lr1` and trying every symbol."""
+    firsts = compute_firsts(G)
+    firsts[G.EOF] = {G.EOF}
+
+    start = frozenset(closure_lr1(G, [Item(G.startSymbol.productions[0], 0, (G.EOF,))], firsts))
+    item_sets = {start}
+    transitions = set()
+    pending = [start]
+    while pending:
+        current = pending.pop()
+        for symbol in G.terminals + G.nonTerminals:
+            target = frozenset(goto_lr1(G, current, symbol, firsts))
+            if target:
+                transitions.add((current, symbol.Name, target))
+                if target not in item_sets:
+                    item_sets.add(target)
+                    pending.append(target)
+    return item_sets, transitions
+
+
+def item_sets(automaton):
+    states = {automaton}
+    pending = [automaton]
+    while pending:
+        for targets in pending.pop().transitions.values():
+            if targets[0] not in states:
+                states.add(targets[0])
+                pending.append(targets[0])
+    return ({state.state for state in states},
+            {(state.state, symbol, targets[0].state) for state in states for symbol, targets in state.transitions.items()})
+
+
+class TestLR1Construction(unittest.TestCase):
+
+    def test_same_item_sets_as_the_reference(self):
+        G = get_regex_grammar()[0].AugmentedGrammar(True)
+        self.assertEqual(reference_item_sets(G), item_sets(build_LR1_automaton(G)))
+
+    def test_hulk_table_states(self):
+        parser = LR1Parser(hulk_grammar.G)
+        self.assertEqual(1483, len({state for state, _ in parser.table}))
+
+    def test_pickled_items_close_the_same(self):
+        G = hulk_grammar.G.AugmentedGrammar(True)
+        interned = InternedItems(G)
+        copy = pickle.loads(pickle.dumps(interned))
+
+        kernel = ((interned.first_core[G.startSymbol.productions[0]], interned.bits[G.EOF]),)
+        items = interned.closure(kernel)
+        self.assertEqual(items, copy.closure(kernel))
+        self.assertEqual([dict(kernel) for kernel in interned.gotos(items).values()],
+                         [dict(kernel) for kernel in copy.gotos(items).values()])
+
+    def test_parallel_construction(self):
+        G = get_regex_grammar()[0].AugmentedGrammar(True)
+        self.assertEqual(item_sets(build_LR1_automaton(G)), item_sets(build_LR1_automaton(G, workers=2)))
+        # The states are numbered the same as when the automaton is built in this process
+        self.assertEqual(LR1Parser(hulk_grammar.G).table, LR1Parser(hulk_grammar.G, workers=3).table)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+import src.hulk_grammar.hulk_grammar as hulk_grammar
+from src.lexer.hulk_lexer import HulkLexer
+from src.parser.hulk_parser import HulkParser, HULK_PARSER_TABLE_PATH, HULK_LALR_PARSER_TABLE_PATH
+from src.parsing import grammar_fingerprint, load_parse_table, save_parse_table, LR1Parser, LALR1Parser
+from src.regex.regex_grammar import get_regex_grammar
+
+lexer = HulkLexer()
+parser = HulkParser(rebuild=True)
+
+program = 'function f(x) => x ^ 2;\nlet a = [i || i in range(0, 10)] in print(f(a[1]) @ "!");'
+
+
+def same_table(test, expected, actual):
+    test.assertEqual(expected.symbols, actual.symbols)
+    test.assertEqual([str(p) for p in expected.productions], [str(p) for p in actual.productions])
+    for name in ['heads', 'lengths', 'base', 'check', 'actions']:
+        test.assertEqual(getattr(expected, name), getattr(actual, name))
+
+
+class TestParseTableCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.directory.name) / 'table.bin'
+        self.fingerprint = grammar_fingerprint(hulk_grammar.G, 'LR(1)')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        save_parse_table(self.path, self.fingerprint, parser.compact_table, hulk_grammar.G)
+        table = load_parse_table(self.path, self.fingerprint, hulk_grammar.G)
+        same_table(self, parser.compact_table, table)
+        # The productions are the ones of the grammar, with their attribute rules
+        self.assertTrue(all(p is None or p in hulk_grammar.G.Productions for p in table.productions))
+
+    def test_other_grammar_or_missing_cache(self):
+        self.assertIsNone(load_parse_table(self.path, self.fingerprint, hulk_grammar.G))
+
+        save_parse_table(self.path, self.fingerprint, parser.compact_table, hulk_grammar.G)
+        regex_grammar = get_regex_grammar()[0]
+        self.assertNotEqual(self.fingerprint, grammar_fingerprint(regex_grammar, 'LR(1)'))
+        self.assertNotEqual(self.fingerprint, grammar_fingerprint(hulk_grammar.G, 'LALR(1)'))
+        self.assertIsNone(load_parse_table(self.path, grammar_fingerprint(regex_grammar, 'LR(1)'), regex_grammar))
+
+    def test_corrupted_cache(self):
+        save_parse_table(self.path, self.fingerprint, parser.compact_table, hulk_grammar.G)
+        data = self.path.read_bytes()
+        for corrupted in [b'', data[:10], data[:-4], data + b'\0', b'HULKLEX' + data[7:]]:
+            self.path.write_bytes(corrupted)
+            self.assertIsNone(load_parse_table(self.path, self.fingerprint, hulk_grammar.G))
+
+    def test_same_bytes_for_the_same_table(self):
+        save_parse_table(self.path, self.fingerprint, parser.compact_table, hulk_grammar.G)
+        other = Path(self.directory.name) / 'other.bin'
+        save_parse_table(other, self.fingerprint, LR1Parser(hulk_grammar.G).compact_table, hulk_grammar.G)
+        self.assertEqual(self.path.read_bytes(), other.read_bytes())
+
+    def test_shipped_tables_are_up_to_date(self):
+        for path, grammar_class, lalr in [(HULK_PARSER_TABLE_PATH, LR1Parser.grammar_class, False),
+                                          (HULK_LALR_PARSER_TABLE_PATH, LALR1Parser.grammar_class, True)]:
+            table = load_parse_table(path, grammar_fingerprint(hulk_grammar.G, grammar_class), hulk_grammar.G)
+            self.assertIsNotNone(table, path)
+            same_table(self, HulkParser(rebuild=True, lalr=lalr).compact_table, table)
+
+    def test_loaded_parser_from_another_directory(self):
+        cwd = os.getcwd()
+        os.chdir(self.directory.name)
+        try:
+            loaded = HulkParser()
+        finally:
+            os.chdir(cwd)
+        self.assertIsNone(loaded.table)
+
+        tokens, _ = lexer(program)
+        self.assertEqual(parser(tokens), loaded(tokens))
+        ast, errors = loaded.parse(tokens)
+        self.assertEqual([], errors)
+        self.assertIsNotNone(ast)
+
+
+if __name__ == '__main__':
+    unittest.main()
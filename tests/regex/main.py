@@ -0,0 +1,6 @@
+from tests.utils import run_tests, print_results
+
+
+if __name__ == "__main__":
+    res = run_tests()
+    print_results(res)
@@ -0,0 +1,64 @@
+import unittest
+
+from src.automaton import CharClass, split_char_classes
+from src.regex.regex_automaton import get_regex_automaton
+
+
+def recognizes(regex, text):
+    initial, final = get_regex_automaton(regex)
+    return initial.recognize(text)
+
+
+class TestCharClasses(unittest.TestCase):
+
+    def test_ranges(self):
+        self.assertTrue(recognizes('[a-z_][a-z0-9_]*', 'snake_case2'))
+        self.assertFalse(recognizes('[a-z_][a-z0-9_]*', '2snake'))
+        self.assertFalse(recognizes('[a-z]', 'A'))
+
+    def test_negated_class(self):
+        self.assertTrue(recognizes('"[^"]*"', '"any thing ñ π"'))
+        self.assertFalse(recognizes('"[^"]*"', '"a"b"'))
+
+    def test_special_characters_inside_classes(self):
+        for char in '*|()+?.-':
+            self.assertTrue(recognizes('[*|()+?.-]', char))
+        self.assertTrue(recognizes('[^-]', 'a'))
+        self.assertFalse(recognizes('[^-]', '-'))
+        self.assertTrue(recognizes('[a^]', '^'))
+        self.assertTrue(recognizes('[\\]]', ']'))
+
+    def test_plus(self):
+        self.assertTrue(recognizes('(ab)+', 'abab'))
+        self.assertFalse(recognizes('(ab)+', ''))
+
+    def test_optional(self):
+        self.assertTrue(recognizes('-?[0-9]+', '-12'))
+        self.assertTrue(recognizes('-?[0-9]+', '12'))
+        self.assertFalse(recognizes('-?[0-9]+', '--12'))
+
+    def test_escapes(self):
+        self.assertTrue(recognizes('\\n\\t', '\n\t'))
+        self.assertTrue(recognizes('[\\x41-\\x43]+', 'ABC'))
+        self.assertTrue(recognizes('\\u00f1', 'ñ'))
+        self.assertTrue(recognizes('\\+\\?\\[', '+?['))
+
+    def test_invalid_range(self):
+        with self.assertRaises(ValueError):
+            get_regex_automaton('[z-a]')
+
+    def test_class_transitions_are_not_expanded(self):
+        initial, final = get_regex_automaton('[^"]')
+        self.assertEqual(1, len(initial.transitions))
+
+    def test_negate(self):
+        char_class = CharClass([(ord('a'), ord('z'))])
+        negated = char_class.negate()
+        self.assertNotIn('m', negated)
+        self.assertIn('A', negated)
+        self.assertEqual(char_class, negated.negate())
+
+    def test_split_char_classes(self):
+        parts = split_char_classes({CharClass([(ord('a'), ord('z'))]), 'e', CharClass([(ord('x'), ord('}'))])})
+        self.assertEqual([CharClass([(ord('a'), ord('d'))]), 'e', CharClass([(ord('f'), ord('w'))]),
+                          CharClass([(ord('x'), ord('z'))]), CharClass([(ord('{'), ord('}'))])], parts)
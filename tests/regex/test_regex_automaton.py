@@ -0,0 +1,30 @@
+import unittest
+
+from src.regex.regex_automaton import get_regex_automaton, get_regex_parser
+
+
+class TestRegexAutomaton(unittest.TestCase):
+
+    def test_parser_is_built_once(self):
+        self.assertIs(get_regex_parser()[1], get_regex_parser()[1])
+
+    def test_recognize(self):
+        initial, final = get_regex_automaton('(a|b)*abb')
+        self.assertTrue(initial.recognize('abb'))
+        self.assertTrue(initial.recognize('babaabb'))
+        self.assertFalse(initial.recognize('ab'))
+
+    def test_escaped_characters(self):
+        initial, final = get_regex_automaton('\\(\\*\\)')
+        self.assertTrue(initial.recognize('(*)'))
+        self.assertFalse(initial.recognize('*'))
+
+    def test_cached_automata_are_independent(self):
+        initial, final = get_regex_automaton('ab*')
+        final.state = 'modified'
+        final.final = False
+
+        initial, final = get_regex_automaton('ab*')
+        self.assertIsNone(final.state)
+        self.assertTrue(final.final)
+        self.assertTrue(initial.recognize('abbb'))